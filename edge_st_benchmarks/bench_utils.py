@@ -0,0 +1,275 @@
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+
+"""bench_utils
+
+The bench_utils module provides what the benchmarks need to run offline:
+self-signed certificates, a stubbed Greengrass discovery pointing to local
+cores, latency statistics, confidence intervals, and machine-readable
+results.
+"""
+
+
+# IMPORT
+
+import os
+import sys
+import json
+import math
+import time
+import platform
+import subprocess
+
+# Making the SDK importable when running from a source checkout.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AWSIoTPythonSDK.core.greengrass.discovery import providers
+from AWSIoTPythonSDK.core.greengrass.discovery.models import DiscoveryInfo
+
+import edge_st_sdk.aws.aws_greengrass
+from edge_st_sdk.utils.histogram import Histogram
+
+
+# CONSTANTS
+
+GROUP_ID = 'edge_st_benchmarks_group'
+"""Identifier of the Greengrass group of the local cores."""
+
+CORE_ARN = 'arn:aws:iot:local:000000000000:thing/edge_st_benchmarks_core_%d'
+"""ARN of the local cores, formatted with the index of the core."""
+
+PERCENTILES = (50, 90, 99, 99.9)
+"""Percentiles reported for latency distributions."""
+
+T_95 = [12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262,
+    2.228, 2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093,
+    2.086, 2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045,
+    2.042]
+"""Two-sided 95% quantiles of the Student's t-distribution, by degrees of
+freedom starting from one."""
+
+Z_95 = 1.96
+"""Two-sided 95% quantile of the normal distribution, used beyond the
+degrees of freedom of :data:`T_95`."""
+
+
+# FUNCTIONS
+
+def generate_certificates(directory):
+    """Generate with "openssl" a Certification Authority and the certificates
+    signed by it for the local cores (valid for "localhost" and "127.0.0.1")
+    and for the clients. Existing files are reused.
+
+    :param directory: Directory where to store the files.
+    :type directory: str
+
+    :returns: Paths of the files, indexed by "ca", "server_cert",
+        "server_key", "client_cert" and "client_key".
+    :rtype: dict
+    """
+    paths = dict((name, os.path.join(directory, file_name)) \
+        for name, file_name in [
+            ('ca', 'ca.crt'), ('ca_key', 'ca.key'),
+            ('server_cert', 'server.crt'), ('server_key', 'server.key'),
+            ('client_cert', 'client.crt'), ('client_key', 'client.key')])
+    if all(os.path.exists(path) for path in paths.values()):
+        return paths
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+
+    def openssl(*args):
+        subprocess.check_call(('openssl',) + args,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    key_options = ('-newkey', 'ec', '-pkeyopt', 'ec_paramgen_curve:prime256v1',
+        '-nodes')
+    openssl('req', '-x509', *(key_options + ('-keyout', paths['ca_key'],
+        '-out', paths['ca'], '-days', '365', '-subj',
+        '/CN=edge_st_benchmarks CA')))
+    extensions = os.path.join(directory, 'extensions.cnf')
+    with open(extensions, 'w') as extensions_file:
+        extensions_file.write('basicConstraints=CA:FALSE\n'
+            'subjectAltName=DNS:localhost,IP:127.0.0.1\n')
+    for name, subject in [('server', '/CN=localhost'),
+        ('client', '/CN=edge_st_benchmarks client')]:
+        request = os.path.join(directory, name + '.csr')
+        openssl('req', *(key_options + ('-keyout', paths[name + '_key'],
+            '-out', request, '-subj', subject)))
+        openssl('x509', '-req', '-in', request, '-CA', paths['ca'],
+            '-CAkey', paths['ca_key'], '-CAcreateserial',
+            '-out', paths[name + '_cert'], '-days', '365',
+            '-extfile', extensions)
+    return paths
+
+def get_discovery_json(ca_path, cores):
+    """Build the response of a Greengrass discovery.
+
+    :param ca_path: Path of the Certification Authority of the cores.
+    :type ca_path: str
+
+    :param cores: Cores, as lists of (host, port) endpoints, i.e. their
+        connectivity information lists.
+    :type cores: list
+
+    :returns: The discovery response.
+    :rtype: str
+    """
+    with open(ca_path) as ca_file:
+        ca = ca_file.read()
+    return json.dumps({'GGGroups': [{
+        'GGGroupId': GROUP_ID,
+        'Cores': [{
+            'thingArn': CORE_ARN % (index),
+            'Connectivity': [{
+                'Id': '%d_%d' % (index, endpoint),
+                'HostAddress': host,
+                'PortNumber': port,
+                'Metadata': ''
+            } for endpoint, (host, port) in enumerate(endpoints)]
+        } for index, endpoints in enumerate(cores)],
+        'CAs': [ca]
+    }]})
+
+def stub_discovery(ca_path, cores, work_directory):
+    """Make :class:`edge_st_sdk.aws.aws_greengrass.AWSGreengrass` discover
+    the given local cores without contacting AWS.
+
+    :param ca_path: Path of the Certification Authority of the cores.
+    :type ca_path: str
+
+    :param cores: Cores, as lists of (host, port) endpoints.
+    :type cores: list
+
+    :param work_directory: Directory where group CA files are written.
+    :type work_directory: str
+    """
+    discovery_json = get_discovery_json(ca_path, cores)
+    set_work_directory(work_directory)
+    DiscoveryInfoProvider = providers.DiscoveryInfoProvider
+
+    class StubDiscoveryInfoProvider(DiscoveryInfoProvider):
+        def discover(self, thingName):
+            return DiscoveryInfo(discovery_json)
+
+    providers.DiscoveryInfoProvider = StubDiscoveryInfoProvider
+
+def set_work_directory(work_directory):
+    """Make :class:`edge_st_sdk.aws.aws_greengrass.AWSGreengrass` write the
+    group CA files into the given directory rather than into the current
+    one.
+
+    :param work_directory: Directory where group CA files are written.
+    :type work_directory: str
+    """
+    edge_st_sdk.aws.aws_greengrass.AWSGreengrass._GROUP_CA_PATH = \
+        os.path.join(work_directory, 'aws_group_ca') + os.sep
+
+def get_confidence_interval(values):
+    """Compute the mean of a sample with its 95% confidence interval.
+
+    :param values: Values of the sample.
+    :type values: list
+
+    :returns: Mean, lower and upper bounds of the confidence interval.
+    :rtype: tuple
+    """
+    count = len(values)
+    mean = sum(values) / count
+    if count < 2:
+        return mean, mean, mean
+    deviation = math.sqrt(
+        sum((value - mean) ** 2 for value in values) / (count - 1))
+    quantile = T_95[count - 2] if count - 1 <= len(T_95) else Z_95
+    margin = quantile * deviation / math.sqrt(count)
+    return mean, mean - margin, mean + margin
+
+def summarize(values):
+    """Summarize a latency distribution.
+
+    :param values: Latencies in seconds.
+    :type values: list
+
+    :returns: Count, mean, minimum, maximum and percentiles, in seconds.
+    :rtype: dict
+    """
+    histogram = Histogram()
+    for value in values:
+        histogram.record(value)
+    summary = {
+        'count': histogram.get_count(),
+        'mean_s': histogram.get_mean(),
+        'min_s': histogram.get_min(),
+        'max_s': histogram.get_max()
+    }
+    for percentile in PERCENTILES:
+        summary['p%s_s' % (('%g' % percentile).replace('.', '_'))] = \
+            histogram.get_percentile(percentile) if values else None
+    return summary
+
+def get_environment():
+    """Describe the environment the benchmarks run on.
+
+    :returns: The description of the environment.
+    :rtype: dict
+    """
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processors': os.cpu_count(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z')
+    }
+
+def write_results(path, benchmark, parameters, results):
+    """Write the results of a benchmark as a JSON document.
+
+    :param path: Path of the output file; "-" writes to the standard output.
+    :type path: str
+
+    :param benchmark: Name of the benchmark.
+    :type benchmark: str
+
+    :param parameters: Parameters of the run.
+    :type parameters: dict
+
+    :param results: Results of the run.
+    :type results: list or dict
+    """
+    document = json.dumps({
+        'benchmark': benchmark,
+        'environment': get_environment(),
+        'parameters': parameters,
+        'results': results
+    }, indent=2, sort_keys=True)
+    if path == '-':
+        print(document)
+    else:
+        with open(path, 'w') as output_file:
+            output_file.write(document + '\n')
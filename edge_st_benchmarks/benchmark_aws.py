@@ -0,0 +1,313 @@
+#!/usr/bin/env python
+
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+
+# DESCRIPTION
+#
+# This benchmark measures the performance of the Amazon AWS clients of the SDK
+# against a local MQTT broker standing in for a Greengrass core, with a stubbed
+# discovery, so that it can run on a laptop without any network.
+#
+# For each number of clients it measures:
+#   - the time needed to obtain and connect a client;
+#   - the publish throughput with quality of service "0" and "1", repeated
+#     after a warm-up, alternating the order of the two, and reported with the
+#     95% confidence interval of the mean;
+#   - the latency of publications with quality of service "1", i.e. the time
+#     until the acknowledgement comes back;
+#   - the round-trip time of device shadow updates.
+#
+# Results are written as a JSON document, e.g.:
+#   python benchmark_aws.py --clients 1,4,16 --repetitions 5 \
+#       --output results.json
+
+
+# IMPORT
+
+from __future__ import print_function
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+
+from bench_utils import generate_certificates
+from bench_utils import get_confidence_interval
+from bench_utils import stub_discovery
+from bench_utils import summarize
+from bench_utils import write_results
+from mqtt_broker import LocalMQTTBroker
+
+from edge_st_sdk.aws.aws_greengrass import AWSGreengrass
+from edge_st_sdk.edge_client import EdgeClientStatus
+
+
+# CONSTANTS
+
+TOPIC = 'edge_st_benchmarks/%s/data'
+"""Topic of the published messages, formatted with the client name."""
+
+TIMEOUT_s = 60
+"""Timeout of each measurement."""
+
+
+# FUNCTIONS
+
+def run_in_threads(function, clients):
+    """Run a function for each client on a thread of its own, and wait for
+    all of them.
+
+    :returns: The elapsed time in seconds.
+    :rtype: float
+    """
+    threads = [threading.Thread(target=function, args=(client,)) \
+        for client in clients]
+    start = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.time() - start
+
+def connect_clients(greengrass, certificates, number, prefix):
+    """Obtain and connect the clients, one at a time.
+
+    :returns: The clients and the connection times.
+    :rtype: tuple
+    """
+    clients = []
+    connect_times = []
+    for index in range(number):
+        start = time.time()
+        client = greengrass.get_client('%s_%d' % (prefix, index),
+            certificates['client_cert'], certificates['client_key'])
+        if not client.connect():
+            raise RuntimeError('Client "%s" could not connect.' \
+                % (client.get_name()))
+        connect_times.append(time.time() - start)
+        clients.append(client)
+    return clients, connect_times
+
+def measure_throughput(broker, clients, messages, payload, qos):
+    """Publish asynchronously the given number of messages per client, and
+    wait until all of them have reached the broker (and, with quality of
+    service "1", have been acknowledged).
+
+    :returns: Messages per second.
+    :rtype: float
+    """
+    total = messages * len(clients)
+    received = broker.messages_received + total
+    acks = [0]
+    acked = threading.Condition()
+
+    def on_ack(mid):
+        with acked:
+            acks[0] += 1
+            if acks[0] >= total:
+                acked.notify_all()
+
+    def publish(client):
+        topic = TOPIC % (client.get_name())
+        for _ in range(messages):
+            client.publish_async(topic, payload, qos,
+                on_ack if qos > 0 else None)
+
+    start = time.time()
+    run_in_threads(publish, clients)
+    completed = broker.wait_for_messages(received, TIMEOUT_s)
+    if completed and qos > 0:
+        with acked:
+            completed = acked.wait_for(lambda: acks[0] >= total, TIMEOUT_s)
+    elapsed = time.time() - start
+    if not completed:
+        raise RuntimeError('Timeout publishing with QoS %d.' % (qos))
+    return total / elapsed
+
+def measure_qos1_latency(clients, messages, payload):
+    """Publish synchronously with quality of service "1", in parallel on all
+    the clients.
+
+    :returns: Latencies in seconds.
+    :rtype: list
+    """
+    latencies = []
+
+    def publish(client):
+        topic = TOPIC % (client.get_name())
+        client_latencies = []
+        for _ in range(messages):
+            start = time.time()
+            client.publish(topic, payload, 1)
+            client_latencies.append(time.time() - start)
+        latencies.extend(client_latencies)
+
+    run_in_threads(publish, clients)
+    return latencies
+
+def measure_shadow_rtt(clients, requests):
+    """Update the device shadows, in parallel on all the clients, waiting for
+    each response before sending the next request. The first request of each
+    client also subscribes to the shadow topics, and is not accounted.
+
+    :returns: Round-trip times in seconds.
+    :rtype: list
+    """
+    rtts = []
+
+    def update(client):
+        client_rtts = []
+        for index in range(requests + 1):
+            response = threading.Event()
+            start = time.time()
+            client.update_shadow_state(
+                json.dumps({'state': {'reported': {'index': index}}}),
+                lambda payload, status, token: response.set(), TIMEOUT_s)
+            if not response.wait(TIMEOUT_s):
+                raise RuntimeError('Timeout updating the shadow.')
+            if index > 0:
+                client_rtts.append(time.time() - start)
+        rtts.extend(client_rtts)
+
+    run_in_threads(update, clients)
+    return rtts
+
+def summarize_samples(samples):
+    """Summarize repeated measurements.
+
+    :returns: The mean, the confidence interval and the samples.
+    :rtype: dict
+    """
+    mean, low, high = get_confidence_interval(samples)
+    return {
+        'mean': mean,
+        'ci_low': low,
+        'ci_high': high,
+        'samples': samples
+    }
+
+def run(greengrass, broker, certificates, number, arguments):
+    """Run the measurements with the given number of clients.
+
+    :returns: The results.
+    :rtype: dict
+    """
+    payload = json.dumps({'data': 'x' * max(0, arguments.payload_size - 11)})
+    clients, connect_times = connect_clients(
+        greengrass, certificates, number, 'bench_%d' % (number))
+    try:
+        # Warming up.
+        for qos in (0, 1):
+            measure_throughput(broker, clients,
+                max(1, arguments.messages // 10), payload, qos)
+        measure_qos1_latency(
+            clients, max(1, arguments.latency_messages // 10), payload)
+        throughputs = {0: [], 1: []}
+        for repetition in range(arguments.repetitions):
+            # Alternating the order, so that neither quality of service
+            # always runs first.
+            for qos in (0, 1) if repetition % 2 == 0 else (1, 0):
+                throughputs[qos].append(measure_throughput(
+                    broker, clients, arguments.messages, payload, qos))
+        return {
+            'clients': number,
+            'connect': summarize(connect_times),
+            'qos0_throughput_msg_s': summarize_samples(throughputs[0]),
+            'qos1_throughput_msg_s': summarize_samples(throughputs[1]),
+            'qos1_latency': summarize(measure_qos1_latency(
+                clients, arguments.latency_messages, payload)),
+            'shadow_rtt': summarize(
+                measure_shadow_rtt(clients, arguments.shadow_requests))
+        }
+    finally:
+        for client in clients:
+            client.disconnect()
+
+
+# MAIN APPLICATION
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=
+        'Benchmark the Amazon AWS clients against a local MQTT broker.')
+    parser.add_argument('--clients', default='1,4,16',
+        help='comma-separated numbers of clients (default: %(default)s)')
+    parser.add_argument('--messages', type=int, default=1000,
+        help='messages per client for throughput (default: %(default)s)')
+    parser.add_argument('--repetitions', type=int, default=5,
+        help='repetitions of each throughput measurement '
+            '(default: %(default)s)')
+    parser.add_argument('--latency-messages', type=int, default=200,
+        help='messages per client for QoS 1 latency (default: %(default)s)')
+    parser.add_argument('--shadow-requests', type=int, default=20,
+        help='shadow updates per client (default: %(default)s)')
+    parser.add_argument('--payload-size', type=int, default=64,
+        help='payload size in bytes (default: %(default)s)')
+    parser.add_argument('--work-dir', default=None,
+        help='directory for certificates and temporary files '
+            '(default: a temporary directory)')
+    parser.add_argument('--output', default='-',
+        help='results file, "-" for the standard output '
+            '(default: %(default)s)')
+    arguments = parser.parse_args(argv)
+    if arguments.repetitions < 2:
+        parser.error('at least two repetitions are needed.')
+
+    work_directory = arguments.work_dir or tempfile.mkdtemp(
+        prefix='edge_st_benchmarks_')
+    certificates = generate_certificates(
+        os.path.join(work_directory, 'certificates'))
+    broker = LocalMQTTBroker(certificates['server_cert'],
+        certificates['server_key'], certificates['ca'])
+    port = broker.start()
+    stub_discovery(certificates['ca'], [[('127.0.0.1', port)]],
+        work_directory)
+    try:
+        greengrass = AWSGreengrass('localhost', certificates['ca'])
+        results = []
+        for number in [int(n) for n in arguments.clients.split(',')]:
+            print('Benchmarking %d client(s)...' % (number), file=sys.stderr)
+            results.append(
+                run(greengrass, broker, certificates, number, arguments))
+        write_results(arguments.output, 'aws_client', vars(arguments), results)
+    finally:
+        broker.stop()
+        if arguments.work_dir is None:
+            shutil.rmtree(work_directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    try:
+        main(sys.argv[1:])
+    except KeyboardInterrupt:
+        print('Benchmark interrupted.', file=sys.stderr)
+        sys.exit(1)
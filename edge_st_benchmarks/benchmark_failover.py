@@ -0,0 +1,281 @@
+#!/usr/bin/env python
+
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+
+# DESCRIPTION
+#
+# This benchmark measures the cost of the failure handling paths of the SDK
+# against a local HTTPS discovery responder and local MQTT cores with injected
+# faults, so that it can run on a laptop without any network:
+#   - discovery: time to obtain a client when the first discovery requests
+#     fail, either with an HTTP error or with a dropped connection, i.e. the
+#     cost of the discovery retries;
+#   - fallback: time to connect when the first entries of the connectivity
+#     information list of the core are refusing connections or unresponsive;
+#   - reconnect: time for clients to get connected again after the core drops
+#     all the connections.
+#
+# Results are written as a JSON document, e.g.:
+#   python benchmark_failover.py --output results.json
+
+
+# IMPORT
+
+from __future__ import print_function
+import os
+import sys
+import time
+import shutil
+import socket
+import argparse
+import tempfile
+
+from bench_utils import generate_certificates
+from bench_utils import get_discovery_json
+from bench_utils import set_work_directory
+from bench_utils import summarize
+from bench_utils import write_results
+from mqtt_broker import LocalMQTTBroker
+from discovery_server import LocalDiscoveryServer
+
+from edge_st_sdk.aws.aws_client import AWSClient
+from edge_st_sdk.aws.aws_greengrass import AWSGreengrass
+from edge_st_sdk.aws.aws_reconnect_coordinator import AWSReconnectCoordinator
+
+
+# CONSTANTS
+
+HOST = '127.0.0.1'
+"""Address of the local servers."""
+
+TIMEOUT_s = 60
+"""Timeout of each measurement."""
+
+
+# FUNCTIONS
+
+def get_refused_port():
+    """Get a local TCP port on which connections are refused.
+
+    :returns: The port.
+    :rtype: int
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind((HOST, 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+def new_greengrass(certificates, discovery_server, cores):
+    """Get a new Greengrass object discovering the given cores through the
+    local discovery responder.
+
+    :param cores: Cores, as lists of (host, port) endpoints.
+    :type cores: list
+    """
+    discovery_server.discovery_json = get_discovery_json(
+        certificates['ca'], cores)
+    return AWSGreengrass('localhost', certificates['ca'],
+        discovery_port=discovery_server.port)
+
+def get_client(greengrass, certificates, client_id):
+    return greengrass.get_client(client_id,
+        certificates['client_cert'], certificates['client_key'])
+
+def benchmark_discovery(certificates, discovery_server, broker, arguments):
+    """Measure the time needed to obtain a client when the first discovery
+    requests fail."""
+    results = []
+    for failure_status in [503, None]:
+        for failures in range(AWSGreengrass.MAX_DISCOVERY_ATTEMPTS):
+            latencies = []
+            for repetition in range(arguments.repetitions):
+                greengrass = new_greengrass(certificates, discovery_server,
+                    [[(HOST, broker.port)]])
+                discovery_server.failures = failures
+                discovery_server.failure_status = failure_status
+                start = time.time()
+                get_client(greengrass, certificates,
+                    'discovery_%d_%d' % (failures, repetition))
+                latencies.append(time.time() - start)
+            results.append({
+                'failures': failures,
+                'failure': 'http_%d' % (failure_status) \
+                    if failure_status else 'connection_dropped',
+                'latency': summarize(latencies)
+            })
+    discovery_server.failures = 0
+    return results
+
+def benchmark_fallback(certificates, discovery_server, broker,
+    unresponsive_broker, arguments):
+    """Measure the time needed to connect when the first entries of the
+    connectivity information list of the core are not working."""
+    results = []
+    for failure, endpoint in [
+        ('refused', lambda: (HOST, get_refused_port())),
+        ('unresponsive', lambda: (HOST, unresponsive_broker.port))]:
+        for failures in range(arguments.max_failed_endpoints + 1):
+            latencies = []
+            for repetition in range(arguments.repetitions):
+                greengrass = new_greengrass(certificates, discovery_server,
+                    [[endpoint() for _ in range(failures)] \
+                        + [(HOST, broker.port)]])
+                client = get_client(greengrass, certificates,
+                    'fallback_%s_%d_%d' % (failure, failures, repetition))
+                start = time.time()
+                connected = client.connect()
+                latencies.append(time.time() - start)
+                client.disconnect()
+                if not connected:
+                    raise RuntimeError('Fallback to the working endpoint '
+                        'failed.')
+            results.append({
+                'failed_endpoints': failures,
+                'failure': failure,
+                'latency': summarize(latencies)
+            })
+    return results
+
+def benchmark_reconnect(certificates, discovery_server, broker, arguments):
+    """Measure the time needed by the clients to get connected again after
+    the core drops all the connections."""
+    results = []
+    for number in sorted(set([1, arguments.clients])):
+        greengrass = new_greengrass(certificates, discovery_server,
+            [[(HOST, broker.port)]])
+        clients = [get_client(greengrass, certificates,
+            'reconnect_%d_%d' % (number, index)) for index in range(number)]
+        for client in clients:
+            if not client.connect():
+                raise RuntimeError('Client "%s" could not connect.' \
+                    % (client.get_name()))
+        latencies = []
+        for repetition in range(arguments.repetitions):
+            # Waiting for the connections to become stable, so that every
+            # repetition starts from the base back-off time.
+            time.sleep(arguments.stable_connection_s * 1.5)
+            pending = set(client.get_name() for client in clients)
+            start = time.time()
+            broker.drop_connections()
+            while pending and time.time() - start < TIMEOUT_s:
+                time.sleep(0.005)
+                reconnected = pending.intersection(
+                    broker.get_connected_clients())
+                for _ in reconnected:
+                    latencies.append(time.time() - start)
+                pending.difference_update(reconnected)
+            if pending:
+                raise RuntimeError('%d client(s) did not reconnect.' \
+                    % (len(pending)))
+        for client in clients:
+            client.disconnect()
+        results.append({
+            'clients': number,
+            'latency': summarize(latencies)
+        })
+    return results
+
+
+# MAIN APPLICATION
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=
+        'Benchmark discovery retries, connectivity fallback and '
+        'reconnections against local servers with injected faults.')
+    parser.add_argument('--clients', type=int, default=8,
+        help='clients reconnecting at the same time (default: %(default)s)')
+    parser.add_argument('--repetitions', type=int, default=3,
+        help='repetitions of each measurement (default: %(default)s)')
+    parser.add_argument('--max-failed-endpoints', type=int, default=2,
+        help='maximum number of failing endpoints before the working one '
+            '(default: %(default)s)')
+    parser.add_argument('--connect-timeout-s', type=float, default=2.0,
+        help='timeout of the connections to unresponsive endpoints '
+            '(default: %(default)s)')
+    parser.add_argument('--base-backoff-s', type=float,
+        default=AWSReconnectCoordinator.BASE_BACKOFF_s,
+        help='base reconnection back-off time (default: %(default)s)')
+    parser.add_argument('--stable-connection-s', type=float, default=1.0,
+        help='time after which a connection is stable (default: %(default)s)')
+    parser.add_argument('--work-dir', default=None,
+        help='directory for certificates and temporary files '
+            '(default: a temporary directory)')
+    parser.add_argument('--output', default='-',
+        help='results file, "-" for the standard output '
+            '(default: %(default)s)')
+    arguments = parser.parse_args(argv)
+
+    work_directory = arguments.work_dir or tempfile.mkdtemp(
+        prefix='edge_st_benchmarks_')
+    certificates = generate_certificates(
+        os.path.join(work_directory, 'certificates'))
+    set_work_directory(work_directory)
+    AWSClient._TIMEOUT_s = arguments.connect_timeout_s
+    AWSReconnectCoordinator.instance().configure(
+        base_backoff_s=arguments.base_backoff_s,
+        stable_connection_s=arguments.stable_connection_s)
+
+    broker = LocalMQTTBroker(certificates['server_cert'],
+        certificates['server_key'], certificates['ca'])
+    broker.start()
+    unresponsive_broker = LocalMQTTBroker(certificates['server_cert'],
+        certificates['server_key'], certificates['ca'])
+    unresponsive_broker.connack_delay_s = 3600
+    unresponsive_broker.start()
+    discovery_server = LocalDiscoveryServer(certificates['server_cert'],
+        certificates['server_key'], certificates['ca'], '{}')
+    discovery_server.start()
+    try:
+        results = {}
+        print('Benchmarking discovery retries...', file=sys.stderr)
+        results['discovery'] = benchmark_discovery(
+            certificates, discovery_server, broker, arguments)
+        print('Benchmarking connectivity fallback...', file=sys.stderr)
+        results['fallback'] = benchmark_fallback(certificates,
+            discovery_server, broker, unresponsive_broker, arguments)
+        print('Benchmarking reconnections...', file=sys.stderr)
+        results['reconnect'] = benchmark_reconnect(
+            certificates, discovery_server, broker, arguments)
+        write_results(arguments.output, 'failover', vars(arguments), results)
+    finally:
+        discovery_server.stop()
+        unresponsive_broker.stop()
+        broker.stop()
+        if arguments.work_dir is None:
+            shutil.rmtree(work_directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    try:
+        main(sys.argv[1:])
+    except KeyboardInterrupt:
+        print('Benchmark interrupted.', file=sys.stderr)
+        sys.exit(1)
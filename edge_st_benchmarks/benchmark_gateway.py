@@ -0,0 +1,248 @@
+#!/usr/bin/env python
+
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+
+# DESCRIPTION
+#
+# This benchmark finds the saturation point of a gateway by running the gateway
+# engine of the SDK (see "edge_st_sdk.gateway.gateway.Gateway") with an
+# increasing number of virtual BLE nodes, against a local MQTT broker standing
+# in for the Greengrass core, with a stubbed discovery.
+#
+# Each virtual node notifies its features at the given rate through genuine
+# BlueST SDK features. Notifications are queued on the nodes and dispatched by
+# the gateway's notification reactor, which publishes each sample as an event
+# through the node's own AWS client, as configured by a generated manifest.
+# For each number of nodes it reports the offered and delivered message rates,
+# the scheduling lag of the notifications, and the latency from the
+# notification to the publication (or to the acknowledgement, with QoS 1). A
+# run is saturated when less than 95% of the offered messages are delivered,
+# or when notifications fall behind their schedule by more than a period.
+#
+# Results are written as a JSON document, e.g.:
+#   python benchmark_gateway.py --nodes 10,100,500 --features environmental
+#
+# Samples can be replayed from a recording made on a real gateway, e.g.:
+#   python benchmark_gateway.py --recording samples.jsonl
+
+
+# IMPORT
+
+from __future__ import print_function
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+
+from bench_utils import generate_certificates
+from bench_utils import stub_discovery
+from bench_utils import summarize
+from bench_utils import write_results
+from mqtt_broker import LocalMQTTBroker
+from ble_simulator import FEATURE_SETS
+from ble_simulator import NodeSimulator
+from ble_simulator import RecordedSource
+from ble_simulator import SyntheticSource
+from ble_simulator import VirtualNode
+
+from edge_st_sdk.aws.aws_greengrass import AWSGreengrass
+from edge_st_sdk.gateway.device_manifest import DeviceManifest
+from edge_st_sdk.gateway.gateway import Gateway
+from edge_st_sdk.utils.metrics import MetricsRegistry
+from edge_st_sdk.utils.tracing import Tracer
+
+
+# CONSTANTS
+
+TOPIC = 'edge_st_benchmarks/{thing_name}/%s'
+"""Topic of the published samples, formatted with the feature name."""
+
+SATURATION_RATIO = 0.95
+"""Minimum ratio of delivered messages of a run which is not saturated."""
+
+
+# FUNCTIONS
+
+def get_manifest(nodes, feature_names, certificates, qos):
+    """Get the manifest publishing each sample of the virtual nodes as an
+    event.
+
+    :returns: The manifest.
+    :rtype: :class:`edge_st_sdk.gateway.device_manifest.DeviceManifest`
+    """
+    events = [{
+        'feature': feature.get_name(),
+        'topic': TOPIC % (feature_name),
+        'qos': qos
+    } for feature_name, feature in zip(feature_names, nodes[0].get_features())]
+    return DeviceManifest.from_dict({
+        'defaults': {
+            'certificate': certificates['client_cert'],
+            'private_key': certificates['client_key'],
+            'events': events
+        },
+        'devices': [{'mac': node.get_tag(), 'thing_name': node.get_name()} \
+            for node in nodes]
+    })
+
+def run(greengrass, broker, certificates, source, number, arguments):
+    """Run the gateway with the given number of virtual nodes.
+
+    :returns: The results.
+    :rtype: dict
+    """
+    feature_names = FEATURE_SETS.get(arguments.features) \
+        or arguments.features.split(',')
+    nodes = [VirtualNode('virtual_node_%d' % (index), feature_names,
+        arguments.rate_hz, source) for index in range(number)]
+    gateway = Gateway(greengrass,
+        get_manifest(nodes, feature_names, certificates, arguments.qos))
+    gateway.attach_nodes(nodes)
+    thread = None
+    try:
+        gateway.start()
+        thread = threading.Thread(target=gateway.run, name='benchmark-gateway')
+        thread.start()
+
+        latency = MetricsRegistry.instance().histogram(
+            'edge_st_sdk_trace_latency_seconds',
+            'End-to-end latency of traced samples.').get_histogram()
+        latency.reset()
+        received = broker.messages_received
+        simulator = NodeSimulator(nodes, arguments.threads, seed=number,
+            queued=True)
+        start = time.time()
+        simulator.start()
+        time.sleep(arguments.duration_s)
+        simulator.stop()
+        elapsed = time.time() - start
+        # Letting in-flight messages reach the broker.
+        time.sleep(0.5)
+        delivered = broker.messages_received - received
+
+        offered_rate = number * len(feature_names) * arguments.rate_hz
+        delivered_rate = delivered / elapsed
+        period_s = 1.0 / arguments.rate_hz
+        return {
+            'nodes': number,
+            'offered_msg_s': offered_rate,
+            'notified_msg_s': simulator.notifications / elapsed,
+            'delivered_msg_s': delivered_rate,
+            'max_notification_lag_s': simulator.max_lag_s,
+            'latency': {
+                'count': latency.get_count(),
+                'mean_s': latency.get_mean(),
+                'p50_s': latency.get_percentile(50),
+                'p90_s': latency.get_percentile(90),
+                'p99_s': latency.get_percentile(99),
+                'max_s': latency.get_max()
+            },
+            'saturated': delivered_rate < SATURATION_RATIO * offered_rate \
+                or simulator.max_lag_s > period_s
+        }
+    finally:
+        gateway.shutdown()
+        if thread is not None:
+            thread.join()
+
+
+# MAIN APPLICATION
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=
+        'Find the saturation point of the gateway engine with virtual BLE '
+        'nodes and a local MQTT broker.')
+    parser.add_argument('--nodes', default='10,50,100',
+        help='comma-separated numbers of virtual nodes '
+            '(default: %(default)s)')
+    parser.add_argument('--features', default='environmental',
+        help='set of features (%s) or comma-separated feature names '
+            '(default: %%(default)s)' % (', '.join(sorted(FEATURE_SETS))))
+    parser.add_argument('--rate-hz', type=float, default=10.0,
+        help='notification rate of each feature (default: %(default)s)')
+    parser.add_argument('--qos', type=int, default=0, choices=[0, 1],
+        help='quality of service of the publications (default: %(default)s)')
+    parser.add_argument('--duration-s', type=float, default=10.0,
+        help='duration of each run (default: %(default)s)')
+    parser.add_argument('--threads', type=int, default=1,
+        help='threads sending the notifications (default: %(default)s)')
+    parser.add_argument('--recording', default=None,
+        help='recording of real samples to replay instead of synthetic ones')
+    parser.add_argument('--stop-at-saturation', action='store_true',
+        help='skip the larger numbers of nodes once saturated')
+    parser.add_argument('--work-dir', default=None,
+        help='directory for certificates and temporary files '
+            '(default: a temporary directory)')
+    parser.add_argument('--output', default='-',
+        help='results file, "-" for the standard output '
+            '(default: %(default)s)')
+    arguments = parser.parse_args(argv)
+
+    work_directory = arguments.work_dir or tempfile.mkdtemp(
+        prefix='edge_st_benchmarks_')
+    certificates = generate_certificates(
+        os.path.join(work_directory, 'certificates'))
+    broker = LocalMQTTBroker(certificates['server_cert'],
+        certificates['server_key'], certificates['ca'])
+    port = broker.start()
+    stub_discovery(certificates['ca'], [[('127.0.0.1', port)]],
+        work_directory)
+    source = RecordedSource(arguments.recording) if arguments.recording \
+        else SyntheticSource(seed=0)
+    Tracer.instance().configure(enabled=True, sample_ratio=0.0)
+    try:
+        greengrass = AWSGreengrass('localhost', certificates['ca'])
+        results = []
+        for number in [int(n) for n in arguments.nodes.split(',')]:
+            print('Benchmarking %d virtual node(s)...' % (number),
+                file=sys.stderr)
+            result = run(
+                greengrass, broker, certificates, source, number, arguments)
+            results.append(result)
+            if result['saturated'] and arguments.stop_at_saturation:
+                break
+        write_results(arguments.output, 'gateway', vars(arguments), results)
+    finally:
+        Tracer.instance().configure(enabled=False)
+        broker.stop()
+        if arguments.work_dir is None:
+            shutil.rmtree(work_directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    try:
+        main(sys.argv[1:])
+    except KeyboardInterrupt:
+        print('Benchmark interrupted.', file=sys.stderr)
+        sys.exit(1)
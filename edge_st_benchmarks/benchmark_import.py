@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+
+# DESCRIPTION
+#
+# This benchmark measures the time needed to import the modules of the SDK in
+# a fresh interpreter, which short-lived tools pay on every start, and checks
+# that importing them does not load heavy dependencies, which the SDK loads on
+# first use only: the MQTT stack and the discovery providers of the AWS IoT
+# SDK, "concurrent.futures", "http.server", and "multiprocessing".
+#
+# Each module is imported a number of times, each time in a new interpreter;
+# the exit status is "1" if a heavy dependency gets loaded, or if the median
+# import time of a module exceeds the given budget, e.g.:
+#   python benchmark_import.py --budget-ms 50
+#
+# For a breakdown of the import time by module, run e.g.:
+#   python -X importtime -c "import edge_st_sdk.aws.aws_greengrass"
+
+
+# IMPORT
+
+from __future__ import print_function
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+from bench_utils import summarize
+from bench_utils import write_results
+
+
+# CONSTANTS
+
+MODULES = [
+    'edge_st_sdk.edge_client',
+    'edge_st_sdk.utils.metrics',
+    'edge_st_sdk.utils.executor',
+    'edge_st_sdk.aws.aws_client',
+    'edge_st_sdk.aws.aws_greengrass'
+]
+"""Modules whose import is measured."""
+
+HEAVY_MODULES = [
+    'AWSIoTPythonSDK.MQTTLib',
+    'AWSIoTPythonSDK.core.greengrass.discovery.providers',
+    'concurrent.futures',
+    'http.server',
+    'multiprocessing'
+]
+"""Modules that must not be loaded by importing the SDK."""
+
+SCRIPT = '''
+import sys
+import json
+import time
+start = time.perf_counter()
+import %s
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    'elapsed_s': elapsed,
+    'heavy_modules': [module for module in %r if module in sys.modules]
+}))
+'''
+"""Script measuring the import of a module, formatted with the module and
+the heavy modules."""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+"""Root of the source checkout."""
+
+
+# FUNCTIONS
+
+def measure(module, repetitions):
+    """Import a module repeatedly, each time in a new interpreter.
+
+    :returns: The import times in seconds, and the heavy modules loaded.
+    :rtype: tuple
+    """
+    environment = dict(os.environ)
+    environment['PYTHONPATH'] = os.pathsep.join(
+        [ROOT] + [path for path in [environment.get('PYTHONPATH')] if path])
+    times = []
+    heavy_modules = set()
+    for _ in range(repetitions):
+        output = subprocess.check_output(
+            [sys.executable, '-c', SCRIPT % (module, HEAVY_MODULES)],
+            env=environment)
+        result = json.loads(output.decode('utf-8'))
+        times.append(result['elapsed_s'])
+        heavy_modules.update(result['heavy_modules'])
+    return times, sorted(heavy_modules)
+
+
+# MAIN APPLICATION
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=
+        'Measure the import time of the SDK, and check that heavy '
+        'dependencies are loaded on first use only.')
+    parser.add_argument('--modules', default=','.join(MODULES),
+        help='comma-separated modules to import (default: %(default)s)')
+    parser.add_argument('--repetitions', type=int, default=10,
+        help='imports of each module (default: %(default)s)')
+    parser.add_argument('--budget-ms', type=float, default=None,
+        help='maximum median import time of each module')
+    parser.add_argument('--output', default='-',
+        help='results file, "-" for the standard output '
+            '(default: %(default)s)')
+    arguments = parser.parse_args(argv)
+
+    results = []
+    failed = False
+    for module in arguments.modules.split(','):
+        print('Importing %s...' % (module), file=sys.stderr)
+        times, heavy_modules = measure(module, arguments.repetitions)
+        summary = summarize(times)
+        within_budget = arguments.budget_ms is None \
+            or summary['p50_s'] * 1000 <= arguments.budget_ms
+        results.append({
+            'module': module,
+            'import': summary,
+            'heavy_modules': heavy_modules,
+            'within_budget': within_budget
+        })
+        if heavy_modules:
+            print('Importing "%s" loads %s.' \
+                % (module, ', '.join(heavy_modules)), file=sys.stderr)
+        if not within_budget:
+            print('Importing "%s" takes %.1f ms.' \
+                % (module, summary['p50_s'] * 1000), file=sys.stderr)
+        failed = failed or bool(heavy_modules) or not within_budget
+    write_results(arguments.output, 'import', vars(arguments), results)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    try:
+        sys.exit(main(sys.argv[1:]))
+    except KeyboardInterrupt:
+        print('Benchmark interrupted.', file=sys.stderr)
+        sys.exit(1)
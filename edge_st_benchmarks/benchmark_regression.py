@@ -0,0 +1,362 @@
+#!/usr/bin/env python
+
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+
+# DESCRIPTION
+#
+# This harness catches performance regressions of the SDK. It runs a set of
+# microbenchmarks and macrobenchmarks repeatedly against a local MQTT broker
+# with a stubbed discovery, computes the mean of each metric with its 95%
+# confidence interval, and compares the results against a stored baseline.
+#
+# Metrics are times, so lower is better:
+#   - "serialization_us": encoding a feature sample as JSON, as the examples
+#     do;
+#   - "update_status_fanout_us": delivering a status change of a client to
+#     its listeners;
+#   - "publish_qos0_us": publishing a message with quality of service "0";
+#   - "publish_qos1_ms": publishing a message with quality of service "1",
+#     until acknowledged;
+#   - "connect_ms": obtaining and connecting a client.
+#
+# A metric regresses when its mean exceeds the baseline's one by more than the
+# threshold, and the two confidence intervals do not overlap, so that noise
+# alone does not fail a run. The exit status is "1" if any metric regresses.
+#
+# Record a baseline on the reference machine, then compare against it, e.g.:
+#   python benchmark_regression.py --save-baseline baseline.json
+#   python benchmark_regression.py --baseline baseline.json --threshold 0.1
+
+
+# IMPORT
+
+from __future__ import print_function
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+
+from bench_utils import generate_certificates
+from bench_utils import get_confidence_interval
+from bench_utils import get_environment
+from bench_utils import stub_discovery
+from bench_utils import write_results
+from mqtt_broker import LocalMQTTBroker
+
+from edge_st_sdk.aws.aws_greengrass import AWSGreengrass
+from edge_st_sdk.edge_client import EdgeClientListener
+from edge_st_sdk.edge_client import EdgeClientStatus
+
+
+# CONSTANTS
+
+TOPIC = 'edge_st_benchmarks/%s/data'
+"""Topic of the published messages, formatted with the client name."""
+
+TIMEOUT_s = 60
+"""Timeout of each measurement."""
+
+LISTENERS = 16
+"""Number of listeners of the client whose status changes."""
+
+# INTERFACES
+
+#
+# Client listener counting the status changes it is notified of.
+#
+class MyClientListener(EdgeClientListener):
+
+    def __init__(self, barrier):
+        super(MyClientListener, self).__init__()
+        self._barrier = barrier
+
+    def on_status_change(self, client, new_status, old_status):
+        self._barrier.notify()
+
+
+#
+# Countdown of the listeners still to be notified of a status change.
+#
+class Countdown(object):
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._count = 0
+
+    def reset(self, count):
+        with self._condition:
+            self._count = count
+
+    def notify(self):
+        with self._condition:
+            self._count -= 1
+            if self._count <= 0:
+                self._condition.notify_all()
+
+    def wait(self, timeout_s):
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self._count <= 0, timeout_s)
+
+
+# FUNCTIONS
+
+def time_per_operation(function, operations, scale):
+    """Time a batch of operations.
+
+    :returns: The mean time of an operation, multiplied by the scale.
+    :rtype: float
+    """
+    start = time.perf_counter()
+    for _ in range(operations):
+        function()
+    return (time.perf_counter() - start) / operations * scale
+
+def bench_serialization(context, operations):
+    sample = {'timestamp': 12345, 'data': [-12, 1024, 978]}
+    return time_per_operation(
+        lambda: json.dumps({'Accelerometer': sample}), operations, 1e6)
+
+def bench_update_status_fanout(context, operations):
+    client = context['idle_client']
+    countdown = context['countdown']
+    statuses = [EdgeClientStatus.IDLE, EdgeClientStatus.UNREACHABLE]
+    index = [0]
+
+    def change_status():
+        index[0] += 1
+        countdown.reset(LISTENERS)
+        client._update_status(statuses[index[0] % 2])
+        if not countdown.wait(TIMEOUT_s):
+            raise RuntimeError('Timeout notifying the listeners.')
+
+    return time_per_operation(change_status, operations, 1e6)
+
+def bench_publish_qos0(context, operations):
+    client = context['client']
+    topic = TOPIC % (client.get_name())
+    received = context['broker'].messages_received
+    result = time_per_operation(
+        lambda: client.publish(topic, '{"data": 0}', 0), operations, 1e6)
+    # Draining the messages, not to load the next measurement.
+    deadline = time.time() + TIMEOUT_s
+    while context['broker'].messages_received - received < operations \
+        and time.time() < deadline:
+        time.sleep(0.001)
+    return result
+
+def bench_publish_qos1(context, operations):
+    client = context['client']
+    topic = TOPIC % (client.get_name())
+    return time_per_operation(
+        lambda: client.publish(topic, '{"data": 0}', 1), operations, 1e3)
+
+def bench_connect(context, operations):
+    greengrass = context['greengrass']
+    certificates = context['certificates']
+    clients = []
+
+    def connect():
+        client = greengrass.get_client(
+            'regression_%d' % (len(clients)),
+            certificates['client_cert'], certificates['client_key'])
+        clients.append(client)
+        if not client.connect():
+            raise RuntimeError('Client "%s" could not connect.' \
+                % (client.get_name()))
+
+    try:
+        return time_per_operation(connect, operations, 1e3)
+    finally:
+        for client in clients:
+            client.disconnect()
+
+BENCHMARKS = [
+    ('serialization_us', 'micro', bench_serialization, 10000),
+    ('update_status_fanout_us', 'micro', bench_update_status_fanout, 500),
+    ('publish_qos0_us', 'micro', bench_publish_qos0, 1000),
+    ('publish_qos1_ms', 'macro', bench_publish_qos1, 100),
+    ('connect_ms', 'macro', bench_connect, 3)
+]
+"""Benchmarks, as (metric, kind, function, operations per repetition)
+tuples."""
+
+def run(context, arguments):
+    """Run the benchmarks repeatedly.
+
+    :returns: The mean, the confidence interval and the samples of each
+        metric.
+    :rtype: dict
+    """
+    results = {}
+    for metric, kind, function, operations in BENCHMARKS:
+        if arguments.only and arguments.only != kind:
+            continue
+        print('Benchmarking %s...' % (metric), file=sys.stderr)
+        # Warming up.
+        function(context, max(1, operations // 10))
+        samples = [function(context, operations) \
+            for _ in range(arguments.repetitions)]
+        mean, low, high = get_confidence_interval(samples)
+        results[metric] = {
+            'mean': mean,
+            'ci_low': low,
+            'ci_high': high,
+            'samples': samples
+        }
+    return results
+
+def compare(results, baseline, threshold):
+    """Compare the results against a baseline.
+
+    :returns: The comparison of each metric, and whether any of them
+        regressed.
+    :rtype: tuple
+    """
+    comparison = {}
+    regressed = False
+    for metric, result in sorted(results.items()):
+        reference = baseline.get(metric)
+        if reference is None:
+            comparison[metric] = {'status': 'new'}
+            continue
+        change = (result['mean'] - reference['mean']) / reference['mean']
+        if change > threshold and result['ci_low'] > reference['ci_high']:
+            status = 'regressed'
+            regressed = True
+        elif change < -threshold and result['ci_high'] < reference['ci_low']:
+            status = 'improved'
+        else:
+            status = 'unchanged'
+        comparison[metric] = {
+            'status': status,
+            'change': change,
+            'baseline_mean': reference['mean']
+        }
+    return comparison, regressed
+
+
+# MAIN APPLICATION
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=
+        'Run the performance regression benchmarks of the SDK and compare '
+        'them against a stored baseline.')
+    parser.add_argument('--repetitions', type=int, default=10,
+        help='repetitions of each benchmark (default: %(default)s)')
+    parser.add_argument('--only', default=None, choices=['micro', 'macro'],
+        help='run the microbenchmarks or the macrobenchmarks only')
+    parser.add_argument('--baseline', default=None,
+        help='baseline to compare the results against')
+    parser.add_argument('--save-baseline', default=None,
+        help='file where the results are stored as a new baseline')
+    parser.add_argument('--threshold', type=float, default=0.1,
+        help='relative slowdown of a metric considered a regression '
+            '(default: %(default)s)')
+    parser.add_argument('--work-dir', default=None,
+        help='directory for certificates and temporary files '
+            '(default: a temporary directory)')
+    parser.add_argument('--output', default='-',
+        help='results file, "-" for the standard output '
+            '(default: %(default)s)')
+    arguments = parser.parse_args(argv)
+    if arguments.repetitions < 2:
+        parser.error('at least two repetitions are needed.')
+
+    baseline = None
+    if arguments.baseline:
+        with open(arguments.baseline, 'r') as baseline_file:
+            baseline = json.load(baseline_file)['metrics']
+
+    work_directory = arguments.work_dir or tempfile.mkdtemp(
+        prefix='edge_st_benchmarks_')
+    certificates = generate_certificates(
+        os.path.join(work_directory, 'certificates'))
+    broker = LocalMQTTBroker(certificates['server_cert'],
+        certificates['server_key'], certificates['ca'])
+    port = broker.start()
+    stub_discovery(certificates['ca'], [[('127.0.0.1', port)]],
+        work_directory)
+    client = None
+    try:
+        greengrass = AWSGreengrass('localhost', certificates['ca'])
+        client = greengrass.get_client('regression',
+            certificates['client_cert'], certificates['client_key'])
+        if not client.connect():
+            raise RuntimeError('Client "regression" could not connect.')
+        idle_client = greengrass.get_client('regression_idle',
+            certificates['client_cert'], certificates['client_key'])
+        countdown = Countdown()
+        for _ in range(LISTENERS):
+            idle_client.add_listener(MyClientListener(countdown))
+        context = {
+            'broker': broker,
+            'certificates': certificates,
+            'greengrass': greengrass,
+            'client': client,
+            'idle_client': idle_client,
+            'countdown': countdown
+        }
+        results = run(context, arguments)
+    finally:
+        if client is not None:
+            client.disconnect()
+        broker.stop()
+        if arguments.work_dir is None:
+            shutil.rmtree(work_directory, ignore_errors=True)
+
+    regressed = False
+    document = {'metrics': results}
+    if baseline is not None:
+        document['comparison'], regressed = compare(
+            results, baseline, arguments.threshold)
+    write_results(arguments.output, 'regression', vars(arguments), document)
+    if arguments.save_baseline:
+        with open(arguments.save_baseline, 'w') as baseline_file:
+            json.dump({'environment': get_environment(), 'metrics': results},
+                baseline_file, indent=2, sort_keys=True)
+            baseline_file.write('\n')
+    for metric, comparison in sorted(document.get('comparison', {}).items()):
+        if comparison['status'] == 'regressed':
+            print('Regression of "%s": %+.1f%% over the baseline.' \
+                % (metric, comparison['change'] * 100), file=sys.stderr)
+    return 1 if regressed else 0
+
+
+if __name__ == '__main__':
+    try:
+        sys.exit(main(sys.argv[1:]))
+    except KeyboardInterrupt:
+        print('Benchmark interrupted.', file=sys.stderr)
+        sys.exit(1)
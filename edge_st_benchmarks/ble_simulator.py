@@ -0,0 +1,415 @@
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+
+"""ble_simulator
+
+The ble_simulator module defines virtual Bluetooth Low Energy nodes standing
+in for physical "BlueST" devices. Virtual nodes build the same notification
+packets as physical ones (a 16-bit wrapping timestamp followed by the feature
+data) and pass them to genuine BlueST SDK features, which decode them and
+notify their :class:`blue_st_sdk.feature.FeatureListener` objects as usual;
+the application pipeline hence runs unmodified.
+
+Samples are either synthetic or replayed from a recording made on a real
+gateway through a :class:`edge_st_benchmarks.ble_simulator.SampleRecorder`.
+"""
+
+
+# IMPORT
+
+import json
+import math
+import heapq
+import hashlib
+import random
+import struct
+import threading
+import time
+import binascii
+from collections import deque
+
+from blue_st_sdk.feature import FeatureLogger
+from blue_st_sdk.features.feature_switch import FeatureSwitch
+from blue_st_sdk.features.feature_temperature import FeatureTemperature
+from blue_st_sdk.features.feature_humidity import FeatureHumidity
+from blue_st_sdk.features.feature_pressure import FeaturePressure
+from blue_st_sdk.features.feature_accelerometer import FeatureAccelerometer
+from blue_st_sdk.features.feature_gyroscope import FeatureGyroscope
+from blue_st_sdk.features.feature_magnetometer import FeatureMagnetometer
+
+
+# CONSTANTS
+
+FEATURES = {
+    'switch': FeatureSwitch,
+    'temperature': FeatureTemperature,
+    'humidity': FeatureHumidity,
+    'pressure': FeaturePressure,
+    'accelerometer': FeatureAccelerometer,
+    'gyroscope': FeatureGyroscope,
+    'magnetometer': FeatureMagnetometer
+}
+"""Simulated features, indexed by name."""
+
+FEATURE_SETS = {
+    'switch': ['switch'],
+    'environmental': ['temperature', 'humidity', 'pressure'],
+    'imu': ['accelerometer', 'gyroscope', 'magnetometer']
+}
+"""Predefined sets of features."""
+
+
+# CLASSES
+
+class SyntheticSource(object):
+    """Source of synthetic feature data, i.e. slowly varying values with some
+    noise, encoded as the BlueST protocol does."""
+
+    def __init__(self, seed=None):
+        """Constructor.
+
+        :param seed: Seed of the random generator, for reproducible runs.
+        :type seed: int
+        """
+        self._random = random.Random(seed)
+
+    def get_data(self, feature_name, index):
+        """Get the data of a sample.
+
+        :param feature_name: Name of the feature, among the keys of
+            :data:`FEATURES`.
+        :type feature_name: str
+
+        :param index: Index of the sample.
+        :type index: int
+
+        :returns: The raw data of the feature, without timestamp.
+        :rtype: bytes
+        """
+        noise = self._random.uniform(-1.0, 1.0)
+        wave = math.sin(index / 100.0)
+        if feature_name == 'switch':
+            return struct.pack('<B', (index // 10) % 2)
+        if feature_name == 'temperature':
+            return struct.pack('<h', int((25.0 + 5.0 * wave + noise) * 10))
+        if feature_name == 'humidity':
+            return struct.pack('<h', int((50.0 + 10.0 * wave + noise) * 10))
+        if feature_name == 'pressure':
+            return struct.pack('<i', int((1013.0 + 2.0 * wave + noise) * 100))
+        if feature_name == 'accelerometer':
+            return struct.pack('<3h', int(100 * wave + 10 * noise),
+                int(-100 * wave), int(1000 + 10 * noise))
+        if feature_name == 'gyroscope':
+            return struct.pack('<3h', int(50 * wave * 10),
+                int(10 * noise * 10), int(-50 * wave * 10))
+        if feature_name == 'magnetometer':
+            return struct.pack('<3h', int(300 * wave), int(200 + 5 * noise),
+                int(-400 * wave))
+        raise KeyError(feature_name)
+
+
+class RecordedSource(object):
+    """Source of feature data replayed in loop from a recording, i.e. a file
+    with one JSON object per line with the "feature" name and the hexadecimal
+    raw "data", as written by
+    :class:`edge_st_benchmarks.ble_simulator.SampleRecorder`."""
+
+    def __init__(self, path):
+        """Constructor.
+
+        :param path: Path of the recording.
+        :type path: str
+        """
+        self._data = {}
+        with open(path) as recording:
+            for line in recording:
+                if line.strip():
+                    record = json.loads(line)
+                    self._data.setdefault(record['feature'], []).append(
+                        binascii.unhexlify(record['data']))
+
+    def get_data(self, feature_name, index):
+        """Get the data of a sample.
+
+        :param feature_name: Name of the feature.
+        :type feature_name: str
+
+        :param index: Index of the sample.
+        :type index: int
+
+        :returns: The raw data of the feature, without timestamp.
+        :rtype: bytes
+        """
+        data = self._data[feature_name]
+        return data[index % len(data)]
+
+
+class SampleRecorder(FeatureLogger):
+    """Feature logger recording the raw data of real features, to be added to
+    the features of physical nodes through
+    :meth:`blue_st_sdk.feature.Feature.add_logger` and replayed afterwards
+    through a :class:`edge_st_benchmarks.ble_simulator.RecordedSource`."""
+
+    def __init__(self, path):
+        """Constructor.
+
+        :param path: Path of the recording, to which samples are appended.
+        :type path: str
+        """
+        self._file = open(path, 'a')
+        self._lock = threading.Lock()
+
+    def log_update(self, feature, raw_data, sample):
+        name = [key for key, feature_class in FEATURES.items() \
+            if isinstance(feature, feature_class)]
+        if not name or raw_data is None:
+            return
+        with self._lock:
+            self._file.write(json.dumps({
+                'feature': name[0],
+                'timestamp': sample.get_timestamp(),
+                'data': binascii.hexlify(bytes(raw_data)).decode('ascii')
+            }) + '\n')
+
+    def close(self):
+        """Close the recording."""
+        with self._lock:
+            self._file.close()
+
+
+class VirtualNode(object):
+    """Virtual node exporting genuine BlueST SDK features, offering the subset
+    of the :class:`blue_st_sdk.node.Node` interface used by applications and
+    by :class:`edge_st_sdk.gateway.gateway.Gateway` to connect nodes, get
+    features, read and write them, and wait for notifications.
+
+    Notifications are either sent right away by :meth:`notify`, or received by
+    :meth:`receive` and dispatched by the thread waiting for them through
+    :meth:`wait_for_notifications`, as with physical nodes."""
+
+    def __init__(self, name, feature_names, rate_hz, source):
+        """Constructor.
+
+        :param name: Name of the node.
+        :type name: str
+
+        :param feature_names: Names of the exported features, among the keys of
+            :data:`FEATURES`.
+        :type feature_names: list
+
+        :param rate_hz: Notification rate of each feature, in Hz.
+        :type rate_hz: float
+
+        :param source: Source of the feature data.
+        :type source: :class:`edge_st_benchmarks.ble_simulator.SyntheticSource`
+        """
+        self._name = name
+        self._tag = ':'.join(['%02x' % (byte) for byte in \
+            hashlib.md5(name.encode('utf-8')).digest()[:6]])
+        self._features = [(feature_name, FEATURES[feature_name](self)) \
+            for feature_name in feature_names]
+        self._period_s = 1.0 / rate_hz
+        self._source = source
+        self._index = 0
+        self._received = deque()
+        self._condition = threading.Condition()
+        self.written = {}
+        """Data written to the features, indexed by feature name."""
+        for _, feature in self._features:
+            feature.set_enable(True)
+            feature.set_notify(True)
+
+    def get_name(self):
+        return self._name
+
+    def get_tag(self):
+        return self._tag
+
+    def get_features(self, feature_class=None):
+        return [feature for _, feature in self._features \
+            if feature_class is None or isinstance(feature, feature_class)]
+
+    def get_feature(self, feature_class):
+        features = self.get_features(feature_class)
+        return features[0] if features else None
+
+    def read_feature(self, feature):
+        pass
+
+    def write_feature(self, feature, data):
+        self.written[feature.get_name()] = data
+
+    def enable_notifications(self, feature):
+        feature.set_notify(True)
+        return True
+
+    def disable_notifications(self, feature):
+        feature.set_notify(False)
+        return True
+
+    def connect(self):
+        return True
+
+    def disconnect(self):
+        pass
+
+    def is_connected(self):
+        return True
+
+    def wait_for_notifications(self, timeout_s):
+        with self._condition:
+            if not self._received:
+                self._condition.wait(timeout_s)
+            indexes = list(self._received)
+            self._received.clear()
+        for index in indexes:
+            self._dispatch(index)
+        return bool(indexes)
+
+    def get_period_s(self):
+        return self._period_s
+
+    def notify(self):
+        """Send a notification for each feature, as the BLE stack would do,
+        i.e. by updating the features with the received packets.
+
+        :returns: The number of notifications sent.
+        :rtype: int
+        """
+        notifications = self._dispatch(self._index)
+        self._index += 1
+        return notifications
+
+    def receive(self):
+        """Receive a notification for each feature, to be sent by the thread
+        waiting for notifications through :meth:`wait_for_notifications`.
+
+        :returns: The number of notifications received.
+        :rtype: int
+        """
+        notifications = len([feature for _, feature in self._features \
+            if feature.is_notifying()])
+        with self._condition:
+            self._received.append(self._index)
+            self._condition.notify()
+        self._index += 1
+        return notifications
+
+    def _dispatch(self, index):
+        """Update the notifying features with the packets of a notification.
+
+        :returns: The number of notifications sent.
+        :rtype: int
+        """
+        notifications = 0
+        for feature_name, feature in self._features:
+            if not feature.is_notifying():
+                continue
+            packet = struct.pack('<H', index & 0xFFFF) \
+                + self._source.get_data(feature_name, index)
+            # Passing the unwrapped timestamp, as physical nodes do.
+            feature.update(index, packet, 2, True)
+            notifications += 1
+        return notifications
+
+
+class NodeSimulator(object):
+    """Class responsible for making virtual nodes notify at their rates, on a
+    configurable number of threads. Each node gets a random phase, so that
+    notifications of different nodes are not synchronized."""
+
+    def __init__(self, nodes, threads=1, seed=None, queued=False):
+        """Constructor.
+
+        :param nodes: Virtual nodes.
+        :type nodes: list
+
+        :param threads: Number of threads sending the notifications.
+        :type threads: int
+
+        :param seed: Seed of the random generator of the phases.
+        :type seed: int
+
+        :param queued: Whether notifications are queued on the nodes, to be
+            sent by the threads waiting for them, as a
+            :class:`edge_st_sdk.gateway.notification_reactor.NotificationReactor`
+            does, rather than sent right away.
+        :type queued: bool
+        """
+        self._nodes = nodes
+        self._queued = queued
+        self._threads_number = max(1, threads)
+        self._random = random.Random(seed)
+        self._running = False
+        self._threads = []
+        self._lock = threading.Lock()
+        self.notifications = 0
+        """Number of notifications sent."""
+        self.max_lag_s = 0.0
+        """Maximum delay of a notification with respect to its schedule."""
+
+    def start(self):
+        """Start sending notifications."""
+        self._running = True
+        start = time.time()
+        for index in range(self._threads_number):
+            schedule = [(start + self._random.uniform(0, node.get_period_s()),
+                position, node) for position, node in \
+                enumerate(self._nodes[index::self._threads_number])]
+            heapq.heapify(schedule)
+            thread = threading.Thread(target=self._run, args=(schedule,),
+                name='ble-simulator-%d' % (index))
+            thread.daemon = True
+            self._threads.append(thread)
+            thread.start()
+
+    def stop(self):
+        """Stop sending notifications."""
+        self._running = False
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _run(self, schedule):
+        notifications = 0
+        max_lag_s = 0.0
+        while self._running and schedule:
+            due, position, node = schedule[0]
+            now = time.time()
+            if due > now:
+                time.sleep(min(due - now, 0.1))
+                continue
+            max_lag_s = max(max_lag_s, now - due)
+            notifications += node.receive() if self._queued \
+                else node.notify()
+            heapq.heapreplace(schedule,
+                (due + node.get_period_s(), position, node))
+        with self._lock:
+            self.notifications += notifications
+            self.max_lag_s = max(self.max_lag_s, max_lag_s)
@@ -0,0 +1,179 @@
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+
+"""discovery_server
+
+The discovery_server module defines a local HTTPS server standing in for the
+AWS Greengrass discovery service, answering
+"GET /greengrass/discover/thing/<thing name>" with a configurable list of
+groups, cores, connectivity information and Certification Authorities.
+
+Fault injection hooks (delays, failed requests, dropped connections) allow to
+exercise the discovery retry logic.
+"""
+
+
+# IMPORT
+
+import ssl
+import json
+import time
+import threading
+from socketserver import ThreadingMixIn
+from http.server import BaseHTTPRequestHandler
+from http.server import HTTPServer
+
+
+# CONSTANTS
+
+DISCOVERY_PATH = '/greengrass/discover/thing/'
+"""Path prefix of the discovery requests."""
+
+
+# CLASSES
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class LocalDiscoveryServer(object):
+    """Local HTTPS discovery responder. As the real service, it requires the
+    clients to authenticate with a certificate signed by the given
+    Certification Authority."""
+
+    def __init__(self, certfile, keyfile, cafile, discovery_json,
+        host='127.0.0.1', port=0):
+        """Constructor.
+
+        :param certfile: Path of the certificate of the server.
+        :type certfile: str
+
+        :param keyfile: Path of the private key of the server.
+        :type keyfile: str
+
+        :param cafile: Path of the Certification Authority of the clients.
+        :type cafile: str
+
+        :param discovery_json: Discovery response, or function taking the thing
+            name and returning the discovery response.
+        :type discovery_json: str
+
+        :param host: Address to listen on.
+        :type host: str
+
+        :param port: TCP port to listen on; 0 picks a free port.
+        :type port: int
+        """
+        self.discovery_json = discovery_json
+        """Discovery response, or function taking the thing name and returning
+        the discovery response."""
+
+        self.requests = 0
+        """Number of requests received."""
+
+        self.delay_s = 0.0
+        """Delay before answering, in seconds."""
+
+        self.failures = 0
+        """Number of next requests to fail."""
+
+        self.failure_status = 503
+        """HTTP status code of failed requests; None closes the connection
+        without answering."""
+
+        server = self
+
+        class DiscoveryHandler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                server._handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(certfile, keyfile)
+        context.load_verify_locations(cafile)
+        context.verify_mode = ssl.CERT_REQUIRED
+        self._http_server = _ThreadingHTTPServer((host, port), DiscoveryHandler)
+        self._http_server.socket = context.wrap_socket(
+            self._http_server.socket, server_side=True)
+        self.host, self.port = self._http_server.server_address[:2]
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start serving requests.
+
+        :returns: The port the server listens on.
+        :rtype: int
+        """
+        thread = threading.Thread(target=self._http_server.serve_forever,
+            name='discovery-server')
+        thread.daemon = True
+        thread.start()
+        return self.port
+
+    def stop(self):
+        """Stop serving requests."""
+        self._http_server.shutdown()
+        self._http_server.server_close()
+
+    def _handle(self, handler):
+        with self._lock:
+            self.requests += 1
+            fail = self.failures > 0
+            if fail:
+                self.failures -= 1
+        if self.delay_s:
+            time.sleep(self.delay_s)
+        if not handler.path.startswith(DISCOVERY_PATH):
+            self._send(handler, 404, json.dumps({'message': 'Not found'}))
+        elif fail:
+            if self.failure_status is None:
+                handler.close_connection = True
+                handler.connection.close()
+            else:
+                self._send(handler, self.failure_status,
+                    json.dumps({'message': 'Injected failure'}))
+        else:
+            thing_name = handler.path[len(DISCOVERY_PATH):]
+            discovery_json = self.discovery_json
+            if callable(discovery_json):
+                discovery_json = discovery_json(thing_name)
+            self._send(handler, 200, discovery_json)
+
+    def _send(self, handler, status, body):
+        data = body.encode('utf-8')
+        handler.send_response(status)
+        handler.send_header('content-type', 'application/json')
+        # The AWS IoT SDK matches the lowercase header only.
+        handler.send_header('content-length', str(len(data)))
+        handler.end_headers()
+        handler.wfile.write(data)
@@ -0,0 +1,456 @@
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+
+"""mqtt_broker
+
+The mqtt_broker module defines a minimal MQTT 3.1.1 broker over TLS, standing
+in for a Greengrass core on the local host. It supports quality of service
+"0" and "1", topic wildcards, and answers the AWS IoT device shadow topics, so
+that the SDK can be benchmarked without any network.
+
+Fault injection hooks (delays, refused connections, dropped
+acknowledgements) allow to exercise the retry and reconnection logic.
+"""
+
+
+# IMPORT
+
+import ssl
+import json
+import time
+import socket
+import struct
+import random
+import threading
+
+
+# CONSTANTS
+
+CONNECT = 1
+CONNACK = 2
+PUBLISH = 3
+PUBACK = 4
+SUBSCRIBE = 8
+SUBACK = 9
+UNSUBSCRIBE = 10
+UNSUBACK = 11
+PINGREQ = 12
+PINGRESP = 13
+DISCONNECT = 14
+
+SHADOW_TOPIC_PREFIX = '$aws/things/'
+"""Prefix of the device shadow topics."""
+
+
+# FUNCTIONS
+
+def topic_matches(topic_filter, topic):
+    """Check whether a topic matches a topic filter with "+" and "#"
+    wildcards.
+
+    :param topic_filter: Topic filter.
+    :type topic_filter: str
+
+    :param topic: Topic name.
+    :type topic: str
+
+    :returns: True if the topic matches the filter, False otherwise.
+    :rtype: bool
+    """
+    filter_levels = topic_filter.split('/')
+    topic_levels = topic.split('/')
+    for i, level in enumerate(filter_levels):
+        if level == '#':
+            return True
+        if i >= len(topic_levels):
+            return False
+        if level != '+' and level != topic_levels[i]:
+            return False
+    return len(filter_levels) == len(topic_levels)
+
+def encode_string(value):
+    """Encode a string as a length-prefixed UTF-8 field."""
+    data = value.encode('utf-8')
+    return struct.pack('!H', len(data)) + data
+
+def encode_packet(packet_type, flags, body):
+    """Encode a packet with its fixed header."""
+    header = bytearray([(packet_type << 4) | flags])
+    length = len(body)
+    while True:
+        byte = length % 128
+        length //= 128
+        header.append(byte | 0x80 if length > 0 else byte)
+        if length == 0:
+            break
+    return bytes(header) + body
+
+
+# CLASSES
+
+class Connection(object):
+    """Connection of a client to the broker."""
+
+    def __init__(self, broker, sock, address):
+        self.broker = broker
+        self.sock = sock
+        self.address = address
+        self.client_id = None
+        self.subscriptions = {}
+        self.write_lock = threading.Lock()
+        self.next_packet_id = 0
+        self.closed = False
+
+    def send(self, packet_type, flags, body):
+        """Send a packet, ignoring errors on closed connections."""
+        data = encode_packet(packet_type, flags, body)
+        with self.write_lock:
+            if self.closed:
+                return
+            try:
+                self.sock.sendall(data)
+            except (OSError, socket.error):
+                self.close()
+
+    def deliver(self, topic, payload, qos):
+        """Forward a message to the client."""
+        body = encode_string(topic)
+        if qos > 0:
+            with self.write_lock:
+                self.next_packet_id = self.next_packet_id % 65535 + 1
+                packet_id = self.next_packet_id
+            body += struct.pack('!H', packet_id)
+        self.send(PUBLISH, qos << 1, body + payload)
+
+    def close(self):
+        """Close the connection."""
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except (OSError, socket.error):
+            pass
+        self.sock.close()
+
+    def read_exactly(self, size):
+        data = b''
+        while len(data) < size:
+            chunk = self.sock.recv(size - len(data))
+            if not chunk:
+                raise EOFError()
+            data += chunk
+        return data
+
+    def read_packet(self):
+        """Read a packet.
+
+        :returns: Type, flags and body of the packet.
+        :rtype: tuple
+        """
+        first = self.read_exactly(1)[0]
+        length = 0
+        multiplier = 1
+        while True:
+            byte = self.read_exactly(1)[0]
+            length += (byte & 0x7F) * multiplier
+            multiplier *= 128
+            if not byte & 0x80:
+                break
+        return first >> 4, first & 0x0F, self.read_exactly(length)
+
+
+class LocalMQTTBroker(object):
+    """Minimal MQTT 3.1.1 broker over TLS, with a thread per connection.
+
+    Clients must present a certificate signed by the given Certification
+    Authority, as with a real Greengrass core.
+    """
+
+    def __init__(self, certfile, keyfile, cafile, host='127.0.0.1', port=0):
+        """Constructor.
+
+        :param certfile: Path of the certificate of the broker.
+        :type certfile: str
+
+        :param keyfile: Path of the private key of the broker.
+        :type keyfile: str
+
+        :param cafile: Path of the Certification Authority of the clients.
+        :type cafile: str
+
+        :param host: Address to listen on.
+        :type host: str
+
+        :param port: TCP port to listen on; 0 picks a free port.
+        :type port: int
+        """
+        self._context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        self._context.load_cert_chain(certfile, keyfile)
+        self._context.load_verify_locations(cafile)
+        self._context.verify_mode = ssl.CERT_REQUIRED
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind((host, port))
+        self.host, self.port = self._server.getsockname()
+        self._lock = threading.Lock()
+        self._received = threading.Condition(self._lock)
+        self._connections = []
+        self._shadows = {}
+        self._running = False
+
+        # Statistics.
+        self.connections_accepted = 0
+        self.messages_received = 0
+
+        # Fault injection.
+        self.connack_delay_s = 0.0
+        """Delay before acknowledging connections, in seconds."""
+
+        self.puback_delay_s = 0.0
+        """Delay before acknowledging publications, in seconds."""
+
+        self.puback_drop_ratio = 0.0
+        """Ratio of publications, between 0 and 1, never acknowledged."""
+
+        self.refuse_connections = False
+        """Whether to close new connections right after accepting them."""
+
+    def start(self):
+        """Start accepting connections.
+
+        :returns: The port the broker listens on.
+        :rtype: int
+        """
+        self._running = True
+        self._server.listen(128)
+        thread = threading.Thread(target=self._accept, name='broker-accept')
+        thread.daemon = True
+        thread.start()
+        return self.port
+
+    def stop(self):
+        """Stop the broker and close all the connections."""
+        self._running = False
+        try:
+            self._server.close()
+        except (OSError, socket.error):
+            pass
+        self.drop_connections()
+
+    def wait_for_messages(self, count, timeout_s):
+        """Wait until the given number of messages has been received since
+        the broker started.
+
+        :param count: Number of messages to wait for.
+        :type count: int
+
+        :param timeout_s: Timeout in seconds.
+        :type timeout_s: float
+
+        :returns: True if the messages have been received, False on timeout.
+        :rtype: bool
+        """
+        deadline = time.time() + timeout_s
+        with self._lock:
+            while self.messages_received < count:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                self._received.wait(remaining)
+        return True
+
+    def drop_connections(self):
+        """Abruptly close all the connections, e.g. to simulate a core
+        restart."""
+        with self._lock:
+            connections = list(self._connections)
+        for connection in connections:
+            connection.close()
+
+    def get_connected_clients(self):
+        """Get the identifiers of the connected clients.
+
+        :returns: The identifiers of the connected clients.
+        :rtype: list
+        """
+        with self._lock:
+            return [connection.client_id for connection in self._connections \
+                if connection.client_id is not None]
+
+    def _accept(self):
+        while self._running:
+            try:
+                sock, address = self._server.accept()
+            except (OSError, socket.error):
+                return
+            if self.refuse_connections:
+                sock.close()
+                continue
+            thread = threading.Thread(
+                target=self._serve, args=(sock, address), name='broker-client')
+            thread.daemon = True
+            thread.start()
+
+    def _serve(self, sock, address):
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock = self._context.wrap_socket(sock, server_side=True)
+        except (OSError, socket.error, ssl.SSLError):
+            sock.close()
+            return
+        connection = Connection(self, sock, address)
+        with self._lock:
+            self._connections.append(connection)
+            self.connections_accepted += 1
+        try:
+            while not connection.closed:
+                packet_type, flags, body = connection.read_packet()
+                if packet_type == CONNECT:
+                    self._on_connect(connection, body)
+                elif packet_type == PUBLISH:
+                    self._on_publish(connection, flags, body)
+                elif packet_type == SUBSCRIBE:
+                    self._on_subscribe(connection, body)
+                elif packet_type == UNSUBSCRIBE:
+                    self._on_unsubscribe(connection, body)
+                elif packet_type == PINGREQ:
+                    connection.send(PINGRESP, 0, b'')
+                elif packet_type == DISCONNECT:
+                    break
+        except (EOFError, OSError, socket.error, ssl.SSLError, IndexError):
+            pass
+        finally:
+            connection.close()
+            with self._lock:
+                if connection in self._connections:
+                    self._connections.remove(connection)
+
+    def _on_connect(self, connection, body):
+        protocol_length = struct.unpack('!H', body[:2])[0]
+        offset = 2 + protocol_length + 4
+        client_id_length = struct.unpack('!H', body[offset:offset + 2])[0]
+        connection.client_id = body[offset + 2:offset + 2 + client_id_length] \
+            .decode('utf-8')
+        # Taking over the sessions with the same client identifier.
+        with self._lock:
+            previous = [other for other in self._connections \
+                if other is not connection \
+                and other.client_id == connection.client_id]
+        for other in previous:
+            other.close()
+        if self.connack_delay_s:
+            time.sleep(self.connack_delay_s)
+        connection.send(CONNACK, 0, b'\x00\x00')
+
+    def _on_publish(self, connection, flags, body):
+        qos = (flags >> 1) & 0x03
+        topic_length = struct.unpack('!H', body[:2])[0]
+        topic = body[2:2 + topic_length].decode('utf-8')
+        offset = 2 + topic_length
+        if qos > 0:
+            packet_id = body[offset:offset + 2]
+            offset += 2
+        payload = body[offset:]
+        with self._lock:
+            self.messages_received += 1
+            self._received.notify_all()
+        if qos > 0 and random.random() >= self.puback_drop_ratio:
+            if self.puback_delay_s:
+                time.sleep(self.puback_delay_s)
+            connection.send(PUBACK, 0, packet_id)
+        if topic.startswith(SHADOW_TOPIC_PREFIX):
+            self._on_shadow_request(topic, payload)
+        self._route(topic, payload, qos)
+
+    def _route(self, topic, payload, qos):
+        with self._lock:
+            connections = list(self._connections)
+        for connection in connections:
+            granted = None
+            for topic_filter, subscription_qos in \
+                list(connection.subscriptions.items()):
+                if topic_matches(topic_filter, topic):
+                    granted = max(granted or 0, subscription_qos)
+            if granted is not None:
+                connection.deliver(topic, payload, min(qos, granted))
+
+    def _on_shadow_request(self, topic, payload):
+        """Answer a device shadow request on the "accepted" topic."""
+        levels = topic.split('/')
+        if len(levels) != 5 or levels[3] != 'shadow' \
+            or levels[4] not in ['get', 'update', 'delete']:
+            return
+        thing, operation = levels[2], levels[4]
+        try:
+            request = json.loads(payload.decode('utf-8')) if payload else {}
+        except ValueError:
+            request = {}
+        with self._lock:
+            shadow = self._shadows.setdefault(
+                thing, {'state': {}, 'version': 0})
+            if operation == 'update':
+                for section, values in request.get('state', {}).items():
+                    shadow['state'].setdefault(section, {}).update(values or {})
+                shadow['version'] += 1
+            elif operation == 'delete':
+                self._shadows.pop(thing)
+            response = {
+                'version': shadow['version'],
+                'timestamp': int(time.time())
+            }
+            if operation != 'delete':
+                response['state'] = shadow['state']
+        if 'clientToken' in request:
+            response['clientToken'] = request['clientToken']
+        self._route('%s/accepted' % (topic),
+            json.dumps(response).encode('utf-8'), 0)
+
+    def _on_subscribe(self, connection, body):
+        packet_id = body[:2]
+        offset = 2
+        granted = bytearray()
+        while offset < len(body):
+            length = struct.unpack('!H', body[offset:offset + 2])[0]
+            topic_filter = body[offset + 2:offset + 2 + length].decode('utf-8')
+            qos = min(body[offset + 2 + length], 1)
+            offset += 3 + length
+            connection.subscriptions[topic_filter] = qos
+            granted.append(qos)
+        connection.send(SUBACK, 0, packet_id + bytes(granted))
+
+    def _on_unsubscribe(self, connection, body):
+        packet_id = body[:2]
+        offset = 2
+        while offset < len(body):
+            length = struct.unpack('!H', body[offset:offset + 2])[0]
+            connection.subscriptions.pop(
+                body[offset + 2:offset + 2 + length].decode('utf-8'), None)
+            offset += 2 + length
+        connection.send(UNSUBACK, 0, packet_id)
@@ -85,6 +85,7 @@ from edge_st_sdk.aws.aws_greengrass import AWSGreengrassListener
 from edge_st_sdk.aws.aws_client import AWSClient
 from edge_st_sdk.edge_client import EdgeClientListener
 from edge_st_sdk.utils.edge_st_exceptions import EdgeSTInvalidOperationException
+from edge_st_sdk.utils.snapshot import Snapshot
 
 
 # PRECONDITIONS
@@ -393,14 +394,14 @@ class MyFeatureSensorsListener(FeatureListener):
 
         # Getting value.
         if isinstance(feature, feature_pressure.FeaturePressure):
-            self._data[FeaturesIndex.PRESSURE.value] = \
-                feature_pressure.FeaturePressure.get_pressure(sample)
+            self._data.write(FeaturesIndex.PRESSURE.value,
+                feature_pressure.FeaturePressure.get_pressure(sample))
         elif isinstance(feature, feature_humidity.FeatureHumidity):
-            self._data[FeaturesIndex.HUMIDITY.value] = \
-                feature_humidity.FeatureHumidity.get_humidity(sample)
+            self._data.write(FeaturesIndex.HUMIDITY.value,
+                feature_humidity.FeatureHumidity.get_humidity(sample))
         elif isinstance(feature, feature_temperature.FeatureTemperature):
-            self._data[FeaturesIndex.TEMPERATURE.value] = \
-                feature_temperature.FeatureTemperature.get_temperature(sample)
+            self._data.write(FeaturesIndex.TEMPERATURE.value,
+                feature_temperature.FeatureTemperature.get_temperature(sample))
         elif isinstance(feature, feature_accelerometer.FeatureAccelerometer):
             data[AxesIndex.X.value] = \
                 feature_accelerometer.FeatureAccelerometer.get_accelerometer_x(sample)
@@ -408,7 +409,7 @@ class MyFeatureSensorsListener(FeatureListener):
                 feature_accelerometer.FeatureAccelerometer.get_accelerometer_y(sample)
             data[AxesIndex.Z.value] = \
                 feature_accelerometer.FeatureAccelerometer.get_accelerometer_z(sample)
-            self._data[FeaturesIndex.ACCELEROMETER.value] = data
+            self._data.write(FeaturesIndex.ACCELEROMETER.value, data)
         elif isinstance(feature, feature_gyroscope.FeatureGyroscope):
             data[AxesIndex.X.value] = \
                 feature_gyroscope.FeatureGyroscope.get_gyroscope_x(sample)
@@ -416,7 +417,7 @@ class MyFeatureSensorsListener(FeatureListener):
                 feature_gyroscope.FeatureGyroscope.get_gyroscope_y(sample)
             data[AxesIndex.Z.value] = \
                 feature_gyroscope.FeatureGyroscope.get_gyroscope_z(sample)
-            self._data[FeaturesIndex.GYROSCOPE.value] = data
+            self._data.write(FeaturesIndex.GYROSCOPE.value, data)
         elif isinstance(feature, feature_magnetometer.FeatureMagnetometer):
             data[AxesIndex.X.value] = \
                 feature_magnetometer.FeatureMagnetometer.get_magnetometer_x(sample)
@@ -424,7 +425,7 @@ class MyFeatureSensorsListener(FeatureListener):
                 feature_magnetometer.FeatureMagnetometer.get_magnetometer_y(sample)
             data[AxesIndex.Z.value] = \
                 feature_magnetometer.FeatureMagnetometer.get_magnetometer_z(sample)
-            self._data[FeaturesIndex.MAGNETOMETER.value] = data
+            self._data.write(FeaturesIndex.MAGNETOMETER.value, data)
 
 
 #
@@ -531,7 +532,9 @@ def iot_device_send_data(iot_device_data, iot_device_client, topic):
 
     #print('iot_device_send_data()')
 
-    # Getting data.
+    # Getting data, consistent with each other even if notifications keep
+    # updating the snapshot meanwhile.
+    iot_device_data = iot_device_data.read()
     pressure = iot_device_data[FeaturesIndex.PRESSURE.value]
     humidity = iot_device_data[FeaturesIndex.HUMIDITY.value]
     temperature = iot_device_data[FeaturesIndex.TEMPERATURE.value]
@@ -663,8 +666,8 @@ def main(argv):
     iot_device_2_status = SwitchStatus.OFF
     iot_device_1_act_flag = False
     iot_device_2_act_flag = False
-    iot_device_1_data = [None] * len(FeaturesIndex)
-    iot_device_2_data = [None] * len(FeaturesIndex)
+    iot_device_1_data = Snapshot(len(FeaturesIndex))
+    iot_device_2_data = Snapshot(len(FeaturesIndex))
 
     # Configure logging.
     configure_logging()
@@ -0,0 +1,379 @@
+#!/usr/bin/env python
+
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+
+# DESCRIPTION
+#
+# This application example shows how to connect any number of Bluetooth Low
+# Energy (BLE) devices implementing the "BlueST" protocol to a Linux gateway,
+# and to make them communicate to the Amazon AWS IoT Cloud through the AWS
+# Greengrass edge computing service, without device-specific code.
+#
+# The devices are described by a JSON manifest (see "devices_ble_aws.json"),
+# which maps each device's MAC address to a thing on the cloud, and each of its
+# features to topics and to the device shadow. The provided manifest reproduces
+# the "example_ble_aws_2.py" application example: pressing the user button on a
+# device makes the LED of the other device toggle its status through the
+# "GG_Switch_Lambda.py" lambda function, while data from Pressure, Humidity,
+# Temperature, Accelerometer, Gyroscope, and Magnetometer sensors are sent to
+# the IoT Cloud periodically. Adding a device only requires adding an entry to
+# the manifest.
+
+
+# IMPORT
+
+from __future__ import print_function
+import sys
+import os
+import getopt
+import logging
+
+from bluepy.btle import BTLEException
+
+from blue_st_sdk.manager import Manager
+from blue_st_sdk.manager import ManagerListener
+from blue_st_sdk.node import NodeListener
+
+from edge_st_sdk.aws.aws_greengrass import AWSGreengrass
+from edge_st_sdk.aws.aws_greengrass import AWSGreengrassListener
+from edge_st_sdk.edge_client import EdgeClientListener
+from edge_st_sdk.gateway.device_manifest import DeviceManifest
+from edge_st_sdk.gateway.gateway import Gateway
+from edge_st_sdk.utils.edge_st_exceptions import EdgeSTInvalidDataException
+from edge_st_sdk.utils.edge_st_exceptions import EdgeSTInvalidOperationException
+
+
+# PRECONDITIONS
+#
+# In case you want to modify the SDK, clone the repository and add the location
+# of the "EdgeSTSDK_Python" folder to the "PYTHONPATH" environment variable.
+#
+# On Linux:
+#   export PYTHONPATH=/home/<user>/EdgeSTSDK_Python
+
+
+# CONSTANTS
+
+# Usage message.
+USAGE = """Usage:
+
+Use certificate based mutual authentication:
+python <application>.py -e <endpoint> -r <root_ca_path> [-m <manifest_path>]
+
+"""
+
+# Help message.
+HELP = """-e, --endpoint
+    Your AWS IoT custom endpoint
+-r, --root_ca
+    Root CA file path
+-m, --manifest
+    Devices' manifest file path (default: "devices_ble_aws.json")
+-h, --help
+    Help information
+
+"""
+
+# Presentation message.
+INTRO = """###############################################
+# Edge IoT Example with Amazon Cloud Platform #
+###############################################"""
+
+# Devices' manifest.
+MANIFEST_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'devices_ble_aws.json')
+
+# Timeouts.
+SCANNING_TIME_s = 5
+
+
+# FUNCTIONS
+
+#
+# Printing intro.
+#
+def print_intro():
+    print('\n' + INTRO + '\n')
+
+#
+# Reading input.
+#
+def read_input(argv):
+    global endpoint, root_ca_path, manifest_path
+
+    endpoint = None
+    root_ca_path = None
+    manifest_path = MANIFEST_PATH
+
+    # Reading in command-line parameters.
+    try:
+        opts, args = getopt.getopt(argv, "he:r:m:",
+            ["help", "endpoint=", "root_ca=", "manifest="])
+        if len(opts) == 0:
+            raise getopt.GetoptError("No input parameters. Please try again.")
+        for opt, arg in opts:
+            if opt in ("-h", "--help"):
+                print(HELP)
+                exit(0)
+            if opt in ("-e", "--endpoint"):
+                endpoint = arg
+            if opt in ("-r", "--root_ca"):
+                root_ca_path = arg
+            if opt in ("-m", "--manifest"):
+                manifest_path = arg
+    except getopt.GetoptError:
+        print(USAGE)
+        exit(1)
+
+    # Missing configuration parameters.
+    missing_configuration = False
+    if not endpoint:
+        print("Missing '-e' or '--endpoint'")
+        missing_configuration = True
+    if not root_ca_path:
+        print("Missing '-r' or '--root_ca'")
+        missing_configuration = True
+    if missing_configuration:
+        exit(2)
+
+#
+# Configure logging.
+#
+def configure_logging():
+    logger = logging.getLogger("Demo")
+    logger.setLevel(logging.ERROR)
+    streamHandler = logging.StreamHandler()
+    formatter = logging.Formatter(
+        '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    streamHandler.setFormatter(formatter)
+    logger.addHandler(streamHandler)
+
+
+# INTERFACES
+
+#
+# Implementation of the interface used by the Manager class to notify that a new
+# node has been discovered or that the scanning starts/stops.
+#
+class MyManagerListener(ManagerListener):
+
+    #
+    # This method is called whenever a discovery process starts or stops.
+    #
+    # @param manager Manager instance that starts/stops the process.
+    # @param enabled True if a new discovery starts, False otherwise.
+    #
+    def on_discovery_change(self, manager, enabled):
+        print('Discovery %s.' % ('started' if enabled else 'stopped'))
+        if not enabled:
+            print()
+
+    #
+    # This method is called whenever a new node is discovered.
+    #
+    # @param manager Manager instance that discovers the node.
+    # @param node    New node discovered.
+    #
+    def on_node_discovered(self, manager, node):
+        print('New device discovered: \"%s\".' % (node.get_name()))
+
+
+#
+# Implementation of the interface used by the Node class to notify that a node
+# has updated its status.
+#
+class MyNodeListener(NodeListener):
+
+    #
+    # Constructor.
+    #
+    # @param gateway Gateway handling the node.
+    #
+    def __init__(self, gateway):
+        super(MyNodeListener, self).__init__()
+        self._gateway = gateway
+
+    #
+    # To be called whenever a node connects to a host.
+    #
+    # @param node Node that has connected to a host.
+    #
+    def on_connect(self, node):
+        print('Device %s connected.' % (node.get_name()))
+
+    #
+    # To be called whenever a node disconnects from a host.
+    #
+    # @param node       Node that has disconnected from a host.
+    # @param unexpected True if the disconnection is unexpected, False otherwise
+    #                   (called by the user).
+    #
+    def on_disconnect(self, node, unexpected=False):
+        print('Device %s disconnected%s.' % \
+            (node.get_name(), ' unexpectedly' if unexpected else ''))
+        if unexpected:
+            # Making the main thread stop the gateway and exit, as this method
+            # runs on the thread serving the node.
+            self._gateway.stop()
+
+
+#
+# Implementation of the interface used by the EdgeClient class to notify that a
+# client has updated its status.
+#
+class MyAWSGreengrassListener(AWSGreengrassListener):
+
+    #
+    # To be called whenever the AWS Greengrass service changes its status.
+    #
+    # @param aws_greengrass AWS Greengrass service that has changed its status.
+    # @param new_status     New status.
+    # @param old_status     Old status.
+    #
+    def on_status_change(self, aws_greengrass, new_status, old_status):
+        print('AWS Greengrass service with endpoint \"%s\" from \"%s\" to \"%s\".' %
+            (aws_greengrass.get_endpoint(), str(old_status), str(new_status)))
+
+
+#
+# Implementation of the interface used by the EdgeClient class to notify that a
+# client has updated its status.
+#
+class MyClientListener(EdgeClientListener):
+
+    #
+    # To be called whenever a client changes its status.
+    #
+    # @param client     Client that has changed its status.
+    # @param new_status New status.
+    # @param old_status Old status.
+    #
+    def on_status_change(self, client, new_status, old_status):
+        print('Client \"%s\" from \"%s\" to \"%s\".' %
+            (client.get_name(), str(old_status), str(new_status)))
+
+
+# MAIN APPLICATION
+
+#
+# Main application.
+#
+def main(argv):
+
+    # Global variables.
+    global endpoint, root_ca_path, manifest_path
+
+    # Gateway, once created.
+    gateway = None
+
+    # Configure logging.
+    configure_logging()
+
+    # Printing intro.
+    print_intro()
+
+    # Reading input.
+    read_input(argv)
+
+    try:
+        # Reading the devices' manifest.
+        manifest = DeviceManifest.load(manifest_path)
+
+        # Creating Bluetooth Manager.
+        manager = Manager.instance()
+        manager_listener = MyManagerListener()
+        manager.add_listener(manager_listener)
+
+        # Synchronous discovery of Bluetooth devices.
+        print('Scanning Bluetooth devices...\n')
+        manager.discover(SCANNING_TIME_s)
+
+        # Initializing Edge Computing.
+        edge = AWSGreengrass(endpoint, root_ca_path)
+        edge.add_listener(MyAWSGreengrassListener())
+        gateway = Gateway(edge, manifest)
+        gateway.add_client_listener(MyClientListener())
+
+        # Checking discovered devices.
+        missing_devices = gateway.attach_nodes(manager.get_nodes())
+        for device in missing_devices:
+            print('Device \"%s\" (%s) not found.' % \
+                (device.get_configuration().thing_name,
+                 device.get_configuration().mac))
+        if not gateway.get_attached_devices():
+            print('\nBluetooth setup incomplete. Exiting...\n')
+            sys.exit(0)
+        for device in gateway.get_attached_devices():
+            device.get_node().add_listener(MyNodeListener(gateway))
+
+        # Connecting devices and clients, and wiring features to the cloud.
+        print('\nInitializing Edge Computing...\n')
+        gateway.start()
+        print('\nEdge Computing Initialized.')
+
+        # Demo running.
+        print('\nDemo running (\"CTRL+C\" to quit)...\n')
+
+        # Handling notifications, actuations, and publications, until a device
+        # disconnects unexpectedly.
+        gateway.run()
+
+        # Exiting.
+        print('\nExiting...\n')
+        gateway.shutdown()
+        sys.exit(0)
+
+    except (BTLEException, EdgeSTInvalidOperationException,
+        EdgeSTInvalidDataException) as e:
+        print(e)
+        print('Exiting...\n')
+        if gateway is not None:
+            gateway.shutdown()
+        sys.exit(0)
+    except KeyboardInterrupt:
+        try:
+            # Exiting.
+            print('\nExiting...\n')
+            if gateway is not None:
+                gateway.shutdown()
+            sys.exit(0)
+        except SystemExit:
+            os._exit(0)
+
+
+if __name__ == "__main__":
+
+    try:
+        main(sys.argv[1:])
+    except KeyboardInterrupt:
+        try:
+            sys.exit(0)
+        except SystemExit:
+            os._exit(0)
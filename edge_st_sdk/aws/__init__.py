@@ -1,4 +1,6 @@
 __all__ = [
     'aws_client', \
-    'aws_greengrass'
+    'aws_greengrass', \
+    'aws_health_monitor', \
+    'aws_reconnect_coordinator'
 ]
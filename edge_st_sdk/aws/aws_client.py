@@ -36,14 +36,18 @@ AWS IoT cloud and performing edge operations through the Greengrass SDK.
 # IMPORT
 
 import sys
-from concurrent.futures import ThreadPoolExecutor
-
-from AWSIoTPythonSDK.MQTTLib import AWSIoTMQTTShadowClient
+import time
+import weakref
+import threading
 
 from edge_st_sdk.utils.python_utils import lock
+from edge_st_sdk.utils.event_bus import EventBus
+from edge_st_sdk.utils.executor import SharedExecutor
+from edge_st_sdk.utils.metrics import MetricsRegistry
+from edge_st_sdk.utils.tracing import Tracer
 from edge_st_sdk.edge_client import EdgeClient
 from edge_st_sdk.edge_client import EdgeClientStatus
-import edge_st_sdk.aws.aws_greengrass
+from edge_st_sdk.aws.aws_reconnect_coordinator import AWSReconnectCoordinator
 from edge_st_sdk.utils.edge_st_exceptions import EdgeSTInvalidOperationException
 
 
@@ -56,11 +60,13 @@ class AWSClient(EdgeClient):
     _TIMEOUT_s = 10
     """Timeout for discovering information."""
 
-    _NUMBER_OF_THREADS = 5
-    """Number of threads to be used to notify the listeners."""
+    TERMINAL_STATUSES = (EdgeClientStatus.DISCONNECTED,
+        EdgeClientStatus.UNREACHABLE)
+    """Statuses whose notification is never coalesced into later changes."""
 
     def __init__(self, client_name, device_certificate_path, \
-        device_private_key_path, group_ca_path, core_info):
+        device_private_key_path, group_ca_path, core_info, standby_cores=None,
+        clean_session=True):
         """Constructor.
 
         AWSClient has to be instantiated through a call to the
@@ -85,25 +91,32 @@ class AWSClient(EdgeClient):
             the client belongs.
         :type core_info: list
 
-        :raises EdgeSTInvalidOperationException: is raised if the discovery of
-            the core has not been completed yet, i.e. if the AWSClient has not
+        :param standby_cores: Hot-standby cores to which the client fails over
+            whenever the primary core is not reachable, as a list of
+            (group_ca_path, core_info) tuples.
+        :type standby_cores: list
+
+        :param clean_session: If False, a persistent session is used, so that
+            the core keeps the client's subscriptions and queues the messages
+            with quality of service "1" while the client is disconnected.
+        :type clean_session: bool
+
+        :raises EdgeSTInvalidOperationException: is raised if no information
+            related to the core is available, i.e. if the AWSClient has not
             been instantiated through a call to the
             :meth:`edge_st_sdk.aws.aws_greengrass.AWSGreengrass.get_client`
             method.
         """
-        self._status = EdgeClientStatus.INIT
-        """Status."""
+        super(AWSClient, self).__init__()
 
-        self._thread_pool = ThreadPoolExecutor(AWSClient._NUMBER_OF_THREADS)
-        """Pool of thread used to notify the listeners."""
-
-        self._listeners = []
-        """List of listeners to the feature changes.
-        It is a thread safe list, so a listener can subscribe itself through a
-        callback."""
+        self._listeners = ()
+        """Immutable snapshot of the listeners to the status changes.
+        It is replaced as a whole whenever a listener is added or removed, so
+        that it can be read without locking, and a listener can subscribe
+        itself through a callback."""
 
         # Check the client is created with the right pattern (Builder).
-        if not edge_st_sdk.aws.aws_greengrass.AWSGreengrass.discovery_completed():
+        if core_info is None or group_ca_path is None:
             raise EdgeSTInvalidOperationException('Amazon AWS clients must be ' \
                 'obtained through a call to the \'get_client()\' method of an ' \
                 '\'AWSGreengrass\' object.')
@@ -111,10 +124,20 @@ class AWSClient(EdgeClient):
         # Saving informations.
         self._connected = False
         self._client_name = client_name
+        self._device_certificate_path = device_certificate_path
+        self._device_private_key_path = device_private_key_path
         self._core_info = core_info
+        self._cores = [(group_ca_path, core_info)] + list(standby_cores or [])
+        self._clean_session = clean_session
+        self._subscriptions = {}
+        self._subscribed_topics = set()
+        """Topics subscribed to within the current MQTT session."""
         
-        # Creating a shadow client.
-        self._shadow_client = AWSIoTMQTTShadowClient(client_name)
+        # Creating a shadow client; the MQTT stack is loaded on first use, as
+        # it is expensive to import.
+        from AWSIoTPythonSDK.MQTTLib import AWSIoTMQTTShadowClient
+        self._shadow_client = AWSIoTMQTTShadowClient(
+            client_name, cleanSession=clean_session)
         self._shadow_client.configureCredentials(
             group_ca_path,
             device_private_key_path,
@@ -124,14 +147,127 @@ class AWSClient(EdgeClient):
         self._client = self._shadow_client.getMQTTConnection()
         self._client.configureOfflinePublishQueueing(-1)  # Infinite queueing.
         self._client.configureDrainingFrequency(2)  # Draining: 2 Hz.
+
+        # Coordinating reconnections with the other clients of the process.
+        self._reconnect_coordinator = AWSReconnectCoordinator.instance()
+        self._reconnect_coordinator.install(self._client, self._client_name)
+
+        # Restoring the subscriptions according to the state of the session.
+        self._install_session_tracking()
         
         # Creating a shadow handler with persistent subscription.
         self._shadow_handler = self._shadow_client.createShadowHandlerWithName(
             self._client_name, True)
 
+        # Registering metrics.
+        self._init_metrics()
+
         # Updating client.
         self._update_status(EdgeClientStatus.IDLE)
 
+    def _init_metrics(self):
+        """Register the metrics of the client into the process-wide
+        :class:`edge_st_sdk.utils.metrics.MetricsRegistry`. Has no effect on
+        the metrics already registered."""
+        self._metrics = MetricsRegistry.instance()
+        self._metrics_labels = {'client': self._client_name}
+        labels = self._metrics_labels
+        self._published_messages = self._metrics.counter(
+            'edge_st_sdk_published_messages_total',
+            'Messages published.', labels)
+        self._published_bytes = self._metrics.counter(
+            'edge_st_sdk_published_bytes_total',
+            'Payload bytes published.', labels)
+        self._publish_failures = self._metrics.counter(
+            'edge_st_sdk_publish_failures_total',
+            'Publications failed.', labels)
+        self._queued_messages = self._metrics.counter(
+            'edge_st_sdk_queued_messages_total',
+            'Messages queued while disconnected, rather than sent.', labels)
+        self._publish_latency = self._metrics.histogram(
+            'edge_st_sdk_publish_latency_seconds',
+            'Time between publication and acknowledgement.', labels)
+        self._received_messages = self._metrics.counter(
+            'edge_st_sdk_received_messages_total',
+            'Messages received on subscribed topics.', labels)
+        self._received_bytes = self._metrics.counter(
+            'edge_st_sdk_received_bytes_total',
+            'Payload bytes received on subscribed topics.', labels)
+        self._subscribe_requests = self._metrics.counter(
+            'edge_st_sdk_subscribe_requests_total',
+            'Subscription requests sent.', labels)
+        client = weakref.ref(self)
+
+        def get_offline_queue_size():
+            aws_client = client()
+            if aws_client is None:
+                return None
+            return aws_client._get_offline_queue_size()
+
+        self._metrics.gauge(
+            'edge_st_sdk_offline_queue_size',
+            'Requests queued while disconnected.', labels,
+            get_offline_queue_size)
+
+    def _release_metrics(self):
+        """Remove the metrics of the client from the process-wide
+        :class:`edge_st_sdk.utils.metrics.MetricsRegistry`."""
+        self._metrics.unregister_matching(self._metrics_labels)
+
+    def _install_session_tracking(self):
+        """Let the client restore the subscriptions in place of the underlying
+        SDK whenever a connection is established.
+
+        The SDK subscribes again to every topic, one at a time, after each
+        CONNACK, whether or not the core kept the session. The client records
+        the "session present" flag of the CONNACK instead, and restores the
+        subscriptions as a single batch only if the session has been lost. If
+        the SDK does not expose its internals, its own resubscription is kept.
+
+        :returns: True if the tracking has been installed, False otherwise.
+        :rtype: bool
+        """
+        try:
+            mqtt_core = self._client._mqtt_core
+            paho_client = mqtt_core._internal_async_client._paho_client
+            event_consumer = mqtt_core._event_consumer
+        except AttributeError:
+            return False
+        on_connect = paho_client.on_connect
+
+        def on_connack(client, user_data, flags, rc):
+            if rc == 0 and not flags.get('session present', 0):
+                with lock(self):
+                    self._subscribed_topics.clear()
+            on_connect(client, user_data, flags, rc)
+
+        def subscribe_async(topic, qos, ack_callback, message_callback):
+            # The SDK is not "stable" until the subscriptions are restored,
+            # hence the requests are sent as the SDK itself does.
+            mqtt_core._subscription_manager.add_record(
+                topic, qos, message_callback, ack_callback)
+            return mqtt_core._internal_async_client.subscribe(
+                topic, qos, ack_callback)[1]
+
+        def resubscribe():
+            self._restore_subscriptions(subscribe_async)
+
+        paho_client.on_connect = on_connack
+        event_consumer._handle_resubscribe = resubscribe
+        return True
+
+    def _get_offline_queue_size(self):
+        """Get the number of requests queued by the underlying SDK while
+        disconnected.
+
+        :returns: The number of queued requests, or None if not available.
+        :rtype: int
+        """
+        try:
+            return len(self._client._mqtt_core._offline_requests_manager._queue)
+        except AttributeError:
+            return None
+
     def get_name(self):
         """Get the client name. 
 
@@ -140,45 +276,120 @@ class AWSClient(EdgeClient):
         """
         return self._client_name
 
+    def get_core_arn(self):
+        """Get the ARN of the core to which the client is bound, i.e. the core
+        to which the client is connected or, if not connected yet, its primary
+        core.
+
+        :returns: The ARN of the core.
+        :rtype: str
+        """
+        return self._core_info.coreThingArn
+
+    def set_reconnect_priority(self, priority):
+        """Set the priority of the client when reconnecting, with respect to
+        the other clients of the process.
+
+        :param priority: Priority of the client. Clients with higher values are
+            served first. Defaults to 0.
+        :type priority: int
+        """
+        self._reconnect_coordinator.set_priority(self._client_name, priority)
+
     def connect(self):
         """Connect to the core.
 
+        The primary core is tried first, then the hot-standby cores, if any, in
+        order. Each handshake waits for a slot granted by the process-wide
+        :class:`edge_st_sdk.aws.aws_reconnect_coordinator.AWSReconnectCoordinator`.
+
         :returns: True if the connection was successful, False otherwise.
         :rtype: bool
         """
+        # Registering metrics again, if released by a disconnection.
+        self._init_metrics()
+
         # Updating client.
         self._update_status(EdgeClientStatus.CONNECTING)
 
         # Connecting.
         if not self._connected:
-            # Iterate through the connection options for the core and use the
-            # first successful one.
-            for connectivity_info in self._core_info.connectivityInfoList:
-                self._current_host = connectivity_info.host
-                self._current_port = connectivity_info.port
-                self._shadow_client.configureEndpoint(
-                    self._current_host,
-                    self._current_port)
-                self._shadow_client.configureAutoReconnectBackoffTime(1, 32, 20)
-                self._shadow_client.configureConnectDisconnectTimeout(
-                    self._TIMEOUT_s)
-                self._shadow_client.configureMQTTOperationTimeout(
-                    self._TIMEOUT_s / 2.0)
-                try:
-                    self._shadow_client.connect()
-                    self._connected = True
+            for group_ca_path, core_info in self._cores:
+                self._shadow_client.configureCredentials(
+                    group_ca_path,
+                    self._device_private_key_path,
+                    self._device_certificate_path)
+
+                # Iterate through the connection options for the core and use
+                # the first successful one.
+                for connectivity_info in core_info.connectivityInfoList:
+                    self._current_host = connectivity_info.host
+                    self._current_port = connectivity_info.port
+                    self._shadow_client.configureEndpoint(
+                        self._current_host,
+                        self._current_port)
+                    self._shadow_client.configureConnectDisconnectTimeout(
+                        self._TIMEOUT_s)
+                    self._shadow_client.configureMQTTOperationTimeout(
+                        self._TIMEOUT_s / 2.0)
+                    try:
+                        self._reconnect_coordinator.acquire(self._client_name)
+                        self._shadow_client.connect()
+                        self._connected = True
+                        break
+                    except BaseException as e:
+                        self._connected = False
+                    finally:
+                        self._reconnect_coordinator.release(self._client_name)
+                if self._connected:
+                    self._core_info = core_info
                     break
-                except BaseException as e:
-                    self._connected = False
         if self._connected:
+            self._restore_subscriptions()
             self._update_status(EdgeClientStatus.CONNECTED)
         else:
             self._update_status(EdgeClientStatus.UNREACHABLE)
 
         return self._connected
 
+    def connect_async(self):
+        """Connect to the core without blocking the caller.
+
+        The connection is run by the process-wide
+        :class:`edge_st_sdk.utils.executor.SharedExecutor`. Progress can be
+        observed through
+        :meth:`edge_st_sdk.edge_client.EdgeClient.wait_for_status` or through
+        the listeners.
+
+        :returns: A future whose result is True if the connection was
+            successful, False otherwise.
+        :rtype: :class:`concurrent.futures.Future`
+        """
+        return SharedExecutor.instance().submit(self, self.connect)
+
+    def reconnect(self):
+        """Close the current connection, if any, and connect to the core again.
+
+        :returns: True if the connection was successful, False otherwise.
+        :rtype: bool
+        """
+        if self._connected:
+            self._update_status(EdgeClientStatus.DISCONNECTING)
+            try:
+                self._shadow_client.disconnect()
+            except BaseException as e:
+                pass
+            self._connected = False
+            self._forget_session()
+        return self.connect()
+
     def disconnect(self):
-        """Disconnect from the core."""
+        """Disconnect from the core.
+
+        The metrics of the client are removed from the process-wide
+        :class:`edge_st_sdk.utils.metrics.MetricsRegistry`, and start over from
+        zero if the client connects again.
+        """
         # Updating client.
         self._update_status(EdgeClientStatus.DISCONNECTING)
 
@@ -186,14 +397,21 @@ class AWSClient(EdgeClient):
         if self._connected:
             self._shadow_client.disconnect()
             self._connected = False
+            self._forget_session()
+
+        # Releasing metrics.
+        self._release_metrics()
 
         # Updating client.
         self._update_status(EdgeClientStatus.DISCONNECTED)
 
-    def publish(self, topic, payload, qos):
+    def publish(self, topic, payload, qos, trace=None):
         """Publish a new message to the desired topic with the given quality of
         service.
 
+        With quality of service "1" the call returns when the acknowledgement
+        comes back.
+
         :param topic: Topic name to publish to.
         :type topic: str
 
@@ -202,14 +420,174 @@ class AWSClient(EdgeClient):
 
         :param qos: Quality of Service. Could be "0" or "1".
         :type qos: int
+
+        :param trace: Trace of the message, whose "sent" and "acknowledged"
+            stages are marked before finishing it. The trace is marked as
+            failed if the message is not published, or only queued while the
+            connection is down.
+        :type trace: :class:`edge_st_sdk.utils.tracing.TraceContext`
+
+        :returns: True if the message has been sent, False if it has been
+            queued while the connection is down, or if the client is not
+            connected.
+        :rtype: bool
         """
-        if self._connected:
-            self._client.publish(topic, payload, qos)
+        if not self._connected:
+            Tracer.instance().fail(trace, 'not_connected')
+            return False
+        start = time.time()
+        try:
+            sent = self._client.publish(topic, payload, qos)
+        except BaseException:
+            self._publish_failures.inc()
+            Tracer.instance().fail(trace, 'error')
+            raise
+        if not sent:
+            self._queued_messages.inc()
+            Tracer.instance().fail(trace, 'queued_offline')
+            return False
+        if qos > 0:
+            self._publish_latency.observe(time.time() - start)
+        self._published_messages.inc()
+        self._published_bytes.inc(len(payload))
+        if trace is not None:
+            trace.mark('sent' if qos == 0 else 'acknowledged')
+            Tracer.instance().finish(trace)
+        return True
+
+    def publish_async(self, topic, payload, qos, ack_callback=None,
+        trace=None):
+        """Publish a new message to the desired topic with the given quality of
+        service without waiting for the acknowledgement.
+
+        :param topic: Topic name to publish to.
+        :type topic: str
+
+        :param payload: Payload to publish (JSON formatted string).
+        :type payload: str
+
+        :param qos: Quality of Service. Could be "0" or "1".
+        :type qos: int
+
+        :param ack_callback: Function to be called with the packet identifier
+            when the acknowledgement of a message with quality of service "1"
+            comes back.
+
+        :param trace: Trace of the message, whose "sent" and "acknowledged"
+            stages are marked before finishing it. The trace is marked as
+            failed if the message is not published, or only queued while the
+            connection is down, in which case the underlying SDK drops the
+            acknowledgement callback.
+        :type trace: :class:`edge_st_sdk.utils.tracing.TraceContext`
+
+        :returns: True if the message has been sent, False if it has been
+            queued while the connection is down, or if the client is not
+            connected.
+        :rtype: bool
+        """
+        # Already loaded along with the MQTT stack by the constructor.
+        from AWSIoTPythonSDK.core.protocol.internal.events import FixedEventMids
+        if not self._connected:
+            Tracer.instance().fail(trace, 'not_connected')
+            return False
+        if qos > 0:
+            ack_callback = self._wrap_ack_callback(ack_callback, trace)
+        try:
+            mid = self._client.publishAsync(topic, payload, qos, ack_callback)
+        except BaseException:
+            self._publish_failures.inc()
+            Tracer.instance().fail(trace, 'error')
+            raise
+        if mid == FixedEventMids.QUEUED_MID:
+            self._queued_messages.inc()
+            Tracer.instance().fail(trace, 'queued_offline')
+            return False
+        self._published_messages.inc()
+        self._published_bytes.inc(len(payload))
+        if trace is not None:
+            trace.mark('sent')
+            if qos == 0:
+                Tracer.instance().finish(trace)
+        return True
+
+    def _wrap_ack_callback(self, ack_callback, trace=None):
+        """Wrap an acknowledgement callback so as to measure the publication
+        latency and to finish the trace of the message, if any.
+
+        :param ack_callback: Function to be called with the packet identifier
+            when the acknowledgement comes back, or None.
+
+        :param trace: Trace of the message, or None.
+        :type trace: :class:`edge_st_sdk.utils.tracing.TraceContext`
+
+        :returns: The wrapping function.
+        """
+        start = time.time()
+
+        def on_ack(mid):
+            self._publish_latency.observe(time.time() - start)
+            if trace is not None:
+                trace.mark('acknowledged')
+                Tracer.instance().finish(trace)
+            if ack_callback is not None:
+                # Calling user-defined callback.
+                ack_callback(mid)
+
+        return on_ack
+
+    def _wrap_message_callback(self, callback):
+        """Wrap a message callback so as to count the received messages.
+
+        :param callback: Function to be called when a new message for a
+            subscribed topic comes in.
+
+        :returns: The wrapping function.
+        """
+        def on_message(client, userdata, message):
+            self._received_messages.inc()
+            self._received_bytes.inc(len(message.payload))
+            # Calling user-defined callback.
+            return callback(client, userdata, message)
+
+        return on_message
+
+    def _wrap_shadow_callback(self, operation, callback):
+        """Wrap a shadow callback so as to measure the latency of the shadow
+        request.
+
+        :param operation: Shadow operation, i.e. "get", "update" or "delete".
+        :type operation: str
+
+        :param callback: Function to be called when the response for the
+            shadow request comes back.
+
+        :returns: The wrapping function.
+        """
+        start = time.time()
+
+        def on_response(payload, response_status, token):
+            labels = dict(self._metrics_labels, operation=operation)
+            self._metrics.histogram(
+                'edge_st_sdk_shadow_request_latency_seconds',
+                'Time between shadow requests and responses.',
+                labels).observe(time.time() - start)
+            labels['status'] = response_status
+            self._metrics.counter(
+                'edge_st_sdk_shadow_responses_total',
+                'Shadow responses, by status.', labels).inc()
+            if callback is not None:
+                # Calling user-defined callback.
+                return callback(payload, response_status, token)
+
+        return on_response
 
     def subscribe(self, topic, qos, callback):
         """Subscribe to the desired topic with the given quality of service and
         register a callback to handle the published messages.
 
+        The subscription is tracked by the client: if the client is not
+        connected, it is performed as soon as the client connects.
+
         :param topic: Topic name to publish to.
         :type topic: str
 
@@ -219,8 +597,9 @@ class AWSClient(EdgeClient):
         :param callback: Function to be called when a new message for the
             subscribed topic comes in.
         """
+        self._subscriptions[topic] = (qos, callback)
         if self._connected:
-            self._client.subscribe(topic, qos, callback)
+            self._subscribe_batch([(topic, qos, callback)])
 
     def unsubscribe(self, topic):
         """Unsubscribe to the desired topic.
@@ -228,8 +607,106 @@ class AWSClient(EdgeClient):
         :param topic: Topic name to unsubscribe to.
         :type topic: str
         """
+        self._subscriptions.pop(topic, None)
         if self._connected:
             self._client.unsubscribe(topic)
+            with lock(self):
+                self._subscribed_topics.discard(topic)
+
+    def get_subscriptions(self):
+        """Get the subscriptions of the client.
+
+        :returns: The subscriptions of the client, as (qos, callback) tuples
+            indexed by topic.
+        :rtype: dict
+        """
+        return dict(self._subscriptions)
+
+    def _forget_session(self):
+        """Forget the subscriptions of the current MQTT session after a
+        disconnection, if the core does not keep them, i.e. if the session is
+        clean.
+
+        Persistent sessions are forgotten only when the CONNACK of the next
+        connection reports that the core has not kept them.
+        """
+        if self._clean_session:
+            with lock(self):
+                self._subscribed_topics.clear()
+
+    def _restore_subscriptions(self, subscribe_async=None):
+        """Perform, as a single batch, the tracked subscriptions which are not
+        part of the current MQTT session, i.e. those requested while
+        disconnected and, if the session has been lost, all of them.
+
+        :param subscribe_async: Function sending a subscription request, with
+            the signature of the "subscribeAsync()" method of the underlying
+            MQTT client. Defaults to that method.
+
+        :returns: True if all the subscriptions have been acknowledged, False
+            otherwise.
+        :rtype: bool
+        """
+        with lock(self):
+            subscriptions = [(topic, qos, callback) \
+                for topic, (qos, callback) in list(self._subscriptions.items()) \
+                if topic not in self._subscribed_topics]
+            # Claiming the topics, so that they are not sent twice.
+            self._subscribed_topics.update(
+                [topic for topic, _, _ in subscriptions])
+        return self._subscribe_batch(subscriptions, subscribe_async)
+
+    def _subscribe_batch(self, subscriptions, subscribe_async=None):
+        """Subscribe to a batch of topics by pipelining the requests, i.e.
+        sending all of them before waiting for their acknowledgements.
+
+        If the underlying SDK is offline, the requests are queued by the SDK
+        and the method returns straight away, without waiting for
+        acknowledgements which cannot arrive.
+
+        :param subscriptions: Subscriptions, as (topic, qos, callback) tuples.
+        :type subscriptions: list
+
+        :param subscribe_async: Function sending a subscription request, with
+            the signature of the "subscribeAsync()" method of the underlying
+            MQTT client. Defaults to that method.
+
+        :returns: True if all the subscriptions have been acknowledged within
+            the operation timeout, False otherwise.
+        :rtype: bool
+        """
+        if not subscriptions:
+            return True
+        # Already loaded along with the MQTT stack by the constructor.
+        from AWSIoTPythonSDK.core.protocol.internal.events import FixedEventMids
+        if subscribe_async is None:
+            subscribe_async = self._client.subscribeAsync
+        condition = threading.Condition()
+        pending = [0]
+        queued = False
+
+        def ack_callback(mid, data=None):
+            with condition:
+                pending[0] -= 1
+                condition.notify_all()
+
+        for topic, qos, callback in subscriptions:
+            with condition:
+                pending[0] += 1
+            mid = subscribe_async(
+                topic, qos, ack_callback, self._wrap_message_callback(callback))
+            self._subscribe_requests.inc()
+            with lock(self):
+                if mid == FixedEventMids.QUEUED_MID:
+                    queued = True
+                    self._subscribed_topics.discard(topic)
+                else:
+                    self._subscribed_topics.add(topic)
+        if queued:
+            return False
+        with condition:
+            return condition.wait_for(
+                lambda: pending[0] <= 0, self._TIMEOUT_s / 2.0)
 
     def get_shadow_state(self, callback, timeout_s):
         """Get the state of the shadow client.
@@ -244,7 +721,8 @@ class AWSClient(EdgeClient):
         :type timeout_s: int
         """
         if self._connected:
-            self._shadow_handler.shadowGet(callback, timeout_s)
+            self._shadow_handler.shadowGet(
+                self._wrap_shadow_callback('get', callback), timeout_s)
 
     def update_shadow_state(self, payload, callback, timeout_s):
         """Update the state of the shadow client.
@@ -263,7 +741,9 @@ class AWSClient(EdgeClient):
         :type timeout_s: int
         """
         if self._connected:
-            self._shadow_handler.shadowUpdate(payload, callback, timeout_s)
+            self._shadow_handler.shadowUpdate(
+                payload, self._wrap_shadow_callback('update', callback),
+                timeout_s)
 
     def delete_shadow_state(self, callback, timeout_s):
         """Delete the state of the shadow client.
@@ -278,7 +758,8 @@ class AWSClient(EdgeClient):
         :type timeout_s: int
         """
         if self._connected:
-            self._shadow_handler.shadowDelete(callback, timeout_s)
+            self._shadow_handler.shadowDelete(
+                self._wrap_shadow_callback('delete', callback), timeout_s)
 
     def add_listener(self, listener):
         """Add a listener.
@@ -289,7 +770,7 @@ class AWSClient(EdgeClient):
         if listener is not None:
             with lock(self):
                 if not listener in self._listeners:
-                    self._listeners.append(listener)
+                    self._listeners = self._listeners + (listener,)
 
     def remove_listener(self, listener):
         """Remove a listener.
@@ -300,18 +781,23 @@ class AWSClient(EdgeClient):
         if listener is not None:
             with lock(self):
                 if listener in self._listeners:
-                    self._listeners.remove(listener)
+                    self._listeners = tuple(
+                        l for l in self._listeners if l is not listener)
 
     def _update_status(self, new_status):
         """Update the status of the client.
 
+        Listeners are notified asynchronously through the process-wide
+        :class:`edge_st_sdk.utils.event_bus.EventBus`; losing the connection is
+        never coalesced away.
+
         :param new_status: New status.
         :type new_status: :class:`edge_st_sdk.edge_client.EdgeClientStatus`
         """
-        old_status = self._status
-        self._status = new_status
-        for listener in self._listeners:
-            # Calling user-defined callback.
-            self._thread_pool.submit(
-                listener.on_status_change(
-                    self, new_status.value, old_status.value))
+        with self._status_condition:
+            old_status = self._status
+            self._status = new_status
+            self._status_condition.notify_all()
+        EventBus.instance().post(
+            self, self._listeners, new_status, old_status,
+            new_status in self.TERMINAL_STATUSES)
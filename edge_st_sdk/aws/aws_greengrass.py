@@ -39,18 +39,18 @@ AWS devices and allocating the needed resources.
 import os
 import sys
 import uuid
-import logging
+import time
+import socket
+import hashlib
 from abc import ABCMeta
 from abc import abstractmethod
 from enum import Enum
-from concurrent.futures import ThreadPoolExecutor
-
-from AWSIoTPythonSDK.core.greengrass.discovery.providers import DiscoveryInfoProvider
-from AWSIoTPythonSDK.core.protocol.connection.cores import ProgressiveBackOffCore
-from AWSIoTPythonSDK.exception.AWSIoTExceptions import DiscoveryInvalidRequestException
 
+from edge_st_sdk.edge_client import EdgeClientListener
+from edge_st_sdk.edge_client import EdgeClientStatus
 from edge_st_sdk.utils.python_utils import lock
-import edge_st_sdk.aws.aws_client
+from edge_st_sdk.utils.event_bus import EventBus
+from edge_st_sdk.utils.metrics import MetricsRegistry
 from edge_st_sdk.utils.edge_st_exceptions import EdgeSTInvalidOperationException
 from edge_st_sdk.utils.edge_st_exceptions import EdgeSTInvalidDataException
 
@@ -62,19 +62,30 @@ class AWSGreengrass(object):
     MAX_DISCOVERY_ATTEMPTS = 3
     """Maximum number of attempts when trying to discover the core."""
 
+    DISCOVERY_PORT = 8443
+    """Default TCP port of the discovery service."""
+
     _GROUP_CA_PATH  = './aws_group_ca/'
     """Group Certification Authority path.""" 
 
     _TIMEOUT_s = 10
     """Timeout for discovering information."""
 
-    _NUMBER_OF_THREADS = 5
-    """Number of threads to be used to notify the listeners."""
-
     _discovery_completed = False
-    """Discovery completed flag."""
+    """Whether a discovery has completed, for any AWSGreengrass object."""
+
+    _RTT_TIMEOUT_s = 2
+    """Timeout for measuring the round-trip time towards a core."""
+
+    _RTT_TTL_s = 60
+    """Time after which the round-trip time towards a core is measured
+    again."""
+
+    _HASH_RING_REPLICAS = 64
+    """Number of points of each core on the consistent hashing ring."""
 
-    def __init__(self, endpoint, root_ca_path):
+    def __init__(self, endpoint, root_ca_path, core_selection_strategy=None,
+        standby_cores=0, discovery_port=DISCOVERY_PORT):
         """Constructor.
 
         Initializing AWS Discovery.
@@ -84,17 +95,30 @@ class AWSGreengrass(object):
 
         :param root_ca_path: Path to the root Certification Authority file.
         :type root_ca_path: str
+
+        :param core_selection_strategy: Strategy used to select the core to
+            which a client connects among the cores of the groups it belongs
+            to. Defaults to
+            :attr:`edge_st_sdk.aws.aws_greengrass.AWSCoreSelectionStrategy.FIRST`.
+        :type core_selection_strategy:
+            :class:`edge_st_sdk.aws.aws_greengrass.AWSCoreSelectionStrategy`
+
+        :param standby_cores: Maximum number of hot-standby cores assigned to
+            each client, to which the client fails over when its core is not
+            reachable, without performing a new discovery.
+        :type standby_cores: int
+
+        :param discovery_port: TCP port of the discovery service.
+        :type discovery_port: int
         """
         self._status = AWSGreengrassStatus.INIT
         """Status."""
 
-        self._thread_pool = ThreadPoolExecutor(AWSGreengrass._NUMBER_OF_THREADS)
-        """Pool of thread used to notify the listeners."""
-
-        self._listeners = []
-        """List of listeners to the feature changes.
-        It is a thread safe list, so a listener can subscribe itself through a
-        callback."""
+        self._listeners = ()
+        """Immutable snapshot of the listeners to the status changes.
+        It is replaced as a whole whenever a listener is added or removed, so
+        that it can be read without locking, and a listener can subscribe
+        itself through a callback."""
 
         self._endpoint = endpoint
         """AWS endpoint."""
@@ -102,11 +126,42 @@ class AWSGreengrass(object):
         self._root_ca_path = root_ca_path
         """Path to the root Certification Authority file."""
 
-        self._group_ca_path = None
-        """Path to the group Certification Authority file."""
+        self._discovery_port = discovery_port
+        """TCP port of the discovery service."""
+
+        self._group_ca_paths = {}
+        """Paths to the group Certification Authority files, indexed by group
+        identifier."""
+
+        self._cores_info = {}
+        """Information related to the cores, indexed by group identifier."""
 
-        self._core_info = None
-        """Core information."""
+        self._default_group_id = None
+        """Identifier of the first discovered group, used whenever a client is
+        requested without specifying its group."""
+
+        self._clients_groups = {}
+        """Identifiers of the groups to which each discovered client belongs,
+        indexed by client identifier."""
+
+        self._core_selection_strategy = core_selection_strategy \
+            if core_selection_strategy is not None \
+            else AWSCoreSelectionStrategy.FIRST
+        """Strategy used to select the core of a client."""
+
+        self._standby_cores = standby_cores
+        """Maximum number of hot-standby cores assigned to each client."""
+
+        self._cores_load = {}
+        """Number of clients assigned to each core, indexed by core's ARN."""
+
+        self._clients_cores = {}
+        """ARN of the core each client is counted on within
+        :attr:`_cores_load`, indexed by client identifier."""
+
+        self._cores_rtt = {}
+        """Round-trip time in seconds towards each core, and time of the
+        measure, indexed by core's ARN."""
 
         # Updating service.
         self._update_status(AWSGreengrassStatus.IDLE)
@@ -116,6 +171,10 @@ class AWSGreengrass(object):
         """Performing the discovery of the core belonging to the same group of
         the given client name.
 
+        All the groups to which the client belongs are registered, so that
+        clients belonging to any of them can be obtained afterwards without
+        performing a new discovery.
+
         :param client_id: Name of a client, as it is on the cloud, belonging
             to the same group of the core.
         :type client_id: str
@@ -130,7 +189,7 @@ class AWSGreengrass(object):
             of the core.
         :type device_private_key_path: str
 
-        :returns: The name of the core.
+        :returns: The name of the first core found.
         :rtype: str
 
         :raises EdgeSTInvalidOperationException: is raised if the discovery of
@@ -155,6 +214,13 @@ class AWSGreengrass(object):
             % (device_private_key_path)
             raise EdgeSTInvalidDataException(msg)
 
+        # Importing the discovery providers and the logging configuration on
+        # first use, as they are expensive to load.
+        from AWSIoTPythonSDK.core.greengrass.discovery import providers
+        from AWSIoTPythonSDK.core.protocol.connection.cores import ProgressiveBackOffCore
+        from AWSIoTPythonSDK.exception.AWSIoTExceptions import DiscoveryInvalidRequestException
+        from edge_st_sdk.utils.log_utils import configure_logging
+
         # Updating service.
         self._update_status(AWSGreengrassStatus.DISCOVERING_CORE)
 
@@ -162,41 +228,66 @@ class AWSGreengrass(object):
         backOffCore = ProgressiveBackOffCore()
 
         # Discover GGCs.
-        discoveryInfoProvider = DiscoveryInfoProvider()
-        discoveryInfoProvider.configureEndpoint(self._endpoint)
+        discoveryInfoProvider = providers.DiscoveryInfoProvider()
+        discoveryInfoProvider.configureEndpoint(
+            self._endpoint, self._discovery_port)
         discoveryInfoProvider.configureCredentials(
             self._root_ca_path,
             device_certificate_path,
             device_private_key_path)
         discoveryInfoProvider.configureTimeout(self._TIMEOUT_s)
         attempts = AWSGreengrass.MAX_DISCOVERY_ATTEMPTS
+        metrics = MetricsRegistry.instance()
+        discovery_attempts = metrics.counter(
+            'edge_st_sdk_discovery_attempts_total',
+            'Discovery requests sent.')
+        discovery_failures = metrics.counter(
+            'edge_st_sdk_discovery_failures_total',
+            'Discovery requests failed.')
+        start = time.time()
 
         while attempts != 0:
             try:
                 # Discovering information.
+                discovery_attempts.inc()
                 discoveryInfo = discoveryInfoProvider.discover(client_id)
                 caList = discoveryInfo.getAllCas()
                 coreList = discoveryInfo.getAllCores()
 
-                # Picking only the first ca and core info.
-                group_id, ca = caList[0]
-                self._core_info = coreList[0]
-
-                # Persisting connectivity/identity information.
-                self._group_ca_path = self._GROUP_CA_PATH + group_id + \
-                    '_CA_' + str(uuid.uuid4()) + '.crt'
+                # Persisting connectivity/identity information of every group.
                 if not os.path.exists(self._GROUP_CA_PATH):
                     os.makedirs(self._GROUP_CA_PATH)
-                group_ca_path_file = open(self._group_ca_path, 'w')
-                group_ca_path_file.write(ca)
-                group_ca_path_file.close()
+                for group_id, ca in caList:
+                    if group_id in self._group_ca_paths:
+                        continue
+                    group_ca_path = self._GROUP_CA_PATH + group_id + \
+                        '_CA_' + str(uuid.uuid4()) + '.crt'
+                    group_ca_path_file = open(group_ca_path, 'w')
+                    group_ca_path_file.write(ca)
+                    group_ca_path_file.close()
+                    self._group_ca_paths[group_id] = group_ca_path
+                for core_info in coreList:
+                    cores_info = self._cores_info.setdefault(
+                        core_info.groupId, [])
+                    if core_info.coreThingArn not in \
+                        [core.coreThingArn for core in cores_info]:
+                        cores_info.append(core_info)
+                if self._default_group_id is None:
+                    self._default_group_id = coreList[0].groupId
+                AWSGreengrass._discovery_completed = True
+                clients_groups = self._clients_groups.setdefault(client_id, [])
+                for core_info in coreList:
+                    if core_info.groupId not in clients_groups:
+                        clients_groups.append(core_info.groupId)
                 break
 
             except DiscoveryInvalidRequestException as e:
+                discovery_failures.inc()
                 raise EdgeSTInvalidOperationException(
                     'Invalid discovery request detected: %s' % (e.message))
 
             except BaseException as e:
+                discovery_failures.inc()
                 attempts -= 1
                 backOffCore.backOff()
                 if attempts == 0:
@@ -208,37 +299,248 @@ class AWSGreengrass(object):
                          device_private_key_path,
                          AWSGreengrass.MAX_DISCOVERY_ATTEMPTS))
 
-        self._configure_logging()
-        AWSGreengrass._discovery_completed = True
+        metrics.histogram(
+            'edge_st_sdk_discovery_latency_seconds',
+            'Time needed to discover the cores, retries included.').observe(
+            time.time() - start)
+
+        # Configuring logging, required for using shadow devices, without
+        # overriding the levels set by the application.
+        configure_logging()
 
         # Updating service.
         self._update_status(AWSGreengrassStatus.CORE_DISCOVERED)
 
-        return self._core_info.coreThingArn
+        return coreList[0].coreThingArn
+
+    def _select_cores(self, client_id, group_id):
+        """Selecting the cores to be assigned to a client, according to the
+        core selection strategy.
+
+        :param client_id: Name of the client, as it is on the cloud.
+        :type client_id: str
+
+        :param group_id: Identifier of the group to which the client belongs.
+            If provided, the core of the group is always the primary one.
+        :type group_id: str
+
+        :returns: The information related to the selected cores, the primary
+            core first followed by the hot-standby ones.
+        :rtype: list
+        """
+        candidates = self._get_candidate_cores(client_id, group_id)
+
+        # Sorting the cores.
+        strategy = self._core_selection_strategy
+        if strategy == AWSCoreSelectionStrategy.LEAST_LOADED:
+            candidates.sort(
+                key=lambda core: self._cores_load.get(core.coreThingArn, 0))
+        elif strategy == AWSCoreSelectionStrategy.LOWEST_RTT:
+            candidates.sort(key=self._get_core_rtt)
+        elif strategy == AWSCoreSelectionStrategy.CONSISTENT_HASHING:
+            candidates = self._get_hash_ring_order(client_id, candidates)
+
+        # Moving the core of the requested group in first position.
+        if group_id is not None:
+            candidates.sort(key=lambda core: core.groupId != group_id)
+
+        return candidates[:1 + self._standby_cores]
+
+    def _get_candidate_cores(self, client_id, group_id):
+        """Getting the cores of the groups to which a client belongs.
+
+        :param client_id: Name of the client, as it is on the cloud.
+        :type client_id: str
+
+        :param group_id: Identifier of the group to which the client belongs,
+            or None.
+        :type group_id: str
+
+        :returns: The information related to the cores.
+        :rtype: list
+        """
+        groups = list(self._clients_groups.get(client_id, []))
+        if group_id is not None and group_id not in groups:
+            groups.insert(0, group_id)
+        candidates = []
+        for group in groups:
+            candidates += self._cores_info.get(group, [])
+        return candidates
+
+    def _get_core_rtt(self, core_info):
+        """Getting the last measured round-trip time towards a core.
+
+        :param core_info: Information related to the core.
+        :type core_info: :class:`AWSIoTPythonSDK.core.greengrass.discovery.models.CoreConnectivityInfo`
+
+        :returns: The round-trip time in seconds, infinite if the core is not
+            reachable or has not been measured.
+        :rtype: float
+        """
+        return self._cores_rtt.get(
+            core_info.coreThingArn, (float('inf'), 0))[0]
+
+    def _is_core_rtt_stale(self, core_info):
+        """Checking whether the round-trip time towards a core has to be
+        measured, i.e. it has never been or its measure has expired.
+
+        :param core_info: Information related to the core.
+        :type core_info: :class:`AWSIoTPythonSDK.core.greengrass.discovery.models.CoreConnectivityInfo`
+
+        :returns: True if the round-trip time has to be measured, False
+            otherwise.
+        :rtype: bool
+        """
+        measure = self._cores_rtt.get(core_info.coreThingArn)
+        return measure is None or time.time() - measure[1] > self._RTT_TTL_s
 
-    def _configure_logging(self):
-        """Configuring logging, required for using shadow devices."""
-        self._logger = logging.getLogger('AWSIoTPythonSDK.core')
-        self._logger.setLevel(logging.ERROR)
-        self._streamHandler = logging.StreamHandler()
-        self._formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        self._streamHandler.setFormatter(self._formatter)
-        self._logger.addHandler(self._streamHandler)
+    def _measure_core_rtt(self, core_info):
+        """Measuring the round-trip time towards a core, as the time needed to
+        open a TCP connection to its fastest endpoint, and caching it for
+        :attr:`_RTT_TTL_s` seconds.
+
+        It blocks for up to :attr:`_RTT_TIMEOUT_s` seconds per endpoint, hence
+        it must not be called with the object locked.
+
+        :param core_info: Information related to the core.
+        :type core_info: :class:`AWSIoTPythonSDK.core.greengrass.discovery.models.CoreConnectivityInfo`
+        """
+        rtt = float('inf')
+        for connectivity_info in core_info.connectivityInfoList:
+            try:
+                start = time.time()
+                connection = socket.create_connection(
+                    (connectivity_info.host, connectivity_info.port),
+                    self._RTT_TIMEOUT_s)
+                rtt = min(rtt, time.time() - start)
+                connection.close()
+            except (socket.error, socket.timeout) as e:
+                pass
+        with lock(self):
+            self._cores_rtt[core_info.coreThingArn] = (rtt, time.time())
+
+    def _update_client_load(self, client_id, core_arn):
+        """Moving the count of a client within :attr:`_cores_load` to another
+        core. To be called with the object locked.
+
+        :param client_id: Name of the client, as it is on the cloud.
+        :type client_id: str
+
+        :param core_arn: ARN of the core the client is assigned to, None if it
+            is not using any core.
+        :type core_arn: str
+        """
+        counted_arn = self._clients_cores.pop(client_id, None)
+        if counted_arn is not None:
+            self._cores_load[counted_arn] -= 1
+        if core_arn is not None:
+            self._cores_load[core_arn] = self._cores_load.get(core_arn, 0) + 1
+            self._clients_cores[client_id] = core_arn
+
+    def _on_client_status_change(self, client, new_status):
+        """Keeping :attr:`_cores_load` up to date with the core each client is
+        connected to.
+
+        :param client: Client that has changed its status.
+        :type client: :class:`edge_st_sdk.aws.aws_client.AWSClient`
+
+        :param new_status: New status, as delivered to the listeners, i.e. the
+            value of a :class:`edge_st_sdk.edge_client.EdgeClientStatus`.
+        :type new_status: str
+        """
+        new_status = EdgeClientStatus(new_status)
+        with lock(self):
+            if new_status == EdgeClientStatus.CONNECTED:
+                self._update_client_load(
+                    client.get_name(), client.get_core_arn())
+            elif new_status in [EdgeClientStatus.DISCONNECTED,
+                EdgeClientStatus.UNREACHABLE]:
+                self._update_client_load(client.get_name(), None)
+
+    def _get_hash_ring_order(self, client_id, cores_info):
+        """Sorting the cores by walking a consistent hashing ring clockwise,
+        starting from the position of the client.
+
+        Adding or removing a core moves only the clients that were assigned to
+        it or that are assigned to it afterwards.
+
+        :param client_id: Name of the client, as it is on the cloud.
+        :type client_id: str
+
+        :param cores_info: Information related to the cores.
+        :type cores_info: list
+
+        :returns: The information related to the cores, sorted.
+        :rtype: list
+        """
+        def hash_key(key):
+            return int(hashlib.md5(key.encode('utf-8')).hexdigest(), 16)
+
+        ring = sorted(
+            (hash_key('%s#%d' % (core.coreThingArn, replica)), index)
+            for index, core in enumerate(cores_info)
+            for replica in range(self._HASH_RING_REPLICAS))
+        client_key = hash_key(client_id)
+        start = 0
+        while start < len(ring) and ring[start][0] < client_key:
+            start += 1
+        sorted_cores = []
+        for position in range(len(ring)):
+            index = ring[(start + position) % len(ring)][1]
+            if cores_info[index] not in sorted_cores:
+                sorted_cores.append(cores_info[index])
+        return sorted_cores
 
     @classmethod
     def discovery_completed(self):
-        """Checking whether the discovery has completed.
+        """Checking whether the discovery has completed, for any group and any
+        AWSGreengrass object.
+
+        See :meth:`is_group_discovered` to check a specific group.
 
         :returns: True if the discovery process has completed, False otherwise.
         :rtype: bool
-        """ 
+        """
         return AWSGreengrass._discovery_completed
 
+    def is_group_discovered(self, group_id=None):
+        """Checking whether the discovery has completed for a group.
+
+        :param group_id: Identifier of the group to check. If not provided, the
+            check refers to any group.
+        :type group_id: str
+
+        :returns: True if the discovery process has completed for the given
+            group, or for at least one group if no group is provided, False
+            otherwise.
+        :rtype: bool
+        """
+        if group_id is None:
+            return self._default_group_id is not None
+        return group_id in self._cores_info
+
+    def get_groups(self):
+        """Getting the identifiers of the discovered groups.
+
+        :returns: The identifiers of the discovered groups.
+        :rtype: list
+        """
+        return list(self._cores_info.keys())
+
     def get_client(self, client_id, device_certificate_path,
-        device_private_key_path):
+        device_private_key_path, group_id=None, clean_session=True):
         """Getting an Amazon AWS client.
 
+        A discovery is performed through the client's credentials whenever the
+        requested group has not been discovered yet, or whenever a core
+        selection strategy other than
+        :attr:`edge_st_sdk.aws.aws_greengrass.AWSCoreSelectionStrategy.FIRST`
+        or hot-standby cores are used and the groups of the client are not
+        known yet; if no group is
+        specified, the client is bound to the core chosen by the strategy among
+        the groups to which the client is known to belong, or to the first
+        group discovered by this object.
+
         :param client_id: Name of the client, as it is on the cloud.
         :type client_id: str
 
@@ -250,6 +552,12 @@ class AWSGreengrass(object):
             private key stored on the core device.
         :type device_private_key_path: str
 
+        :param group_id: Identifier of the group to which the client belongs.
+        :type group_id: str
+
+        :param clean_session: If False, the client uses a persistent session.
+        :type clean_session: bool
+
         :returns: Amazon AWS client.
         :rtype: :class:`edge_st_sdk.aws.aws_client.AWSClient`
 
@@ -258,22 +566,59 @@ class AWSGreengrass(object):
         :raises EdgeSTInvalidDataException: is raised if a wrong configuration
             data is provided.
         """
+        # Importing the client's module here rather than at the top, so that
+        # loading the discovery does not load the MQTT stack as well.
+        from edge_st_sdk.aws.aws_client import AWSClient
+
         # Performing the discovery of the core belonging to the same group of
         # the client.
         try:
-            if not self.discovery_completed():
-                self._discover_core(
-                    client_id,
-                    device_certificate_path,
-                    device_private_key_path)
+            with lock(self):
+                if not self.is_group_discovered(group_id) or \
+                    ((self._core_selection_strategy != \
+                        AWSCoreSelectionStrategy.FIRST or \
+                        self._standby_cores > 0) and \
+                    client_id not in self._clients_groups):
+                    self._discover_core(
+                        client_id,
+                        device_certificate_path,
+                        device_private_key_path)
+                if group_id is None and client_id not in self._clients_groups:
+                    group_id = self._default_group_id
+                if group_id is not None and \
+                    not self.is_group_discovered(group_id):
+                    raise EdgeSTInvalidDataException(
+                        'The client "%s" does not belong to the group "%s".' \
+                        % (client_id, group_id))
+                stale_cores = [] if self._core_selection_strategy != \
+                    AWSCoreSelectionStrategy.LOWEST_RTT else \
+                    [core_info for core_info in \
+                        self._get_candidate_cores(client_id, group_id) \
+                        if self._is_core_rtt_stale(core_info)]
+
+            # Measuring round-trip times without holding the lock, so that an
+            # unreachable core does not stall the other requests.
+            for core_info in stale_cores:
+                self._measure_core_rtt(core_info)
+
+            # Selecting the primary and the hot-standby cores.
+            with lock(self):
+                cores_info = self._select_cores(client_id, group_id)
+                self._update_client_load(
+                    client_id, cores_info[0].coreThingArn)
 
             # Creating the client.
-            return edge_st_sdk.aws.aws_client.AWSClient(
+            client = AWSClient(
                 client_id,
                 device_certificate_path,
                 device_private_key_path,
-                self._group_ca_path,
-                self._core_info)
+                self._group_ca_paths[cores_info[0].groupId],
+                cores_info[0],
+                [(self._group_ca_paths[core_info.groupId], core_info) \
+                    for core_info in cores_info[1:]],
+                clean_session)
+            client.add_listener(_CoreLoadListener(self))
+            return client
 
         except (EdgeSTInvalidDataException, EdgeSTInvalidOperationException) \
             as e:
@@ -292,7 +637,7 @@ class AWSGreengrass(object):
         if listener is not None:
             with lock(self):
                 if not listener in self._listeners:
-                    self._listeners.append(listener)
+                    self._listeners = self._listeners + (listener,)
 
     def remove_listener(self, listener):
         """Remove a listener.
@@ -303,21 +648,22 @@ class AWSGreengrass(object):
         if listener is not None:
             with lock(self):
                 if listener in self._listeners:
-                    self._listeners.remove(listener)
+                    self._listeners = tuple(
+                        l for l in self._listeners if l is not listener)
 
     def _update_status(self, new_status):
         """Update the status of the client.
 
+        Listeners are notified asynchronously through the process-wide
+        :class:`edge_st_sdk.utils.event_bus.EventBus`.
+
         :param new_status: New status.
         :type new_status: :class:`edge_st_sdk.aws.aws_greengrass.AWSGreengrassStatus`
         """
         old_status = self._status
         self._status = new_status
-        for listener in self._listeners:
-            # Calling user-defined callback.
-            self._thread_pool.submit(
-                listener.on_status_change(
-                    self, new_status.value, old_status.value))
+        EventBus.instance().post(
+            self, self._listeners, new_status, old_status)
 
 
 class AWSGreengrassStatus(Enum):
@@ -336,6 +682,23 @@ class AWSGreengrassStatus(Enum):
     """Core discovered."""
 
 
+class AWSCoreSelectionStrategy(Enum):
+    """Strategy used to select the core of a client among the cores of the
+    groups it belongs to."""
+
+    FIRST = 'FIRST'
+    """First core returned by the discovery."""
+
+    LEAST_LOADED = 'LEAST_LOADED'
+    """Core with the lowest number of clients assigned."""
+
+    LOWEST_RTT = 'LOWEST_RTT'
+    """Core with the lowest measured round-trip time."""
+
+    CONSISTENT_HASHING = 'CONSISTENT_HASHING'
+    """Core obtained by consistent hashing of the client identifier."""
+
+
 # INTERFACES
 
 class AWSGreengrassListener(object):
@@ -363,3 +726,15 @@ class AWSGreengrassListener(object):
         """
         raise NotImplementedError('You must implement "on_status_change()" to '
                                   'use the "AWSGreengrassListener" class.')
+
+
+class _CoreLoadListener(EdgeClientListener):
+    """Listener keeping the load of the cores of an
+    :class:`edge_st_sdk.aws.aws_greengrass.AWSGreengrass` object up to date
+    with the status of its clients."""
+
+    def __init__(self, aws_greengrass):
+        self._aws_greengrass = aws_greengrass
+
+    def on_status_change(self, client, new_status, old_status):
+        self._aws_greengrass._on_client_status_change(client, new_status)
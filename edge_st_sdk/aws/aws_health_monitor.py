@@ -0,0 +1,362 @@
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+
+"""aws_health_monitor
+
+The aws_health_monitor module actively probes the connections of Amazon AWS
+clients, keeps track of their round-trip times, and reconnects the clients
+whose connection is stale.
+"""
+
+
+# IMPORT
+
+import json
+import time
+import logging
+import itertools
+import threading
+from collections import deque
+
+from edge_st_sdk.edge_client import EdgeClientStatus
+from edge_st_sdk.utils.histogram import Histogram
+from edge_st_sdk.utils.executor import SharedExecutor
+from edge_st_sdk.utils.metrics import MetricsRegistry
+
+
+# CLASSES
+
+class AWSHealthMonitor(object):
+    """Class responsible for monitoring the health of the connections of
+    Amazon AWS clients.
+
+    A single thread periodically publishes a small probe message with quality
+    of service "1" on behalf of each connected client, and measures the time
+    needed to receive the acknowledgement from the core. A client is
+    reconnected whenever, within the latest probes, the mean round-trip time
+    or the ratio of lost probes crosses the configured thresholds.
+    """
+
+    PROBE_TOPIC = 'edge_st_sdk/health/%s'
+    """Default topic of the probe messages, formatted with the client name."""
+
+    def __init__(self, probe_period_s=2.0, probe_timeout_s=2.0, max_rtt_s=1.0,
+        max_loss_ratio=0.4, window_size=5, probe_topic=PROBE_TOPIC):
+        """Constructor.
+
+        :param probe_period_s: Time in seconds between two probes.
+        :type probe_period_s: float
+
+        :param probe_timeout_s: Time in seconds after which a probe that has
+            not been acknowledged is considered lost.
+        :type probe_timeout_s: float
+
+        :param max_rtt_s: Maximum mean round-trip time in seconds within the
+            latest probes.
+        :type max_rtt_s: float
+
+        :param max_loss_ratio: Maximum ratio of lost probes within the latest
+            probes.
+        :type max_loss_ratio: float
+
+        :param window_size: Number of latest probes to evaluate.
+        :type window_size: int
+
+        :param probe_topic: Topic of the probe messages, formatted with the
+            client name.
+        :type probe_topic: str
+        """
+        self._probe_period_s = probe_period_s
+        """Time in seconds between two probes."""
+
+        self._probe_timeout_s = probe_timeout_s
+        """Time in seconds after which a probe is considered lost."""
+
+        self._max_rtt_s = max_rtt_s
+        """Maximum mean round-trip time in seconds."""
+
+        self._max_loss_ratio = max_loss_ratio
+        """Maximum ratio of lost probes."""
+
+        self._window_size = window_size
+        """Number of latest probes to evaluate."""
+
+        self._probe_topic = probe_topic
+        """Topic of the probe messages."""
+
+        self._clients = {}
+        """Health of the monitored clients, indexed by client."""
+
+        self._lock = threading.Lock()
+        """Lock guarding the monitored clients."""
+
+        self._thread = None
+        """Thread probing the clients."""
+
+        self._stop_event = threading.Event()
+        """Event used to stop the thread."""
+
+        self._logger = logging.getLogger(__name__)
+        """Logger, rate limited when configured through
+        :func:`edge_st_sdk.utils.log_utils.configure_logging`."""
+
+        self._probe_errors = MetricsRegistry.instance().counter(
+            'edge_st_sdk_health_probe_errors_total',
+            'Probes failed with an unexpected error.')
+        """Number of probes failed with an unexpected error."""
+
+    def add_client(self, client):
+        """Start monitoring a client.
+
+        :param client: Client to be monitored.
+        :type client: :class:`edge_st_sdk.aws.aws_client.AWSClient`
+        """
+        with self._lock:
+            if client not in self._clients:
+                self._clients[client] = AWSClientHealth(self._window_size)
+            if self._thread is None:
+                self._stop_event.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name='edge_st_sdk-health-monitor')
+                self._thread.daemon = True
+                self._thread.start()
+
+    def remove_client(self, client):
+        """Stop monitoring a client.
+
+        :param client: Client to be removed.
+        :type client: :class:`edge_st_sdk.aws.aws_client.AWSClient`
+        """
+        with self._lock:
+            self._clients.pop(client, None)
+
+    def get_health(self, client):
+        """Get the health of a monitored client.
+
+        :param client: Monitored client.
+        :type client: :class:`edge_st_sdk.aws.aws_client.AWSClient`
+
+        :returns: The health of the client, None if the client is not
+            monitored.
+        :rtype: :class:`edge_st_sdk.aws.aws_health_monitor.AWSClientHealth`
+        """
+        return self._clients.get(client)
+
+    def stop(self):
+        """Stop monitoring all the clients."""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+            self._stop_event.set()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def _run(self):
+        """Probe the monitored clients periodically."""
+        while not self._stop_event.wait(self._probe_period_s):
+            with self._lock:
+                clients = list(self._clients.items())
+            for client, health in clients:
+                try:
+                    self._probe(client, health)
+                except Exception:
+                    self._probe_errors.inc()
+                    self._logger.warning(
+                        'Probing client "%s" failed.', client.get_name(),
+                        exc_info=True)
+
+    def _probe(self, client, health):
+        """Evaluate the latest probes of a client, and send a new one.
+
+        :param client: Monitored client.
+        :type client: :class:`edge_st_sdk.aws.aws_client.AWSClient`
+
+        :param health: Health of the client.
+        :type health: :class:`edge_st_sdk.aws.aws_health_monitor.AWSClientHealth`
+        """
+        now = time.time()
+        if client.get_status() != EdgeClientStatus.CONNECTED:
+            health._clear()
+            return
+
+        # Evaluating the latest probes.
+        health._expire_probes(now, self._probe_timeout_s)
+        if health._is_window_full() and \
+            (health.get_loss_ratio() > self._max_loss_ratio or \
+            health.get_mean_rtt_s() > self._max_rtt_s):
+            health._clear()
+            health._reconnections += 1
+            SharedExecutor.instance().submit(client, client.reconnect)
+            return
+
+        # Sending a new probe.
+        sequence = health._start_probe(now)
+        client.publish_async(
+            self._probe_topic % (client.get_name()),
+            json.dumps({'sequence': sequence, 'timestamp': now}),
+            1,
+            lambda mid: health._complete_probe(sequence))
+
+
+class AWSClientHealth(object):
+    """Health of the connection of a client, as measured by an
+    :class:`edge_st_sdk.aws.aws_health_monitor.AWSHealthMonitor` object."""
+
+    def __init__(self, window_size):
+        """Constructor.
+
+        :param window_size: Number of latest probes to evaluate.
+        :type window_size: int
+        """
+        self._histogram = Histogram()
+        """Histogram of the round-trip times in seconds."""
+
+        self._window = deque(maxlen=window_size)
+        """Round-trip times in seconds of the latest probes, None for lost
+        probes."""
+
+        self._pending = {}
+        """Start time of the probes waiting for acknowledgement, indexed by
+        sequence number."""
+
+        self._sequence = itertools.count()
+        """Sequence number of the probes."""
+
+        self._lost = 0
+        """Number of lost probes."""
+
+        self._reconnections = 0
+        """Number of reconnections triggered."""
+
+        self._lock = threading.Lock()
+        """Lock guarding the probes."""
+
+    def get_rtt_histogram(self):
+        """Get the histogram of the round-trip times.
+
+        :returns: The histogram of the round-trip times in seconds.
+        :rtype: :class:`edge_st_sdk.utils.histogram.Histogram`
+        """
+        return self._histogram
+
+    def get_mean_rtt_s(self):
+        """Get the mean round-trip time within the latest probes.
+
+        :returns: The mean round-trip time in seconds of the acknowledged
+            latest probes, <nan> if none has been acknowledged.
+        :rtype: float
+        """
+        with self._lock:
+            rtts = [rtt for rtt in self._window if rtt is not None]
+        return sum(rtts) / len(rtts) if rtts else float('nan')
+
+    def get_loss_ratio(self):
+        """Get the ratio of lost probes within the latest probes.
+
+        :returns: The ratio of lost probes, 0 if no probe has been evaluated.
+        :rtype: float
+        """
+        with self._lock:
+            if not self._window:
+                return 0.0
+            return float(list(self._window).count(None)) / len(self._window)
+
+    def get_lost_probes(self):
+        """Get the number of lost probes.
+
+        :returns: The number of lost probes.
+        :rtype: int
+        """
+        return self._lost
+
+    def get_reconnections(self):
+        """Get the number of reconnections triggered.
+
+        :returns: The number of reconnections triggered.
+        :rtype: int
+        """
+        return self._reconnections
+
+    def _start_probe(self, now):
+        """Register a new probe.
+
+        :param now: Current time in seconds.
+        :type now: float
+
+        :returns: The sequence number of the probe.
+        :rtype: int
+        """
+        with self._lock:
+            sequence = next(self._sequence)
+            self._pending[sequence] = now
+            return sequence
+
+    def _complete_probe(self, sequence):
+        """Register the acknowledgement of a probe.
+
+        :param sequence: Sequence number of the probe.
+        :type sequence: int
+        """
+        with self._lock:
+            start = self._pending.pop(sequence, None)
+            if start is None:
+                return
+            rtt = time.time() - start
+            self._window.append(rtt)
+        self._histogram.record(rtt)
+
+    def _expire_probes(self, now, timeout_s):
+        """Consider lost the probes not acknowledged within the timeout.
+
+        :param now: Current time in seconds.
+        :type now: float
+
+        :param timeout_s: Time in seconds after which a probe is lost.
+        :type timeout_s: float
+        """
+        with self._lock:
+            for sequence, start in list(self._pending.items()):
+                if now - start > timeout_s:
+                    del self._pending[sequence]
+                    self._window.append(None)
+                    self._lost += 1
+
+    def _is_window_full(self):
+        """Check whether enough probes have been evaluated.
+
+        :returns: True if the latest probes fill the window, False otherwise.
+        :rtype: bool
+        """
+        return len(self._window) == self._window.maxlen
+
+    def _clear(self):
+        """Forget the latest and the pending probes."""
+        with self._lock:
+            self._window.clear()
+            self._pending.clear()
@@ -0,0 +1,382 @@
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+
+"""aws_reconnect_coordinator
+
+The aws_reconnect_coordinator module coordinates the reconnections of all the
+Amazon AWS clients of a process, so that they do not reconnect in lockstep and
+overload the core after it restarts.
+"""
+
+
+# IMPORT
+
+import time
+import heapq
+import random
+import itertools
+import threading
+
+from edge_st_sdk.utils.python_utils import lock
+
+
+# CLASSES
+
+class AWSReconnectCoordinator(object):
+    """Class responsible for coordinating the reconnections of the Amazon AWS
+    clients of a process.
+
+    Reconnection attempts are delayed through decorrelated jitter, and the
+    number of handshakes in flight at the same time is capped: clients waiting
+    for a handshake slot are served by priority, and in arrival order among
+    clients with the same priority.
+    """
+
+    _INSTANCE = None
+    """Instance object."""
+
+    MAX_HANDSHAKES = 8
+    """Default maximum number of handshakes in flight at the same time."""
+
+    BASE_BACKOFF_s = 1
+    """Default base time in seconds to wait before reconnecting."""
+
+    MAX_BACKOFF_s = 32
+    """Default maximum time in seconds to wait before reconnecting."""
+
+    STABLE_CONNECTION_s = 20
+    """Default time in seconds after which a connection is considered stable,
+    so that the time to wait before reconnecting is reset."""
+
+    HANDSHAKE_TIMEOUT_s = 10
+    """Default time in seconds after which a handshake slot is reclaimed even if
+    it has not been released."""
+
+    def __init__(self):
+        """Constructor.
+
+        :raises Exception: is raised if an instance already exists, as this
+            class is a singleton and has to be obtained through a call to the
+            :meth:`edge_st_sdk.aws.aws_reconnect_coordinator.AWSReconnectCoordinator.instance`
+            method.
+        """
+        if self._INSTANCE is not None:
+            raise Exception('An instance of \'AWSReconnectCoordinator\' class ' \
+                'already exists.')
+
+        self._condition = threading.Condition()
+        """Condition variable guarding the handshake slots."""
+
+        self._max_handshakes = self.MAX_HANDSHAKES
+        """Maximum number of handshakes in flight at the same time."""
+
+        self._base_backoff_s = self.BASE_BACKOFF_s
+        """Base time in seconds to wait before reconnecting."""
+
+        self._max_backoff_s = self.MAX_BACKOFF_s
+        """Maximum time in seconds to wait before reconnecting."""
+
+        self._stable_connection_s = self.STABLE_CONNECTION_s
+        """Time in seconds after which a connection is considered stable."""
+
+        self._handshake_timeout_s = self.HANDSHAKE_TIMEOUT_s
+        """Time in seconds after which a handshake slot is reclaimed."""
+
+        self._handshakes = {}
+        """Start time of the handshakes in flight, indexed by client name."""
+
+        self._waiters = []
+        """Heap of the clients waiting for a handshake slot."""
+
+        self._sequence = itertools.count()
+        """Counter used to serve clients with the same priority in arrival
+        order."""
+
+        self._priorities = {}
+        """Reconnection priorities, indexed by client name."""
+
+    @classmethod
+    def instance(self):
+        """Getting an instance of the class.
+
+        :returns: An instance of the class.
+        :rtype: :class:`edge_st_sdk.aws.aws_reconnect_coordinator.AWSReconnectCoordinator`
+        """
+        if self._INSTANCE is None:
+            with lock(self):
+                if self._INSTANCE is None:
+                    self._INSTANCE = AWSReconnectCoordinator()
+        return self._INSTANCE
+
+    def configure(self, max_handshakes=None, base_backoff_s=None,
+        max_backoff_s=None, stable_connection_s=None, handshake_timeout_s=None):
+        """Configure the coordinator. Parameters not provided keep their
+        current value.
+
+        :param max_handshakes: Maximum number of handshakes in flight at the
+            same time.
+        :type max_handshakes: int
+
+        :param base_backoff_s: Base time in seconds to wait before reconnecting.
+        :type base_backoff_s: float
+
+        :param max_backoff_s: Maximum time in seconds to wait before
+            reconnecting.
+        :type max_backoff_s: float
+
+        :param stable_connection_s: Time in seconds after which a connection is
+            considered stable.
+        :type stable_connection_s: float
+
+        :param handshake_timeout_s: Time in seconds after which a handshake slot
+            is reclaimed even if it has not been released.
+        :type handshake_timeout_s: float
+        """
+        with self._condition:
+            if max_handshakes is not None:
+                self._max_handshakes = max_handshakes
+            if base_backoff_s is not None:
+                self._base_backoff_s = base_backoff_s
+            if max_backoff_s is not None:
+                self._max_backoff_s = max_backoff_s
+            if stable_connection_s is not None:
+                self._stable_connection_s = stable_connection_s
+            if handshake_timeout_s is not None:
+                self._handshake_timeout_s = handshake_timeout_s
+            self._condition.notify_all()
+
+    def get_stable_connection_s(self):
+        """Get the time after which a connection is considered stable.
+
+        :returns: The time in seconds after which a connection is considered
+            stable.
+        :rtype: float
+        """
+        return self._stable_connection_s
+
+    def get_max_backoff_s(self):
+        """Get the maximum time to wait before reconnecting.
+
+        :returns: The maximum time in seconds to wait before reconnecting.
+        :rtype: float
+        """
+        return self._max_backoff_s
+
+    def set_priority(self, client_name, priority):
+        """Set the reconnection priority of a client.
+
+        :param client_name: Name of the client.
+        :type client_name: str
+
+        :param priority: Priority of the client. Clients with higher values are
+            served first. Defaults to 0.
+        :type priority: int
+        """
+        with self._condition:
+            self._priorities[client_name] = priority
+
+    def get_backoff_s(self, previous_backoff_s=None):
+        """Get the time to wait before the next reconnection attempt, computed
+        through decorrelated jitter.
+
+        :param previous_backoff_s: Time in seconds waited before the previous
+            attempt, if any.
+        :type previous_backoff_s: float
+
+        :returns: The time in seconds to wait before the next attempt.
+        :rtype: float
+        """
+        previous_backoff_s = max(previous_backoff_s or 0, self._base_backoff_s)
+        return min(self._max_backoff_s, random.uniform(
+            self._base_backoff_s, previous_backoff_s * 3))
+
+    def acquire(self, client_name, timeout=None):
+        """Wait for a handshake slot.
+
+        :param client_name: Name of the client.
+        :type client_name: str
+
+        :param timeout: Time in seconds to wait before giving up. If not
+            provided, waits indefinitely.
+        :type timeout: float
+
+        :returns: True if the slot has been acquired, False otherwise.
+        :rtype: bool
+        """
+        with self._condition:
+            if client_name in self._handshakes:
+                return True
+            waiter = (-self._priorities.get(client_name, 0),
+                next(self._sequence), client_name)
+            heapq.heappush(self._waiters, waiter)
+            deadline = None if timeout is None else time.time() + timeout
+            while True:
+                self._reclaim_handshakes()
+                if self._waiters[0] == waiter and \
+                    len(self._handshakes) < self._max_handshakes:
+                    heapq.heappop(self._waiters)
+                    self._handshakes[client_name] = time.time()
+                    self._condition.notify_all()
+                    return True
+                wait_s = self._handshake_timeout_s
+                if deadline is not None:
+                    wait_s = min(wait_s, deadline - time.time())
+                    if wait_s <= 0:
+                        self._waiters.remove(waiter)
+                        heapq.heapify(self._waiters)
+                        self._condition.notify_all()
+                        return False
+                self._condition.wait(wait_s)
+
+    def release(self, client_name):
+        """Release the handshake slot held by a client, if any.
+
+        :param client_name: Name of the client.
+        :type client_name: str
+        """
+        with self._condition:
+            if self._handshakes.pop(client_name, None) is not None:
+                self._condition.notify_all()
+
+    def get_handshakes_in_flight(self):
+        """Get the number of handshakes in flight.
+
+        :returns: The number of handshakes in flight.
+        :rtype: int
+        """
+        return len(self._handshakes)
+
+    def install(self, mqtt_client, client_name):
+        """Let the coordinator drive the automatic reconnections of an MQTT
+        client.
+
+        The back-off core used by the network thread of the underlying SDK is
+        replaced by a coordinated one; if the SDK does not expose it, the
+        client falls back to the SDK's own back-off with a jittered base time.
+
+        :param mqtt_client: MQTT client.
+        :type mqtt_client: :class:`AWSIoTPythonSDK.MQTTLib.AWSIoTMQTTClient`
+
+        :param client_name: Name of the client.
+        :type client_name: str
+
+        :returns: The coordinated back-off core, None if the fallback has been
+            used.
+        :rtype: :class:`edge_st_sdk.aws.aws_reconnect_coordinator.AWSCoordinatedBackOffCore`
+        """
+        try:
+            paho_client = \
+                mqtt_client._mqtt_core._internal_async_client._paho_client
+            paho_client._backoffCore.stopStableConnectionTimer()
+            backoff_core = AWSCoordinatedBackOffCore(self, client_name)
+            paho_client._backoffCore = backoff_core
+            return backoff_core
+        except AttributeError as e:
+            mqtt_client.configureAutoReconnectBackoffTime(
+                self.get_backoff_s(),
+                self._max_backoff_s,
+                self._stable_connection_s)
+            return None
+
+    def _reclaim_handshakes(self):
+        """Reclaim the handshake slots held for longer than the handshake
+        timeout."""
+        now = time.time()
+        for client_name, start in list(self._handshakes.items()):
+            if now - start > self._handshake_timeout_s:
+                del self._handshakes[client_name]
+
+
+class AWSCoordinatedBackOffCore(object):
+    """Back-off core used by the network thread of an MQTT client before each
+    automatic reconnection attempt, coordinated with the other clients of the
+    process through an
+    :class:`edge_st_sdk.aws.aws_reconnect_coordinator.AWSReconnectCoordinator`
+    object.
+
+    The methods follow the interface expected by the underlying SDK.
+    """
+
+    def __init__(self, coordinator, client_name):
+        """Constructor.
+
+        :param coordinator: Reconnect coordinator.
+        :type coordinator: :class:`edge_st_sdk.aws.aws_reconnect_coordinator.AWSReconnectCoordinator`
+
+        :param client_name: Name of the client.
+        :type client_name: str
+        """
+        self._coordinator = coordinator
+        """Reconnect coordinator."""
+
+        self._client_name = client_name
+        """Name of the client."""
+
+        self._backoff_s = None
+        """Time in seconds waited before the previous attempt."""
+
+        self._reset_timer = None
+        """Timer used to reset the back-off once the connection is stable."""
+
+    def configTime(self, srcBaseReconnectTimeSecond,
+        srcMaximumReconnectTimeSecond, srcMinimumConnectTimeSecond):
+        """Timing is configured process-wide through the coordinator, hence
+        per-client configurations are ignored."""
+        pass
+
+    def backOff(self):
+        """Block the network thread until the next reconnection attempt is
+        allowed."""
+        self.stopStableConnectionTimer()
+        self._backoff_s = self._coordinator.get_backoff_s(self._backoff_s)
+        time.sleep(self._backoff_s)
+        self._coordinator.acquire(
+            self._client_name, self._coordinator.get_max_backoff_s())
+
+    def startStableConnectionTimer(self):
+        """Release the handshake slot and start counting for a stable
+        connection, as the handshake has completed."""
+        self._coordinator.release(self._client_name)
+        self.stopStableConnectionTimer()
+        self._reset_timer = threading.Timer(
+            self._coordinator.get_stable_connection_s(), self._reset)
+        self._reset_timer.daemon = True
+        self._reset_timer.start()
+
+    def stopStableConnectionTimer(self):
+        """Release the handshake slot and stop counting for a stable
+        connection."""
+        self._coordinator.release(self._client_name)
+        if self._reset_timer is not None:
+            self._reset_timer.cancel()
+            self._reset_timer = None
+
+    def _reset(self):
+        """Reset the back-off once the connection is stable."""
+        self._backoff_s = None
@@ -37,6 +37,7 @@ The edge_client module contains an interface for creating edge client classes.
 from abc import ABCMeta
 from abc import abstractmethod
 from enum import Enum
+from threading import Condition
 
 
 # INTERFACE
@@ -45,12 +46,31 @@ class EdgeClient(object):
     """The EdgeClient class is an interface for creating edge client classes."""
     __metaclass__ = ABCMeta
 
+    def __init__(self):
+        """Constructor."""
+        self._status = EdgeClientStatus.INIT
+        """Status."""
+
+        self._status_condition = Condition()
+        """Condition variable notified whenever the status changes."""
+
     @abstractmethod
     def connect(self):
         """Connect to the core."""
         raise NotImplementedError('You must define "connect()" to use the '
             '"EdgeClient" class.')
 
+    @abstractmethod
+    def connect_async(self):
+        """Connect to the core without blocking the caller.
+
+        :returns: A future whose result is True if the connection was
+            successful, False otherwise.
+        :rtype: :class:`concurrent.futures.Future`
+        """
+        raise NotImplementedError('You must define "connect_async()" to use '
+            'the "EdgeClient" class.')
+
     @abstractmethod
     def disconnect(self):
         """Disconnect from the core."""
@@ -58,7 +78,7 @@ class EdgeClient(object):
             '"EdgeClient" class.')
 
     @abstractmethod
-    def publish(self, topic, payload, qos):
+    def publish(self, topic, payload, qos, trace=None):
         """Publish a new message to the desired topic with the given quality of
         service.
 
@@ -70,10 +90,40 @@ class EdgeClient(object):
 
         :param qos: Quality of Service. Could be "0" or "1".
         :type qos: int
+
+        :param trace: Trace of the message, whose "sent" and "acknowledged"
+            stages are marked before finishing it.
+        :type trace: :class:`edge_st_sdk.utils.tracing.TraceContext`
         """
         raise NotImplementedError('You must define "publish()" to use the '
             '"EdgeClient" class.')
 
+    @abstractmethod
+    def publish_async(self, topic, payload, qos, ack_callback=None,
+        trace=None):
+        """Publish a new message to the desired topic with the given quality of
+        service without waiting for the acknowledgement.
+
+        :param topic: Topic name to publish to.
+        :type topic: str
+
+        :param payload: Payload to publish (JSON formatted string).
+        :type payload: str
+
+        :param qos: Quality of Service. Could be "0" or "1".
+        :type qos: int
+
+        :param ack_callback: Function to be called with the packet identifier
+            when the acknowledgement of a message with quality of service "1"
+            comes back.
+
+        :param trace: Trace of the message, whose "sent" and "acknowledged"
+            stages are marked before finishing it.
+        :type trace: :class:`edge_st_sdk.utils.tracing.TraceContext`
+        """
+        raise NotImplementedError('You must define "publish_async()" to use '
+            'the "EdgeClient" class.')
+
     @abstractmethod
     def subscribe(self, topic, qos, callback):
         """Subscribe to the desired topic with the given quality of service and
@@ -173,6 +223,33 @@ class EdgeClient(object):
         raise NotImplementedError('You must define "remove_listener()" to use '
             'the "EdgeClient" class.')
 
+    def get_status(self):
+        """Get the status of the client.
+
+        :returns: The status of the client.
+        :rtype: :class:`edge_st_sdk.edge_client.EdgeClientStatus`
+        """
+        return self._status
+
+    def wait_for_status(self, status, timeout=None):
+        """Block until the client reaches the given status, or until the given
+        timeout has elapsed.
+
+        :param status: Status to wait for.
+        :type status: :class:`edge_st_sdk.edge_client.EdgeClientStatus`
+
+        :param timeout: Time in seconds to wait before returning. If not
+            provided, waits indefinitely.
+        :type timeout: float
+
+        :returns: True if the client is in the given status when returning,
+            False otherwise.
+        :rtype: bool
+        """
+        with self._status_condition:
+            return self._status_condition.wait_for(
+                lambda: self._status == status, timeout)
+
     @abstractmethod
     def _update_status(self, new_status):
         """Update the status of the client.
@@ -202,6 +279,9 @@ class EdgeClientStatus(Enum):
     DISCONNECTING = 'DISCONNECTING'
     """Closing the connection to the client."""
 
+    DISCONNECTED = 'DISCONNECTED'
+    """Connection to the client closed."""
+
     UNREACHABLE = 'UNREACHABLE'
     """The client disappeared without first disconnecting."""
 
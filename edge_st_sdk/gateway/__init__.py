@@ -0,0 +1,8 @@
+__all__ = [
+    'aggregation', \
+    'device_manifest', \
+    'frame_assembler', \
+    'gateway', \
+    'imu_batch', \
+    'notification_reactor'
+]
@@ -0,0 +1,313 @@
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+
+"""aggregation
+
+The aggregation module keeps every sample notified by a device between two
+publications, in preallocated ring buffers, and summarizes each window with
+vectorized statistics (mean, minimum, maximum, standard deviation, and number
+of samples), instead of publishing only the latest value.
+
+It requires the NumPy package.
+"""
+
+
+# IMPORT
+
+import threading
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from edge_st_sdk.utils.edge_st_exceptions import EdgeSTInvalidOperationException
+
+
+# CONSTANTS
+
+DEFAULT_CAPACITY = 1024
+"""Default number of samples kept by each ring buffer; older samples of a
+window are overwritten."""
+
+STATISTICS = ['mean', 'min', 'max', 'std', 'count']
+"""Statistics computed on each window."""
+
+
+# FUNCTIONS
+
+def check_numpy():
+    """Check that the NumPy package is available.
+
+    :raises EdgeSTInvalidOperationException: is raised if NumPy is not
+        installed.
+    """
+    if numpy is None:
+        raise EdgeSTInvalidOperationException(
+            'The NumPy package is required for aggregating samples; please '
+            'install it, e.g. with "pip3 install numpy".')
+
+
+# CLASSES
+
+class RingBuffer(object):
+    """Ring buffer of fixed-width samples, backed by a preallocated NumPy
+    array, so that adding a sample does not allocate memory.
+
+    Samples are added by a single writer and retrieved by any thread.
+    """
+
+    def __init__(self, capacity, width, dtype='float64'):
+        """Constructor.
+
+        :param capacity: Maximum number of samples kept.
+        :type capacity: int
+
+        :param width: Number of values of each sample.
+        :type width: int
+
+        :param dtype: NumPy data type of the values.
+        :type dtype: str
+
+        :raises EdgeSTInvalidOperationException: is raised if NumPy is not
+            installed.
+        """
+        check_numpy()
+        self._data = numpy.empty((capacity, width), dtype)
+        """Samples."""
+
+        self._index = 0
+        """Position of the next sample."""
+
+        self._count = 0
+        """Number of samples kept."""
+
+        self._overwritten = 0
+        """Number of samples overwritten since the buffer was last
+        cleared."""
+
+        self._lock = threading.Lock()
+        """Lock guarding the position and the number of samples."""
+
+    def get_capacity(self):
+        """Get the maximum number of samples kept.
+
+        :returns: The maximum number of samples kept.
+        :rtype: int
+        """
+        return self._data.shape[0]
+
+    def get_width(self):
+        """Get the number of values of each sample.
+
+        :returns: The number of values of each sample.
+        :rtype: int
+        """
+        return self._data.shape[1]
+
+    def get_count(self):
+        """Get the number of samples kept.
+
+        :returns: The number of samples kept.
+        :rtype: int
+        """
+        return self._count
+
+    def get_overwritten(self):
+        """Get the number of samples overwritten since the buffer was last
+        cleared, because the buffer was full.
+
+        :returns: The number of samples overwritten.
+        :rtype: int
+        """
+        return self._overwritten
+
+    def append(self, values):
+        """Add a sample, overwriting the oldest one if the buffer is full.
+
+        :param values: Values of the sample.
+        :type values: list
+        """
+        with self._lock:
+            self._data[self._index] = values
+            self._index = (self._index + 1) % self._data.shape[0]
+            if self._count < self._data.shape[0]:
+                self._count += 1
+            else:
+                self._overwritten += 1
+
+    def extend(self, samples):
+        """Add several samples at once, overwriting the oldest ones if the
+        buffer gets full.
+
+        :param samples: Samples, with shape (n, width).
+        :type samples: :class:`numpy.ndarray`
+        """
+        capacity = self._data.shape[0]
+        length = len(samples)
+        if length == 0:
+            return
+        with self._lock:
+            self._overwritten += max(0, self._count + length - capacity)
+            self._count = min(capacity, self._count + length)
+            if length >= capacity:
+                self._data[:] = samples[-capacity:]
+                self._index = 0
+                return
+            end = self._index + length
+            if end <= capacity:
+                self._data[self._index:end] = samples
+            else:
+                split = capacity - self._index
+                self._data[self._index:] = samples[:split]
+                self._data[:length - split] = samples[split:]
+            self._index = end % capacity
+
+    def get_window(self, clear=False):
+        """Get a copy of the samples kept, from the oldest to the newest.
+
+        :param clear: If True, the buffer is cleared.
+        :type clear: bool
+
+        :returns: The samples, with shape (count, width).
+        :rtype: :class:`numpy.ndarray`
+        """
+        with self._lock:
+            if self._count < self._data.shape[0]:
+                window = self._data[
+                    (self._index - self._count):self._index].copy()
+            else:
+                window = numpy.concatenate(
+                    (self._data[self._index:], self._data[:self._index]))
+            if clear:
+                self._clear()
+        return window
+
+    def clear(self):
+        """Remove all the samples."""
+        with self._lock:
+            self._clear()
+
+    def _clear(self):
+        """Remove all the samples. To be called with the buffer locked."""
+        self._index = 0
+        self._count = 0
+        self._overwritten = 0
+
+
+class WindowAggregator(object):
+    """Class responsible for aggregating the samples of several series, e.g.
+    the features of a device, over windows of time."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        """Constructor.
+
+        :param capacity: Maximum number of samples of a series kept for a
+            window.
+        :type capacity: int
+
+        :raises EdgeSTInvalidOperationException: is raised if NumPy is not
+            installed.
+        """
+        check_numpy()
+        self._capacity = capacity
+        """Maximum number of samples of a series kept for a window."""
+
+        self._buffers = {}
+        """Ring buffers, indexed by series name."""
+
+    def add_series(self, name, width):
+        """Preallocate the ring buffer of a series.
+
+        :param name: Name of the series.
+        :type name: str
+
+        :param width: Number of values of each sample.
+        :type width: int
+        """
+        if name not in self._buffers:
+            self._buffers[name] = RingBuffer(self._capacity, width)
+
+    def add(self, name, values):
+        """Add a sample to a series. The buffer of a series not added through
+        :meth:`add_series` is allocated on the first sample.
+
+        :param name: Name of the series.
+        :type name: str
+
+        :param values: Values of the sample.
+        :type values: list
+        """
+        buffer = self._buffers.get(name)
+        if buffer is None:
+            self.add_series(name, len(values))
+            buffer = self._buffers[name]
+        buffer.append(values)
+
+    def extend(self, name, samples):
+        """Add several samples at once to a series. The buffer of a series not
+        added through :meth:`add_series` is allocated on the first samples.
+
+        :param name: Name of the series.
+        :type name: str
+
+        :param samples: Samples, with shape (n, width).
+        :type samples: :class:`numpy.ndarray`
+        """
+        buffer = self._buffers.get(name)
+        if buffer is None:
+            self.add_series(name, samples.shape[1])
+            buffer = self._buffers[name]
+        buffer.extend(samples)
+
+    def compute(self, clear=True):
+        """Compute the statistics of the current window of each series.
+
+        :param clear: If True, a new window starts.
+        :type clear: bool
+
+        :returns: The statistics of the series with samples in the window,
+            indexed by series name; the statistics are indexed by the names in
+            :data:`STATISTICS`, and are arrays with one value per column,
+            except "count", which is the number of samples aggregated.
+        :rtype: dict
+        """
+        statistics = {}
+        for name, buffer in list(self._buffers.items()):
+            window = buffer.get_window(clear)
+            if window.shape[0] == 0:
+                continue
+            statistics[name] = {
+                'mean': window.mean(axis=0),
+                'min': window.min(axis=0),
+                'max': window.max(axis=0),
+                'std': window.std(axis=0),
+                'count': window.shape[0]
+            }
+        return statistics
@@ -0,0 +1,501 @@
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+
+"""device_manifest
+
+The device_manifest module reads the manifest describing the Bluetooth Low
+Energy devices handled by a gateway, i.e. how each device maps to a thing on
+the cloud, and how its features map to topics and to the device shadow.
+
+A manifest is a JSON document with a list of devices, and defaults shared by
+all of them, e.g.::
+
+    {
+        "defaults": {
+            "certificates_path": "./devices_ble_aws/",
+            "events": [
+                {"feature": "Switch", "topic": "iot_device/switch_sense"}
+            ],
+            "telemetry": {
+                "features": ["Pressure", "Humidity", "Temperature"],
+                "topic": "iot_device/env_ine_sense",
+                "publish_period_s": 5
+            },
+            "actuators": [
+                {"feature": "Switch", "topic": "iot_device/switch_act",
+                 "qos": 1, "initial_value": 0}
+            ]
+        },
+        "devices": [
+            {"mac": "d1:07:fd:84:30:8c", "thing_name": "IoT_Device_1"},
+            {"mac": "d7:90:95:be:58:7e", "thing_name": "IoT_Device_2"}
+        ]
+    }
+
+Each device inherits the defaults, and may override any of them. Topics may
+contain the "{thing_name}" placeholder, replaced by the name of the thing.
+Certificates and private keys default to "<thing_name>.cert.pem" and
+"<thing_name>.private.key" within the "certificates_path" folder, which is
+relative to the folder of the manifest.
+
+Telemetry may set "aggregate" to true, to publish the mean, minimum, maximum,
+standard deviation, and number of the samples notified within each period,
+rather than the latest values; "window_size" bounds the number of samples kept
+per feature and period. Alternatively, it may set "align" to true, to publish
+the latest frame of values sensed at the same time, matching the timestamps of
+the notifications within "tolerance" timestamp units.
+"""
+
+
+# IMPORT
+
+import os
+import json
+from collections import Counter
+
+from edge_st_sdk.gateway.frame_assembler import DEFAULT_TOLERANCE
+from edge_st_sdk.utils.edge_st_exceptions import EdgeSTInvalidDataException
+
+
+# CONSTANTS
+
+CERTIFICATE_EXTENSION = '.cert.pem'
+"""Default extension of the devices' certificates."""
+
+PRIVATE_KEY_EXTENSION = '.private.key'
+"""Default extension of the devices' private keys."""
+
+DEFAULT_QOS = 0
+"""Default MQTT quality of service."""
+
+DEFAULT_PUBLISH_PERIOD_s = 5
+"""Default period of the telemetry publications."""
+
+DEFAULT_WINDOW_SIZE = 1024
+"""Default maximum number of samples of a feature aggregated over each
+telemetry period."""
+
+
+# CLASSES
+
+class EventConfiguration(object):
+    """Feature whose updates are published as soon as they are notified."""
+
+    def __init__(self, feature_name, topic, qos):
+        """Constructor.
+
+        :param feature_name: Name of the feature.
+        :type feature_name: str
+
+        :param topic: Topic where the updates are published.
+        :type topic: str
+
+        :param qos: MQTT quality of service.
+        :type qos: int
+        """
+        self.feature_name = feature_name
+        """Name of the feature."""
+
+        self.topic = topic
+        """Topic where the updates are published."""
+
+        self.qos = qos
+        """MQTT quality of service."""
+
+
+class TelemetryConfiguration(object):
+    """Features whose latest values, or whose statistics over each period, are
+    published periodically, and reported to the device shadow."""
+
+    def __init__(self, feature_names, topic, qos, publish_period_s, shadow,
+        aggregate=False, window_size=DEFAULT_WINDOW_SIZE, align=False,
+        tolerance=DEFAULT_TOLERANCE):
+        """Constructor.
+
+        :param feature_names: Names of the features.
+        :type feature_names: list
+
+        :param topic: Topic where the values are published.
+        :type topic: str
+
+        :param qos: MQTT quality of service.
+        :type qos: int
+
+        :param publish_period_s: Publishing period in seconds.
+        :type publish_period_s: float
+
+        :param shadow: Whether the values are reported to the device shadow.
+        :type shadow: bool
+
+        :param aggregate: Whether the statistics of the samples notified within
+            each period (mean, minimum, maximum, standard deviation, and number
+            of samples) are published instead of the latest values. It
+            requires the NumPy package.
+        :type aggregate: bool
+
+        :param window_size: Maximum number of samples of a feature aggregated
+            over each period; older samples are discarded.
+        :type window_size: int
+
+        :param align: Whether the values published are those of the latest
+            frame of samples sensed at the same time, according to the
+            timestamps of the notifications, instead of the latest value of
+            each feature. It can not be combined with "aggregate".
+        :type align: bool
+
+        :param tolerance: Maximum distance between the timestamps of the
+            samples of a frame, in timestamp units.
+        :type tolerance: int
+        """
+        self.feature_names = feature_names
+        """Names of the features."""
+
+        self.topic = topic
+        """Topic where the values are published."""
+
+        self.qos = qos
+        """MQTT quality of service."""
+
+        self.publish_period_s = publish_period_s
+        """Publishing period in seconds."""
+
+        self.shadow = shadow
+        """Whether the values are reported to the device shadow."""
+
+        self.aggregate = aggregate
+        """Whether the statistics of the samples notified within each period
+        are published instead of the latest values."""
+
+        self.window_size = window_size
+        """Maximum number of samples of a feature aggregated over each
+        period."""
+
+        self.align = align
+        """Whether the values published are those of the latest
+        timestamp-aligned frame."""
+
+        self.tolerance = tolerance
+        """Maximum distance between the timestamps of the samples of a
+        frame."""
+
+
+class ActuatorConfiguration(object):
+    """Feature written whenever a message addressed to the device is received
+    on a topic."""
+
+    def __init__(self, feature_name, topic, qos, initial_value):
+        """Constructor.
+
+        :param feature_name: Name of the feature.
+        :type feature_name: str
+
+        :param topic: Topic the device subscribes to.
+        :type topic: str
+
+        :param qos: MQTT quality of service.
+        :type qos: int
+
+        :param initial_value: Value written when the gateway starts, None not
+            to write any.
+        :type initial_value: str
+        """
+        self.feature_name = feature_name
+        """Name of the feature."""
+
+        self.topic = topic
+        """Topic the device subscribes to."""
+
+        self.qos = qos
+        """MQTT quality of service."""
+
+        self.initial_value = initial_value
+        """Value written when the gateway starts, None not to write any."""
+
+
+class DeviceConfiguration(object):
+    """Configuration of a Bluetooth Low Energy device handled by a
+    gateway."""
+
+    def __init__(self, mac, thing_name, certificate_path, private_key_path,
+        group_id=None, events=None, telemetry=None, actuators=None):
+        """Constructor.
+
+        :param mac: MAC address of the device.
+        :type mac: str
+
+        :param thing_name: Name of the thing on the cloud.
+        :type thing_name: str
+
+        :param certificate_path: Path of the device's certificate.
+        :type certificate_path: str
+
+        :param private_key_path: Path of the device's private key.
+        :type private_key_path: str
+
+        :param group_id: Identifier of the group of the device, None for the
+            group discovered first.
+        :type group_id: str
+
+        :param events: Features published on update.
+        :type events: list of
+            :class:`edge_st_sdk.gateway.device_manifest.EventConfiguration`
+
+        :param telemetry: Features published periodically, or None.
+        :type telemetry:
+            :class:`edge_st_sdk.gateway.device_manifest.TelemetryConfiguration`
+
+        :param actuators: Features written on request.
+        :type actuators: list of
+            :class:`edge_st_sdk.gateway.device_manifest.ActuatorConfiguration`
+        """
+        self.mac = mac.lower()
+        """MAC address of the device, lower case."""
+
+        self.thing_name = thing_name
+        """Name of the thing on the cloud."""
+
+        self.certificate_path = certificate_path
+        """Path of the device's certificate."""
+
+        self.private_key_path = private_key_path
+        """Path of the device's private key."""
+
+        self.group_id = group_id
+        """Identifier of the group of the device."""
+
+        self.events = events or []
+        """Features published on update."""
+
+        self.telemetry = telemetry
+        """Features published periodically."""
+
+        self.actuators = actuators or []
+        """Features written on request."""
+
+    def get_feature_names(self):
+        """Get the names of all the features used by the device, without
+        duplicates.
+
+        :returns: The names of the features.
+        :rtype: list
+        """
+        feature_names = [event.feature_name for event in self.events]
+        if self.telemetry is not None:
+            feature_names += self.telemetry.feature_names
+        feature_names += [actuator.feature_name \
+            for actuator in self.actuators]
+        return sorted(set(feature_names), key=feature_names.index)
+
+
+class DeviceManifest(object):
+    """Manifest of the Bluetooth Low Energy devices handled by a gateway."""
+
+    def __init__(self, devices):
+        """Constructor.
+
+        :param devices: Configurations of the devices.
+        :type devices: list of
+            :class:`edge_st_sdk.gateway.device_manifest.DeviceConfiguration`
+
+        :raises EdgeSTInvalidDataException: is raised if two devices have the
+            same MAC address or thing name.
+        """
+        self._devices = list(devices)
+        """Configurations of the devices."""
+
+        for attribute in ['mac', 'thing_name']:
+            counts = Counter(
+                getattr(device, attribute) for device in self._devices)
+            duplicates = sorted(
+                value for value, count in counts.items() if count > 1)
+            if duplicates:
+                raise EdgeSTInvalidDataException(
+                    'Duplicated device "%s" in the manifest: %s.' \
+                    % (attribute, ', '.join(duplicates)))
+
+        self._devices_by_mac = dict(
+            (device.mac, device) for device in self._devices)
+        """Configurations of the devices, indexed by MAC address."""
+
+    @classmethod
+    def load(self, path):
+        """Load a manifest from a JSON file.
+
+        :param path: Path of the manifest.
+        :type path: str
+
+        :returns: The manifest.
+        :rtype: :class:`edge_st_sdk.gateway.device_manifest.DeviceManifest`
+
+        :raises EdgeSTInvalidDataException: is raised if the manifest can not
+            be read or is not valid.
+        """
+        try:
+            with open(path, 'r') as manifest_file:
+                document = json.load(manifest_file)
+        except (IOError, ValueError) as e:
+            raise EdgeSTInvalidDataException(
+                'Invalid device manifest "%s": %s' % (path, str(e)))
+        return self.from_dict(document, os.path.dirname(os.path.abspath(path)))
+
+    @classmethod
+    def from_dict(self, document, base_path='.'):
+        """Build a manifest from its JSON representation.
+
+        :param document: JSON representation of the manifest.
+        :type document: dict
+
+        :param base_path: Folder relative paths are resolved against.
+        :type base_path: str
+
+        :returns: The manifest.
+        :rtype: :class:`edge_st_sdk.gateway.device_manifest.DeviceManifest`
+
+        :raises EdgeSTInvalidDataException: is raised if the manifest is not
+            valid.
+        """
+        if not isinstance(document, dict) or \
+            not isinstance(document.get('devices'), list):
+            raise EdgeSTInvalidDataException(
+                'The device manifest must contain a list of "devices".')
+        defaults = document.get('defaults', {})
+        devices = []
+        for index, entry in enumerate(document['devices']):
+            if not isinstance(entry, dict):
+                raise EdgeSTInvalidDataException(
+                    'Invalid device #%d in the manifest.' % (index))
+            settings = dict(defaults)
+            settings.update(entry)
+            devices.append(self._parse_device(settings, base_path, index))
+        return DeviceManifest(devices)
+
+    @classmethod
+    def _parse_device(self, settings, base_path, index):
+        """Build the configuration of a device.
+
+        :returns: The configuration of the device.
+        :rtype: :class:`edge_st_sdk.gateway.device_manifest.DeviceConfiguration`
+
+        :raises EdgeSTInvalidDataException: is raised if the configuration is
+            not valid.
+        """
+        for key in ['mac', 'thing_name']:
+            if not settings.get(key):
+                raise EdgeSTInvalidDataException(
+                    'Missing "%s" for device #%d in the manifest.' \
+                    % (key, index))
+        thing_name = settings['thing_name']
+
+        def get_path(key, extension):
+            path = settings.get(key, thing_name + extension)
+            return os.path.normpath(os.path.join(base_path,
+                settings.get('certificates_path', '.'), path))
+
+        def get_flag(entry, key, default):
+            value = entry.get(key, default)
+            if not isinstance(value, bool):
+                raise ValueError('"%s" must be a boolean' % (key))
+            return value
+
+        def get_topic(entry):
+            if not entry.get('topic'):
+                raise EdgeSTInvalidDataException(
+                    'Missing "topic" for device "%s" in the manifest.' \
+                    % (thing_name))
+            return entry['topic'].replace('{thing_name}', thing_name)
+
+        try:
+            events = [EventConfiguration(
+                entry['feature'],
+                get_topic(entry),
+                int(entry.get('qos', DEFAULT_QOS))) \
+                for entry in settings.get('events', [])]
+            telemetry = None
+            if settings.get('telemetry'):
+                entry = settings['telemetry']
+                telemetry = TelemetryConfiguration(
+                    list(entry['features']),
+                    get_topic(entry),
+                    int(entry.get('qos', DEFAULT_QOS)),
+                    float(entry.get('publish_period_s',
+                        DEFAULT_PUBLISH_PERIOD_s)),
+                    get_flag(entry, 'shadow', True),
+                    get_flag(entry, 'aggregate', False),
+                    int(entry.get('window_size', DEFAULT_WINDOW_SIZE)),
+                    get_flag(entry, 'align', False),
+                    int(entry.get('tolerance', DEFAULT_TOLERANCE)))
+                if telemetry.publish_period_s <= 0:
+                    raise ValueError('invalid "publish_period_s"')
+                if telemetry.window_size <= 0:
+                    raise ValueError('invalid "window_size"')
+                if telemetry.aggregate and telemetry.align:
+                    raise ValueError('"aggregate" and "align" are exclusive')
+                if telemetry.tolerance < 0:
+                    raise ValueError('invalid "tolerance"')
+            actuators = [ActuatorConfiguration(
+                entry['feature'],
+                get_topic(entry),
+                int(entry.get('qos', DEFAULT_QOS)),
+                None if entry.get('initial_value') is None \
+                    else str(entry['initial_value'])) \
+                for entry in settings.get('actuators', [])]
+        except (KeyError, TypeError, ValueError) as e:
+            raise EdgeSTInvalidDataException(
+                'Invalid configuration for device "%s" in the manifest: %s' \
+                % (thing_name, str(e)))
+
+        return DeviceConfiguration(
+            settings['mac'],
+            thing_name,
+            get_path('certificate', CERTIFICATE_EXTENSION),
+            get_path('private_key', PRIVATE_KEY_EXTENSION),
+            settings.get('group_id'),
+            events,
+            telemetry,
+            actuators)
+
+    def get_devices(self):
+        """Get the configurations of the devices.
+
+        :returns: The configurations of the devices.
+        :rtype: list of
+            :class:`edge_st_sdk.gateway.device_manifest.DeviceConfiguration`
+        """
+        return list(self._devices)
+
+    def get_device(self, mac):
+        """Get the configuration of a device.
+
+        :param mac: MAC address of the device.
+        :type mac: str
+
+        :returns: The configuration of the device, None if not found.
+        :rtype: :class:`edge_st_sdk.gateway.device_manifest.DeviceConfiguration`
+        """
+        return self._devices_by_mac.get(mac.lower())
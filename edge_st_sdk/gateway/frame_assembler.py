@@ -0,0 +1,377 @@
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+
+"""frame_assembler
+
+The frame_assembler module joins the samples of several features of a device
+into frames, matching the timestamps the device assigns to its notifications,
+so that the values of a frame have been sensed at the same time, rather than
+being the latest value of each feature whenever it was received.
+
+A sample joins the pending frame whose timestamp is the closest to its own,
+within a tolerance, and which still lacks that feature; otherwise it starts a
+new frame. A frame is emitted as soon as it holds a sample of every feature.
+As the samples of each feature arrive in timestamp order, completing a frame
+means that the older pending frames can not be completed anymore: those, and
+the frames waiting for longer than a maximum delay, are emitted as incomplete
+frames, or dropped. Samples not newer than the last emitted frame are late,
+and are dropped, so that they can not start a frame older than the pending
+ones.
+
+Timestamps are 16-bit counters which wrap around, as notified by the devices;
+they are unwrapped against the newest timestamp received, hence samples must
+not be more than half the counter range apart.
+"""
+
+
+# IMPORT
+
+from abc import ABCMeta
+from abc import abstractmethod
+
+from edge_st_sdk.utils.python_utils import lock
+
+
+# CONSTANTS
+
+TIMESTAMP_RANGE = 1 << 16
+"""Range of the timestamps of the notifications."""
+
+DEFAULT_TOLERANCE = 10
+"""Default maximum distance between the timestamps of the samples of a frame,
+in timestamp units."""
+
+DEFAULT_MAX_DELAY = 200
+"""Default maximum time a frame waits for its missing features, in timestamp
+units."""
+
+MAX_PENDING_FRAMES = 64
+"""Maximum number of frames waiting for their missing features; the oldest are
+emitted as incomplete frames, or dropped, beyond it."""
+
+
+# CLASSES
+
+class Frame(object):
+    """Samples of several features sensed at the same time."""
+
+    def __init__(self, timestamp, feature_names):
+        """Constructor.
+
+        :param timestamp: Timestamp of the first sample of the frame,
+            unwrapped.
+        :type timestamp: int
+
+        :param feature_names: Names of the features of the frame.
+        :type feature_names: list
+        """
+        self._timestamp = timestamp
+        """Timestamp of the first sample of the frame, unwrapped."""
+
+        self._values = dict((feature_name, None) \
+            for feature_name in feature_names)
+        """Values of the features, indexed by feature name."""
+
+        self._missing = len(feature_names)
+        """Number of features without a sample."""
+
+    def get_timestamp(self):
+        """Get the timestamp of the frame, i.e. of its first sample, as a
+        16-bit counter.
+
+        :returns: The timestamp of the frame.
+        :rtype: int
+        """
+        return self._timestamp % TIMESTAMP_RANGE
+
+    def get_values(self):
+        """Get the values of the features.
+
+        :returns: The values of the features, indexed by feature name; the
+            values of missing features are None.
+        :rtype: dict
+        """
+        return self._values
+
+    def get_value(self, feature_name):
+        """Get the values of a feature.
+
+        :param feature_name: Name of the feature.
+        :type feature_name: str
+
+        :returns: The values of the feature, None if missing.
+        :rtype: list
+        """
+        return self._values[feature_name]
+
+    def get_missing_features(self):
+        """Get the names of the missing features.
+
+        :returns: The names of the missing features.
+        :rtype: list
+        """
+        return [feature_name for feature_name, values \
+            in self._values.items() if values is None]
+
+    def is_complete(self):
+        """Check whether the frame holds a sample of every feature.
+
+        :returns: True if the frame is complete, False otherwise.
+        :rtype: bool
+        """
+        return self._missing == 0
+
+
+class FrameAssembler(object):
+    """Class responsible for joining the samples of several features into
+    timestamp-aligned frames."""
+
+    def __init__(self, feature_names, tolerance=DEFAULT_TOLERANCE,
+        max_delay=DEFAULT_MAX_DELAY, emit_incomplete=False):
+        """Constructor.
+
+        :param feature_names: Names of the features of the frames.
+        :type feature_names: list
+
+        :param tolerance: Maximum distance between the timestamps of the
+            samples of a frame, in timestamp units.
+        :type tolerance: int
+
+        :param max_delay: Maximum time a frame waits for its missing features,
+            in timestamp units, measured on the newest timestamp received.
+        :type max_delay: int
+
+        :param emit_incomplete: If True, frames which can not be completed are
+            emitted with the missing values set to None, otherwise they are
+            dropped.
+        :type emit_incomplete: bool
+        """
+        self._feature_names = list(feature_names)
+        """Names of the features of the frames."""
+
+        self._tolerance = tolerance
+        """Maximum distance between the timestamps of the samples of a
+        frame."""
+
+        self._max_delay = max_delay
+        """Maximum time a frame waits for its missing features."""
+
+        self._emit_incomplete = emit_incomplete
+        """Whether frames which can not be completed are emitted."""
+
+        self._pending = []
+        """Frames waiting for their missing features, from the oldest to the
+        newest."""
+
+        self._newest = None
+        """Newest timestamp received, unwrapped."""
+
+        self._last_emitted = None
+        """Timestamp of the last frame emitted or dropped, unwrapped."""
+
+        self._listeners = ()
+        """Listeners notified of the frames."""
+
+        self._complete_frames = 0
+        """Number of complete frames emitted."""
+
+        self._incomplete_frames = 0
+        """Number of frames which could not be completed."""
+
+        self._late_samples = 0
+        """Number of samples dropped because late."""
+
+    def get_feature_names(self):
+        """Get the names of the features of the frames.
+
+        :returns: The names of the features.
+        :rtype: list
+        """
+        return list(self._feature_names)
+
+    def get_statistics(self):
+        """Get the number of complete frames emitted, of frames which could not
+        be completed, and of samples dropped because late.
+
+        :returns: The statistics, indexed by "complete_frames",
+            "incomplete_frames", and "late_samples".
+        :rtype: dict
+        """
+        return {
+            'complete_frames': self._complete_frames,
+            'incomplete_frames': self._incomplete_frames,
+            'late_samples': self._late_samples
+        }
+
+    def add_listener(self, listener):
+        """Add a listener.
+
+        :param listener: Listener to be added.
+        :type listener:
+            :class:`edge_st_sdk.gateway.frame_assembler.FrameAssemblerListener`
+        """
+        if listener is not None:
+            with lock(self):
+                if not listener in self._listeners:
+                    self._listeners = self._listeners + (listener,)
+
+    def remove_listener(self, listener):
+        """Remove a listener.
+
+        :param listener: Listener to be removed.
+        :type listener:
+            :class:`edge_st_sdk.gateway.frame_assembler.FrameAssemblerListener`
+        """
+        if listener is not None:
+            with lock(self):
+                if listener in self._listeners:
+                    self._listeners = tuple(
+                        l for l in self._listeners if l is not listener)
+
+    def add(self, feature_name, timestamp, values):
+        """Add a sample of a feature. Listeners are notified of the frames
+        emitted as a consequence, on the calling thread.
+
+        :param feature_name: Name of the feature.
+        :type feature_name: str
+
+        :param timestamp: Timestamp of the sample; only its 16 least
+            significant bits are used.
+        :type timestamp: int
+
+        :param values: Values of the sample.
+        :type values: list
+        """
+        with lock(self):
+            timestamp = self._unwrap(timestamp)
+            if self._last_emitted is not None and \
+                timestamp <= self._last_emitted:
+                self._late_samples += 1
+                return
+
+            # Joining the closest pending frame lacking the feature, if any.
+            frame = None
+            for pending in self._pending:
+                distance = abs(pending._timestamp - timestamp)
+                if distance <= self._tolerance \
+                    and pending._values[feature_name] is None \
+                    and (frame is None \
+                        or distance < abs(frame._timestamp - timestamp)):
+                    frame = pending
+            if frame is None:
+                frame = Frame(timestamp, self._feature_names)
+                self._pending.append(frame)
+                self._pending.sort(key=lambda pending: pending._timestamp)
+            frame._values[feature_name] = values
+            frame._missing -= 1
+
+            # Emitting the complete frame, after the older ones, which can not
+            # be completed anymore, and the expired ones.
+            if frame.is_complete():
+                self._emit_until(frame)
+            else:
+                expired = None
+                overflow = len(self._pending) - MAX_PENDING_FRAMES
+                for index, pending in enumerate(self._pending):
+                    if index < overflow or \
+                        pending._timestamp < self._newest - self._max_delay:
+                        expired = pending
+                    else:
+                        break
+                if expired is not None:
+                    self._emit_until(expired)
+
+    def flush(self):
+        """Emit, or drop, the pending frames."""
+        with lock(self):
+            if self._pending:
+                self._emit_until(self._pending[-1])
+
+    def reset(self):
+        """Drop the pending frames, and forget the timestamps received, e.g.
+        when the device reconnects."""
+        with lock(self):
+            self._pending = []
+            self._newest = None
+            self._last_emitted = None
+
+    def _unwrap(self, timestamp):
+        """Unwrap a 16-bit timestamp against the newest timestamp received.
+        To be called with the assembler locked."""
+        timestamp %= TIMESTAMP_RANGE
+        if self._newest is None:
+            self._newest = timestamp
+            return timestamp
+        delta = (timestamp - self._newest) % TIMESTAMP_RANGE
+        if delta >= TIMESTAMP_RANGE // 2:
+            delta -= TIMESTAMP_RANGE
+        timestamp = self._newest + delta
+        self._newest = max(self._newest, timestamp)
+        return timestamp
+
+    def _emit_until(self, last):
+        """Emit, or drop, the pending frames up to a given one. To be called
+        with the assembler locked."""
+        index = self._pending.index(last)
+        frames = self._pending[:index + 1]
+        del self._pending[:index + 1]
+        self._last_emitted = last._timestamp
+        for frame in frames:
+            if frame.is_complete():
+                self._complete_frames += 1
+            else:
+                self._incomplete_frames += 1
+                if not self._emit_incomplete:
+                    continue
+            for listener in self._listeners:
+                listener.on_frame(self, frame)
+
+
+class FrameAssemblerListener(object):
+    """Interface used by the
+    :class:`edge_st_sdk.gateway.frame_assembler.FrameAssembler` class to notify
+    that a frame has been assembled.
+    """
+    __metaclass__ = ABCMeta
+
+    @abstractmethod
+    def on_frame(self, assembler, frame):
+        """To be called whenever a frame is emitted.
+
+        :param assembler: Assembler that has emitted the frame.
+        :type assembler:
+            :class:`edge_st_sdk.gateway.frame_assembler.FrameAssembler`
+
+        :param frame: Frame emitted, complete or not.
+        :type frame: :class:`edge_st_sdk.gateway.frame_assembler.Frame`
+
+        :raises NotImplementedError`: if the method has not been implemented.
+        """
+        raise NotImplementedError('You must implement "on_frame()" to use the '
+                                  '"FrameAssemblerListener" class.')
@@ -0,0 +1,693 @@
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+
+"""gateway
+
+The gateway module wires the features of Bluetooth Low Energy devices
+implementing the "BlueST" protocol to edge clients, as described by a
+:class:`edge_st_sdk.gateway.device_manifest.DeviceManifest`, so that any number
+of devices can be handled without device-specific code.
+
+For each device, the gateway:
+    - publishes the updates of the "event" features as soon as they are
+      notified;
+    - publishes the latest values of the "telemetry" features periodically,
+      the latest frame of their values sensed at the same time, or their
+      statistics over each period, and reports them to the device shadow;
+      aggregated inertial features not published as events are
+      decoded in batches at each period, rather than sample by sample;
+    - writes the "actuator" features whenever a message addressed to the
+      device is received, and reports the written value to the device shadow.
+
+Messages of events and actuators have the format used by the application
+examples, i.e. a JSON object whose key is the name of the feature's field and
+whose value is "(<timestamp>) <thing_name> <value>".
+
+Notifications are dispatched by a
+:class:`edge_st_sdk.gateway.notification_reactor.NotificationReactor`, on a
+thread per node with bluepy 1.2 and later, which also performs the writes
+requested by messages, so that all the Bluetooth operations on a node happen
+on the same thread. Telemetry is published by the
+thread calling :meth:`edge_st_sdk.gateway.gateway.Gateway.process_events`.
+Messages are published without waiting for their acknowledgements, so that a
+slow or offline client does not delay the notifications or the telemetry of
+the other devices.
+"""
+
+
+# IMPORT
+
+import json
+import time
+import heapq
+import logging
+import threading
+
+from blue_st_sdk.feature import FeatureListener
+
+from edge_st_sdk.gateway.aggregation import WindowAggregator
+from edge_st_sdk.gateway.aggregation import check_numpy
+from edge_st_sdk.gateway.frame_assembler import FrameAssembler
+from edge_st_sdk.gateway.frame_assembler import FrameAssemblerListener
+from edge_st_sdk.gateway.imu_batch import ImuBatchDecoder
+from edge_st_sdk.gateway.imu_batch import is_batchable
+from edge_st_sdk.gateway.notification_reactor import NotificationReactor
+from edge_st_sdk.utils.executor import SharedExecutor
+from edge_st_sdk.utils.snapshot import Snapshot
+from edge_st_sdk.utils.tracing import Tracer
+from edge_st_sdk.utils.edge_st_exceptions import EdgeSTInvalidDataException
+from edge_st_sdk.utils.edge_st_exceptions import EdgeSTInvalidOperationException
+
+
+# CONSTANTS
+
+SHADOW_CALLBACK_TIMEOUT_s = 5
+"""Timeout of the device shadow requests."""
+
+WAIT_TIMEOUT_s = 1.0
+"""Maximum time spent waiting for the next telemetry publication by each call
+to :meth:`edge_st_sdk.gateway.gateway.Gateway.process_events`."""
+
+
+# FUNCTIONS
+
+def get_shadow_keys(feature):
+    """Get the keys of the fields of a feature within the device shadow, e.g.
+    "pressure" or "accelerometer_x".
+
+    :param feature: Feature.
+    :type feature: :class:`blue_st_sdk.feature.Feature`
+
+    :returns: The keys, one per field.
+    :rtype: list
+    """
+    name = feature.get_name()
+    return [name.lower() if field.get_name() == name \
+        else (name + '_' + field.get_name()).lower() \
+        for field in feature.get_fields_description()]
+
+def get_message_key(feature):
+    """Get the key of the messages of events and actuators of a feature.
+
+    :param feature: Feature.
+    :type feature: :class:`blue_st_sdk.feature.Feature`
+
+    :returns: The name of the field for single-field features, the name of
+        the feature otherwise.
+    :rtype: str
+    """
+    fields = feature.get_fields_description()
+    return fields[0].get_name() if len(fields) == 1 else feature.get_name()
+
+def write_switch(feature, value):
+    """Write the status of a "Switch" feature.
+
+    :param feature: Feature.
+    :type feature: :class:`blue_st_sdk.features.feature_switch.FeatureSwitch`
+
+    :param value: Value received, "0" meaning off.
+    :type value: str
+
+    :returns: The status written.
+    :rtype: int
+    """
+    status = 0 if value == '0' else 1
+    feature.write_switch_status(status)
+    return status
+
+
+WRITERS = {
+    'Switch': write_switch
+}
+"""Functions writing the actuator features, indexed by feature name. Each
+function receives the feature and the value received as a string, and returns
+the value written."""
+
+
+# CLASSES
+
+class GatewayDevice(object):
+    """Bluetooth Low Energy device handled by a gateway, with its edge
+    client."""
+
+    def __init__(self, configuration):
+        """Constructor.
+
+        :param configuration: Configuration of the device.
+        :type configuration:
+            :class:`edge_st_sdk.gateway.device_manifest.DeviceConfiguration`
+        """
+        self._configuration = configuration
+        """Configuration of the device."""
+
+        self._node = None
+        """Bluetooth node, once attached."""
+
+        self._client = None
+        """Edge client, once started."""
+
+        self._features = {}
+        """Features of the node in use, indexed by name."""
+
+        self._telemetry = None
+        """Snapshot of the latest values of the telemetry features, in the
+        order of :attr:`_telemetry_keys`."""
+
+        self._telemetry_keys = []
+        """Shadow keys of the values of the telemetry snapshot."""
+
+        self._aggregator = None
+        """Aggregator of the samples of the telemetry features, if aggregation
+        is enabled."""
+
+        self._shadow_keys = {}
+        """Shadow keys of the telemetry features, indexed by feature name."""
+
+        self._assembler = None
+        """Assembler of the samples of the telemetry features into
+        timestamp-aligned frames, if alignment is enabled."""
+
+        self._frame = None
+        """Latest timestamp-aligned frame of the telemetry features."""
+
+        self._decoders = {}
+        """Batch decoders of the aggregated inertial features, indexed by
+        feature name."""
+
+        self._reactor = None
+        """Reactor serving the node, once started."""
+
+        self._writers = {}
+        """Functions writing actuator features, indexed by feature name."""
+
+    def get_configuration(self):
+        """Get the configuration of the device.
+
+        :returns: The configuration of the device.
+        :rtype: :class:`edge_st_sdk.gateway.device_manifest.DeviceConfiguration`
+        """
+        return self._configuration
+
+    def get_node(self):
+        """Get the Bluetooth node.
+
+        :returns: The Bluetooth node, None if not attached.
+        :rtype: :class:`blue_st_sdk.node.Node`
+        """
+        return self._node
+
+    def get_client(self):
+        """Get the edge client.
+
+        :returns: The edge client, None if the gateway has not started.
+        :rtype: :class:`edge_st_sdk.edge_client.EdgeClient`
+        """
+        return self._client
+
+    def get_feature(self, feature_name):
+        """Get a feature in use.
+
+        :param feature_name: Name of the feature.
+        :type feature_name: str
+
+        :returns: The feature, None if not in use.
+        :rtype: :class:`blue_st_sdk.feature.Feature`
+        """
+        return self._features.get(feature_name)
+
+    def _publish_telemetry(self):
+        """Publish the latest values of the telemetry features, or their
+        statistics over the last period, and report them to the device
+        shadow."""
+        if self._aggregator is not None:
+            values, content = self._get_statistics()
+        elif self._assembler is not None:
+            values, content = self._get_frame()
+        else:
+            values = dict((key, value) for key, value \
+                in zip(self._telemetry_keys, self._telemetry.read()) \
+                if value is not None)
+            content = values
+        if not values:
+            return
+        telemetry = self._configuration.telemetry
+        message = {'Board_id': self._configuration.thing_name}
+        message.update(content)
+        self._client.publish_async(telemetry.topic, json.dumps(message),
+            telemetry.qos)
+        if telemetry.shadow:
+            self._update_shadow(values)
+
+    def _get_frame(self):
+        """Get the values of the telemetry features within the latest
+        timestamp-aligned frame.
+
+        :returns: The values, indexed by shadow key, and the content of the
+            message, i.e. the values and the timestamp of the frame.
+        :rtype: tuple
+        """
+        frame = self._frame
+        if frame is None:
+            return {}, {}
+        values = {}
+        for feature_name, sample_values in frame.get_values().items():
+            values.update(zip(self._shadow_keys[feature_name], sample_values))
+        content = dict(values)
+        content['Timestamp'] = frame.get_timestamp()
+        return values, content
+
+    def _get_statistics(self):
+        """Compute the statistics of the telemetry features over the last
+        period, and start a new period.
+
+        :returns: The means, indexed by shadow key, and the statistics, indexed
+            by shadow key and then by statistic name.
+        :rtype: tuple
+        """
+        for feature_name, decoder in self._decoders.items():
+            timestamps, values = decoder.decode()
+            self._aggregator.extend(feature_name, values)
+        means = {}
+        statistics = {}
+        for feature_name, window in self._aggregator.compute().items():
+            for column, key in enumerate(self._shadow_keys[feature_name]):
+                means[key] = float(window['mean'][column])
+                statistics[key] = {
+                    'mean': means[key],
+                    'min': float(window['min'][column]),
+                    'max': float(window['max'][column]),
+                    'std': float(window['std'][column]),
+                    'count': window['count']
+                }
+        return means, statistics
+
+    def _update_shadow(self, values):
+        """Report values to the device shadow.
+
+        :param values: Values, indexed by shadow key.
+        :type values: dict
+        """
+        # Updating through the shared executor, as the first update of a shadow
+        # blocks while subscribing to the response topics, and must not delay
+        # the notifications or the telemetry of the other devices.
+        SharedExecutor.instance().submit(self,
+            self._client.update_shadow_state,
+            json.dumps({'state': {'desired': values}}),
+            self._on_shadow_update, SHADOW_CALLBACK_TIMEOUT_s)
+
+    def _on_shadow_update(self, payload, response_status, token):
+        if response_status != 'accepted':
+            logging.getLogger(__name__).debug(
+                'Shadow update of "%s" %s.',
+                self._configuration.thing_name, response_status)
+
+    def _on_message(self, client, userdata, message):
+        """Submit to the reactor the writes requested by a message received on
+        an actuator topic."""
+        try:
+            message_json = json.loads(message.payload.decode('utf-8'))
+        except ValueError:
+            return
+        if not isinstance(message_json, dict):
+            return
+        for actuator in self._configuration.actuators:
+            if actuator.topic != message.topic:
+                continue
+            feature = self._features[actuator.feature_name]
+            content = message_json.get(get_message_key(feature))
+            if not isinstance(content, str):
+                continue
+            fields = content.split(' ')
+            if len(fields) == 3 and \
+                fields[1] == self._configuration.thing_name:
+                self._reactor.call_soon(
+                    self._node, self._write, actuator, fields[2])
+
+    def _write(self, actuator, value):
+        """Write an actuator feature, and report the written value to the device
+        shadow."""
+        feature = self._features[actuator.feature_name]
+        try:
+            notifying = feature.is_notifying()
+            if notifying:
+                self._node.disable_notifications(feature)
+            written = self._writers[actuator.feature_name](feature, value)
+            if notifying:
+                self._node.enable_notifications(feature)
+        except Exception as e:
+            logging.getLogger(__name__).error(
+                'Writing the "%s" feature of "%s" failed: %s',
+                actuator.feature_name, self._configuration.thing_name, str(e))
+            return
+        keys = get_shadow_keys(feature)
+        self._update_shadow({keys[0]: written})
+
+
+class Gateway(object):
+    """Class responsible for wiring the features of Bluetooth Low Energy
+    devices to edge clients, as described by a device manifest.
+
+    The cost of handling the devices grows linearly with their number:
+    notifications are routed to per-device listeners, telemetry publications
+    are scheduled through a heap, and messages are dispatched to the device
+    they are addressed to.
+    """
+
+    def __init__(self, edge, manifest, writers=None):
+        """Constructor.
+
+        :param edge: Edge computing service providing the clients, e.g.
+            :class:`edge_st_sdk.aws.aws_greengrass.AWSGreengrass`.
+        :type edge: object
+
+        :param manifest: Manifest of the devices.
+        :type manifest: :class:`edge_st_sdk.gateway.device_manifest.DeviceManifest`
+
+        :param writers: Functions writing actuator features, indexed by feature
+            name, in addition to :data:`edge_st_sdk.gateway.gateway.WRITERS`.
+        :type writers: dict
+        """
+        self._edge = edge
+        """Edge computing service providing the clients."""
+
+        self._manifest = manifest
+        """Manifest of the devices."""
+
+        self._writers = dict(WRITERS)
+        """Functions writing actuator features, indexed by feature name."""
+        self._writers.update(writers or {})
+
+        self._devices = [GatewayDevice(configuration) \
+            for configuration in manifest.get_devices()]
+        """Devices described by the manifest."""
+
+        self._client_listeners = []
+        """Listeners added to every client."""
+
+        self._schedule = []
+        """Heap of the telemetry publications, as (time, index, device)
+        tuples."""
+
+        self._reactor = NotificationReactor()
+        """Reactor dispatching the notifications of the devices."""
+
+        self._started = False
+        """Whether the gateway has started."""
+
+        self._stop_event = threading.Event()
+        """Event set to stop :meth:`run`."""
+
+    def get_manifest(self):
+        """Get the manifest of the devices.
+
+        :returns: The manifest of the devices.
+        :rtype: :class:`edge_st_sdk.gateway.device_manifest.DeviceManifest`
+        """
+        return self._manifest
+
+    def get_devices(self):
+        """Get the devices described by the manifest.
+
+        :returns: The devices.
+        :rtype: list of :class:`edge_st_sdk.gateway.gateway.GatewayDevice`
+        """
+        return list(self._devices)
+
+    def get_attached_devices(self):
+        """Get the devices attached to a Bluetooth node.
+
+        :returns: The devices.
+        :rtype: list of :class:`edge_st_sdk.gateway.gateway.GatewayDevice`
+        """
+        return [device for device in self._devices \
+            if device._node is not None]
+
+    def add_client_listener(self, listener):
+        """Add a listener to the clients of all the devices.
+
+        :param listener: Listener to be added.
+        :type listener: :class:`edge_st_sdk.edge_client.EdgeClientListener`
+        """
+        self._client_listeners.append(listener)
+        for device in self._devices:
+            if device._client is not None:
+                device._client.add_listener(listener)
+
+    def attach_nodes(self, nodes):
+        """Attach discovered Bluetooth nodes to the devices of the manifest,
+        matching their MAC addresses. Nodes not in the manifest are ignored.
+
+        :param nodes: Discovered nodes.
+        :type nodes: list of :class:`blue_st_sdk.node.Node`
+
+        :returns: The devices still without a node.
+        :rtype: list of :class:`edge_st_sdk.gateway.gateway.GatewayDevice`
+        """
+        devices = dict((device._configuration.mac, device) \
+            for device in self._devices)
+        for node in nodes:
+            device = devices.get(node.get_tag().lower())
+            if device is not None and device._node is None:
+                device._node = node
+        return [device for device in self._devices if device._node is None]
+
+    def start(self):
+        """Connect the attached devices and their clients, and wire the
+        features to the topics and to the device shadows.
+
+        :raises EdgeSTInvalidOperationException: is raised if the gateway has
+            already started, if a client fails to connect, or if telemetry is
+            aggregated and NumPy is not installed.
+        :raises EdgeSTInvalidDataException: is raised if a device does not
+            export a feature of the manifest, or if no writer is available for
+            an actuator feature.
+        """
+        if self._started:
+            raise EdgeSTInvalidOperationException(
+                'The gateway has already started.')
+        devices = self.get_attached_devices()
+
+        # Connecting the nodes and getting their features.
+        for device in devices:
+            configuration = device._configuration
+            if not device._node.is_connected():
+                device._node.connect()
+            features = dict((feature.get_name(), feature) \
+                for feature in device._node.get_features())
+            for feature_name in configuration.get_feature_names():
+                if feature_name not in features:
+                    raise EdgeSTInvalidDataException(
+                        'Device "%s" does not export the "%s" feature.' \
+                        % (configuration.thing_name, feature_name))
+                device._features[feature_name] = features[feature_name]
+            if configuration.telemetry is not None and \
+                configuration.telemetry.aggregate:
+                check_numpy()
+            for actuator in configuration.actuators:
+                if actuator.feature_name not in self._writers:
+                    raise EdgeSTInvalidDataException(
+                        'No writer available for the "%s" feature.' \
+                        % (actuator.feature_name))
+
+        # Getting the clients, and connecting them in parallel.
+        for device in devices:
+            configuration = device._configuration
+            device._client = self._edge.get_client(
+                configuration.thing_name,
+                configuration.certificate_path,
+                configuration.private_key_path,
+                configuration.group_id)
+            for listener in self._client_listeners:
+                device._client.add_listener(listener)
+        futures = [device._client.connect_async() for device in devices]
+        for device, future in zip(devices, futures):
+            if not future.result():
+                raise EdgeSTInvalidOperationException(
+                    'Client "%s" could not connect.' \
+                    % (device._configuration.thing_name))
+
+        # Wiring the features.
+        now = time.time()
+        for index, device in enumerate(devices):
+            configuration = device._configuration
+            device._reactor = self._reactor
+            device._writers = self._writers
+            self._reactor.add_node(device._node)
+            for actuator in configuration.actuators:
+                device._client.subscribe(
+                    actuator.topic, actuator.qos, device._on_message)
+                if actuator.initial_value is not None:
+                    self._reactor.call_soon(device._node, device._write,
+                        actuator, actuator.initial_value)
+            event_names = []
+            for event in configuration.events:
+                device._features[event.feature_name].add_listener(
+                    _EventListener(device, event))
+                event_names.append(event.feature_name)
+            if configuration.telemetry is not None:
+                if configuration.telemetry.aggregate:
+                    device._aggregator = WindowAggregator(
+                        configuration.telemetry.window_size)
+                elif configuration.telemetry.align:
+                    device._assembler = FrameAssembler(
+                        configuration.telemetry.feature_names,
+                        configuration.telemetry.tolerance)
+                    device._assembler.add_listener(_FrameListener(device))
+                for feature_name in configuration.telemetry.feature_names:
+                    feature = device._features[feature_name]
+                    device._shadow_keys[feature_name] = \
+                        get_shadow_keys(feature)
+                    offset = len(device._telemetry_keys)
+                    device._telemetry_keys += device._shadow_keys[feature_name]
+                    if device._aggregator is not None:
+                        # Preallocating the buffers before notifications flow.
+                        device._aggregator.add_series(feature_name,
+                            len(device._shadow_keys[feature_name]))
+                        # Decoding inertial features in batches, unless their
+                        # samples are needed by event listeners.
+                        if is_batchable(feature) and \
+                            feature_name not in event_names:
+                            decoder = ImuBatchDecoder(feature)
+                            decoder.start()
+                            device._decoders[feature_name] = decoder
+                            continue
+                    feature.add_listener(_TelemetryListener(device, offset))
+                device._telemetry = Snapshot(len(device._telemetry_keys))
+                heapq.heappush(self._schedule, (
+                    now + configuration.telemetry.publish_period_s,
+                    index, device))
+            for feature in device._features.values():
+                device._node.enable_notifications(feature)
+        self._reactor.start()
+        self._started = True
+
+    def process_events(self, timeout_s=WAIT_TIMEOUT_s):
+        """Publish the telemetry that is due, then wait for the next
+        publication, or until :meth:`stop` is called.
+
+        :param timeout_s: Maximum time spent waiting.
+        :type timeout_s: float
+        """
+        # Publishing telemetry.
+        now = time.time()
+        while self._schedule and self._schedule[0][0] <= now:
+            due_time, index, device = self._schedule[0]
+            period_s = device._configuration.telemetry.publish_period_s
+            # Skipping missed periods rather than publishing in bursts.
+            next_time = due_time + period_s
+            if next_time <= now:
+                next_time = now + period_s
+            heapq.heapreplace(self._schedule, (next_time, index, device))
+            device._publish_telemetry()
+
+        # Waiting for the next publication.
+        if self._schedule:
+            timeout_s = min(timeout_s, self._schedule[0][0] - time.time())
+        self._stop_event.wait(max(0, timeout_s))
+
+    def run(self):
+        """Handle events until :meth:`stop` is called."""
+        self._stop_event.clear()
+        while not self._stop_event.is_set():
+            self.process_events()
+
+    def stop(self):
+        """Make :meth:`run` return. It can be called from any thread."""
+        self._stop_event.set()
+
+    def shutdown(self):
+        """Disconnect the clients and the nodes of the devices."""
+        self.stop()
+        self._reactor.stop()
+        for device in self._devices:
+            for decoder in device._decoders.values():
+                decoder.stop()
+            if device._client is not None:
+                device._client.disconnect()
+            if device._node is not None and device._node.is_connected():
+                device._node.disconnect()
+        self._schedule = []
+        self._started = False
+
+
+# INTERFACES
+
+class _EventListener(FeatureListener):
+    """Listener publishing each update of a feature."""
+
+    def __init__(self, device, event):
+        super(_EventListener, self).__init__()
+        self._device = device
+        self._event = event
+        self._key = None
+
+    def on_update(self, feature, sample):
+        trace = Tracer.instance().start(feature.get_name())
+        if self._key is None:
+            self._key = get_message_key(feature)
+        payload = json.dumps({self._key: '({:d}) {:s} {:s}'.format(
+            sample.get_timestamp(),
+            self._device._configuration.thing_name,
+            ','.join([str(value) for value in sample.get_data()]))})
+        if trace is not None:
+            trace.mark('encoded')
+        self._device._client.publish_async(
+            self._event.topic, payload, self._event.qos, trace=trace)
+
+
+class _TelemetryListener(FeatureListener):
+    """Listener keeping the latest values of a feature, or adding them to the
+    aggregator or to the frame assembler of the device."""
+
+    def __init__(self, device, offset):
+        super(_TelemetryListener, self).__init__()
+        self._device = device
+        self._offset = offset
+
+    def on_update(self, feature, sample):
+        if self._device._aggregator is not None:
+            self._device._aggregator.add(feature.get_name(), sample.get_data())
+            return
+        if self._device._assembler is not None:
+            self._device._assembler.add(feature.get_name(),
+                sample.get_timestamp(), sample.get_data())
+            return
+        # Writing all the fields at once, so that they are published together.
+        self._device._telemetry.write_many(self._offset, sample.get_data())
+
+
+class _FrameListener(FrameAssemblerListener):
+    """Listener keeping the latest timestamp-aligned frame of a device."""
+
+    def __init__(self, device):
+        super(_FrameListener, self).__init__()
+        self._device = device
+
+    def on_frame(self, assembler, frame):
+        self._device._frame = frame
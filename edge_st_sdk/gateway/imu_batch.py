@@ -0,0 +1,260 @@
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+
+"""imu_batch
+
+The imu_batch module decodes the notifications of high-rate inertial features
+(i.e. "Accelerometer", "Gyroscope", and "Magnetometer") in bulk: the raw
+payloads are collected as they are notified, without building a sample each,
+and are decoded all at once into contiguous NumPy arrays.
+
+Each payload is stored as a record made of the timestamp of the notification,
+as unwrapped by the node, followed by the three 16-bit values of the axes, so
+that a batch is decoded by a single :func:`numpy.frombuffer` call over
+:data:`RECORD_DTYPE`, and timestamps keep increasing across the wrap-arounds of
+the 16-bit timestamps sent by the device.
+
+It requires the NumPy package.
+"""
+
+
+# IMPORT
+
+import struct
+import threading
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from blue_st_sdk.utils.blue_st_exceptions import BlueSTInvalidDataException
+
+from edge_st_sdk.gateway.aggregation import check_numpy
+from edge_st_sdk.utils.edge_st_exceptions import EdgeSTInvalidDataException
+from edge_st_sdk.utils.edge_st_exceptions import EdgeSTInvalidOperationException
+
+
+# CONSTANTS
+
+TIMESTAMP_FORMAT = '<q'
+"""Format of the timestamp of a record, i.e. a little-endian 64-bit signed
+integer, wide enough for unwrapped timestamps."""
+
+TIMESTAMP_LENGTH_BYTES = struct.calcsize(TIMESTAMP_FORMAT)
+"""Length of the timestamp of a record."""
+
+DATA_LENGTH_BYTES = 6
+"""Length of the data of an inertial feature, i.e. three 16-bit values."""
+
+RECORD_LENGTH_BYTES = TIMESTAMP_LENGTH_BYTES + DATA_LENGTH_BYTES
+"""Length of a record."""
+
+SCALE_FACTORS = {
+    'Accelerometer': 1.0,
+    'Gyroscope': 10.0,
+    'Magnetometer': 1.0
+}
+"""Factors the raw values of the supported features are divided by, indexed by
+feature name."""
+
+RECORD_DTYPE = None if numpy is None else numpy.dtype([
+    ('timestamp', TIMESTAMP_FORMAT),
+    ('values', '<i2', (3,))
+])
+"""NumPy data type of a record, i.e. a little-endian 64-bit signed timestamp
+followed by three little-endian 16-bit signed values."""
+
+_TIMESTAMP_STRUCT = struct.Struct(TIMESTAMP_FORMAT)
+"""Packer of the timestamps of the records."""
+
+
+# FUNCTIONS
+
+def is_batchable(feature):
+    """Check whether a feature can be decoded in batches.
+
+    :param feature: Feature.
+    :type feature: :class:`blue_st_sdk.feature.Feature`
+
+    :returns: True if the feature can be decoded in batches, False otherwise.
+    :rtype: bool
+    """
+    return feature.get_name() in SCALE_FACTORS
+
+def decode_records(records, scale_factor=1.0):
+    """Decode records of inertial features.
+
+    :param records: Records, each made of a timestamp and three values, as
+        described by :data:`RECORD_DTYPE`.
+    :type records: bytes
+
+    :param scale_factor: Factor the raw values are divided by.
+    :type scale_factor: float
+
+    :returns: The timestamps, with shape (n,), and the values, with shape
+        (n, 3).
+    :rtype: tuple of :class:`numpy.ndarray`
+
+    :raises EdgeSTInvalidOperationException: is raised if NumPy is not
+        installed.
+    :raises EdgeSTInvalidDataException: is raised if the length of the records
+        is not a multiple of the length of a record.
+    """
+    check_numpy()
+    if len(records) % RECORD_LENGTH_BYTES:
+        raise EdgeSTInvalidDataException(
+            'The length of the records is not a multiple of %d bytes.' \
+            % (RECORD_LENGTH_BYTES))
+    batch = numpy.frombuffer(records, RECORD_DTYPE)
+    values = batch['values'].astype(numpy.float64)
+    if scale_factor != 1.0:
+        values /= scale_factor
+    return batch['timestamp'].copy(), values
+
+
+# CLASSES
+
+class ImuBatchDecoder(object):
+    """Class responsible for collecting the raw notifications of an inertial
+    feature, and for decoding them in bulk.
+
+    While collecting, the feature does not build samples, hence its listeners
+    and loggers are not notified.
+    """
+
+    def __init__(self, feature):
+        """Constructor.
+
+        :param feature: Feature, among the keys of :data:`SCALE_FACTORS`.
+        :type feature: :class:`blue_st_sdk.feature.Feature`
+
+        :raises EdgeSTInvalidOperationException: is raised if NumPy is not
+            installed.
+        :raises EdgeSTInvalidDataException: is raised if the feature can not be
+            decoded in batches.
+        """
+        check_numpy()
+        if not is_batchable(feature):
+            raise EdgeSTInvalidDataException(
+                'The "%s" feature can not be decoded in batches.' \
+                % (feature.get_name()))
+        self._feature = feature
+        """Feature."""
+
+        self._scale_factor = SCALE_FACTORS[feature.get_name()]
+        """Factor the raw values are divided by."""
+
+        self._records = bytearray()
+        """Records collected since the last decoding."""
+
+        self._collecting = False
+        """Whether the notifications of the feature are being collected."""
+
+        self._lock = threading.Lock()
+        """Lock guarding the records."""
+
+    def get_feature(self):
+        """Get the feature.
+
+        :returns: The feature.
+        :rtype: :class:`blue_st_sdk.feature.Feature`
+        """
+        return self._feature
+
+    def get_count(self):
+        """Get the number of notifications collected since the last decoding.
+
+        :returns: The number of notifications collected.
+        :rtype: int
+        """
+        return len(self._records) // RECORD_LENGTH_BYTES
+
+    def is_collecting(self):
+        """Check whether the notifications of the feature are being collected.
+
+        :returns: True if the notifications are being collected, False
+            otherwise.
+        :rtype: bool
+        """
+        return self._collecting
+
+    def start(self):
+        """Start collecting the notifications of the feature, in place of
+        building a sample each.
+
+        :raises EdgeSTInvalidOperationException: is raised if the decoder is
+            already collecting.
+        """
+        if self._collecting:
+            raise EdgeSTInvalidOperationException(
+                'The decoder is already collecting.')
+        # Overriding the method called by the node for each notification.
+        self._feature.update = self._update
+        self._collecting = True
+
+    def stop(self):
+        """Stop collecting the notifications of the feature, which builds a
+        sample for each of them again. Records not decoded yet are kept."""
+        if not self._collecting:
+            return
+        del self._feature.update
+        self._collecting = False
+
+    def decode(self):
+        """Decode the notifications collected since the last decoding, and
+        start a new batch.
+
+        :returns: The timestamps, with shape (n,), and the values, with shape
+            (n, 3), from the oldest notification to the newest.
+        :rtype: tuple of :class:`numpy.ndarray`
+        """
+        with self._lock:
+            records = self._records
+            self._records = bytearray()
+        return decode_records(records, self._scale_factor)
+
+    def _update(self, timestamp, data, offset, notify_update=False):
+        """Collect a notification, in place of
+        :meth:`blue_st_sdk.feature.Feature.update`.
+
+        :param timestamp: Timestamp of the notification, unwrapped by the node.
+        :type timestamp: int
+
+        :returns: The number of bytes read.
+        :rtype: int
+        """
+        if len(data) - offset < DATA_LENGTH_BYTES:
+            raise BlueSTInvalidDataException(
+                'There are no %d bytes available to read.' \
+                % (DATA_LENGTH_BYTES))
+        with self._lock:
+            self._records += _TIMESTAMP_STRUCT.pack(timestamp)
+            self._records += data[offset:offset + DATA_LENGTH_BYTES]
+        return DATA_LENGTH_BYTES
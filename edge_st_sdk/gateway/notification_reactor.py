@@ -0,0 +1,432 @@
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+
+"""notification_reactor
+
+The notification_reactor module dispatches the notifications of many Bluetooth
+Low Energy nodes concurrently, instead of polling the nodes in turn from a
+single loop, so that the notification latency does not grow with the number of
+nodes.
+
+There is no loop at the level of the Bluetooth adapter: each node has a
+"bluepy-helper" process of its own, and nodes are served in one of two ways,
+depending on the version of bluepy:
+    - up to version 1.1, the node reads the output of its helper process
+      itself; such nodes are waited for all at once by a single thread,
+      through a selector (i.e. "epoll" on Linux) on the outputs of the helper
+      processes, which sleeps while the nodes are idle;
+    - from version 1.2, the output of the helper process is read by a thread
+      of bluepy's own, which can not be selected on; such nodes are served by
+      a reader thread each, waiting for notifications in turn with a timeout of
+      :data:`READ_TIMEOUT_s`, hence waking up periodically even while the node
+      is idle. Each of these nodes thus costs two threads, bluepy's one and the
+      reactor's one.
+
+Bluetooth operations other than waiting for notifications, e.g. writing a
+feature, can be submitted to the thread serving a node through
+:meth:`edge_st_sdk.gateway.notification_reactor.NotificationReactor.call_soon`,
+so that they do not compete with the reactor for the node. On reader threads
+they run between two waits, i.e. within :data:`READ_TIMEOUT_s`.
+"""
+
+
+# IMPORT
+
+import os
+import time
+import logging
+import selectors
+import threading
+from collections import deque
+
+from edge_st_sdk.utils.python_utils import lock
+
+
+# CONSTANTS
+
+READ_TIMEOUT_s = 0.1
+"""Maximum time a reader thread waits for a notification before running the
+calls submitted for its node, hence also the period at which it wakes up while
+the node is idle."""
+
+DISPATCH_TIMEOUT_s = 0.001
+"""Time waited for a notification once the output of a helper process is
+readable, so that the reactor does not block if another thread consumed it."""
+
+MAX_DISPATCHES = 16
+"""Maximum number of notifications dispatched for a node before serving the
+others."""
+
+MAINTENANCE_PERIOD_s = 1.0
+"""Period of the checks of the nodes' helper processes, which change whenever
+a node reconnects."""
+
+
+# FUNCTIONS
+
+def get_file_descriptor(node):
+    """Get the file descriptor that becomes readable when a node receives a
+    notification.
+
+    :param node: Node.
+    :type node: :class:`blue_st_sdk.node.Node`
+
+    :returns: The file descriptor of the output of the node's helper process,
+        None if the node is not connected or if its notifications can not be
+        waited for through a file descriptor.
+    :rtype: int
+    """
+    # bluepy 1.2 and later read the output of the helper on a thread of
+    # their own, and queue the lines read.
+    if hasattr(node, '_lineq'):
+        return None
+    try:
+        return node._helper.stdout.fileno()
+    except (AttributeError, ValueError):
+        return None
+
+def uses_file_descriptor(node):
+    """Check whether the notifications of a node can be waited for through a
+    file descriptor.
+
+    :param node: Node.
+    :type node: :class:`blue_st_sdk.node.Node`
+
+    :returns: True if the notifications can be waited for through the output
+        of the node's helper process, False otherwise.
+    :rtype: bool
+    """
+    return hasattr(node, '_helper') and not hasattr(node, '_lineq')
+
+
+# CLASSES
+
+class _NodeEntry(object):
+    """Node served by a reactor."""
+
+    def __init__(self, node, selectable):
+        self.node = node
+        """Node."""
+
+        self.selectable = selectable
+        """Whether the node is waited for through a selector."""
+
+        self.calls = deque()
+        """Calls submitted for the node, as (function, args, kwargs)
+        tuples."""
+
+        self.file_descriptor = None
+        """File descriptor registered in the selector, if any."""
+
+        self.thread = None
+        """Reader thread, for nodes not waited for through a selector."""
+
+        self.running = True
+        """Whether the node is still served."""
+
+
+class NotificationReactor(object):
+    """Class responsible for dispatching the notifications of Bluetooth Low
+    Energy nodes, on a selector's thread shared by the nodes of bluepy up to
+    version 1.1, and on a reader thread per node for later versions.
+
+    Notifications are dispatched through
+    :meth:`blue_st_sdk.node.Node.wait_for_notifications`, hence feature
+    listeners are called on the reactor's threads.
+    """
+
+    def __init__(self, read_timeout_s=READ_TIMEOUT_s):
+        """Constructor.
+
+        :param read_timeout_s: Maximum time a reader thread waits for a
+            notification before running the calls submitted for its node,
+            i.e. the period at which it wakes up while the node is idle.
+        :type read_timeout_s: float
+        """
+        self._read_timeout_s = read_timeout_s
+        """Maximum time a reader thread waits for a notification."""
+
+        self._entries = {}
+        """Nodes served, indexed by identifier."""
+
+        self._changes = deque()
+        """Entries to be registered in or unregistered from the selector, as
+        (entry, added) tuples, applied by the selector's thread."""
+
+        self._selector = None
+        """Selector waiting for the outputs of the helper processes."""
+
+        self._wakeup = None
+        """Pipe waking up the selector's thread, as (read, write) file
+        descriptors."""
+
+        self._thread = None
+        """Selector's thread."""
+
+        self._running = False
+        """Whether the reactor is running."""
+
+        self._logger = logging.getLogger(__name__)
+        """Logger."""
+
+    def add_node(self, node):
+        """Start dispatching the notifications of a node.
+
+        :param node: Node.
+        :type node: :class:`blue_st_sdk.node.Node`
+        """
+        with lock(self):
+            if id(node) in self._entries:
+                return
+            entry = _NodeEntry(node, uses_file_descriptor(node))
+            self._entries[id(node)] = entry
+            if self._running:
+                self._start_entry(entry)
+
+    def remove_node(self, node):
+        """Stop dispatching the notifications of a node. Calls submitted and
+        not yet run are discarded.
+
+        :param node: Node.
+        :type node: :class:`blue_st_sdk.node.Node`
+        """
+        with lock(self):
+            entry = self._entries.pop(id(node), None)
+            if entry is None:
+                return
+            entry.running = False
+            if entry.selectable and self._running:
+                self._changes.append((entry, False))
+                self._wake_up()
+
+    def get_nodes(self):
+        """Get the nodes served.
+
+        :returns: The nodes served.
+        :rtype: list of :class:`blue_st_sdk.node.Node`
+        """
+        with lock(self):
+            return [entry.node for entry in self._entries.values()]
+
+    def call_soon(self, node, function, *args, **kwargs):
+        """Run a function on the thread serving a node, as soon as it is not
+        waiting for notifications.
+
+        :param node: Node.
+        :type node: :class:`blue_st_sdk.node.Node`
+
+        :param function: Function to call.
+        :type function: callable
+
+        :raises ValueError: is raised if the node is not served by the
+            reactor.
+        """
+        with lock(self):
+            entry = self._entries.get(id(node))
+            if entry is None:
+                raise ValueError('The node is not served by the reactor.')
+            entry.calls.append((function, args, kwargs))
+            if entry.selectable and self._running:
+                self._wake_up()
+
+    def start(self):
+        """Start dispatching notifications."""
+        with lock(self):
+            if self._running:
+                return
+            self._running = True
+            self._selector = selectors.DefaultSelector()
+            self._wakeup = os.pipe()
+            os.set_blocking(self._wakeup[0], False)
+            self._selector.register(self._wakeup[0], selectors.EVENT_READ)
+            self._thread = threading.Thread(
+                target=self._run_selector,
+                args=(self._selector,),
+                name='edge_st_sdk-reactor')
+            self._thread.daemon = True
+            self._thread.start()
+            for entry in self._entries.values():
+                self._start_entry(entry)
+
+    def stop(self, wait=True):
+        """Stop dispatching notifications. Nodes stay registered, and are
+        served again by :meth:`start`.
+
+        :param wait: If True, wait for the reactor's threads to terminate.
+        :type wait: bool
+        """
+        with lock(self):
+            if not self._running:
+                return
+            self._running = False
+            # Releasing the selector before waking its thread up, so that the
+            # thread exits rather than waiting again. The selector's thread
+            # closes the selector and the pipe.
+            self._selector = None
+            self._wake_up()
+            self._wakeup = None
+            threads = [self._thread] + [entry.thread \
+                for entry in self._entries.values() if entry.thread is not None]
+            for entry in self._entries.values():
+                entry.thread = None
+                entry.file_descriptor = None
+            self._thread = None
+        if wait:
+            for thread in threads:
+                if thread is not threading.current_thread():
+                    thread.join()
+
+    def _start_entry(self, entry):
+        """Start serving a node. To be called with the reactor locked."""
+        if entry.selectable:
+            self._changes.append((entry, True))
+            self._wake_up()
+        else:
+            entry.thread = threading.Thread(
+                target=self._run_reader,
+                args=(entry,),
+                name='edge_st_sdk-reactor-%s' % (entry.node.get_name()))
+            entry.thread.daemon = True
+            entry.thread.start()
+
+    def _wake_up(self):
+        """Wake up the selector's thread. To be called with the reactor
+        locked."""
+        if self._wakeup is not None:
+            try:
+                os.write(self._wakeup[1], b'\0')
+            except OSError:
+                # The pipe is full, hence the thread is going to wake up.
+                pass
+
+    def _run_calls(self, entry):
+        """Run the calls submitted for a node."""
+        while entry.calls:
+            function, args, kwargs = entry.calls.popleft()
+            try:
+                function(*args, **kwargs)
+            except Exception:
+                self._logger.exception(
+                    'Call submitted for node "%s" failed.',
+                    entry.node.get_name())
+
+    def _dispatch(self, entry, timeout_s):
+        """Dispatch the notifications of a node.
+
+        :returns: True if a notification was dispatched, False otherwise.
+        :rtype: bool
+        """
+        try:
+            return bool(entry.node.wait_for_notifications(timeout_s))
+        except Exception:
+            self._logger.exception(
+                'Dispatching the notifications of node "%s" failed.',
+                entry.node.get_name())
+            return False
+
+    def _run_reader(self, entry):
+        """Serve a node on a thread of its own."""
+        while entry.running and entry.thread is threading.current_thread():
+            self._run_calls(entry)
+            if entry.node.is_connected():
+                self._dispatch(entry, self._read_timeout_s)
+            else:
+                time.sleep(self._read_timeout_s)
+
+    def _update_registration(self, selector, entry):
+        """Register the current output of a node's helper process in the
+        selector, replacing the previous one."""
+        file_descriptor = get_file_descriptor(entry.node) \
+            if entry.running and entry.node.is_connected() else None
+        if file_descriptor == entry.file_descriptor:
+            return
+        if entry.file_descriptor is not None:
+            try:
+                selector.unregister(entry.file_descriptor)
+            except (KeyError, ValueError, OSError):
+                pass
+        entry.file_descriptor = None
+        if file_descriptor is not None:
+            try:
+                selector.register(file_descriptor, selectors.EVENT_READ, entry)
+                entry.file_descriptor = file_descriptor
+            except (KeyError, ValueError, OSError):
+                pass
+
+    def _run_selector(self, selector):
+        """Serve the nodes waited for through the selector."""
+        with lock(self):
+            wakeup = self._wakeup
+        entries = []
+        next_maintenance = time.time() + MAINTENANCE_PERIOD_s
+        try:
+            while self._selector is selector:
+                # Applying changes.
+                with lock(self):
+                    changes = list(self._changes)
+                    self._changes.clear()
+                for entry, added in changes:
+                    if added:
+                        entries.append(entry)
+                    elif entry in entries:
+                        entries.remove(entry)
+                    self._update_registration(selector, entry)
+
+                # Running submitted calls.
+                for entry in entries:
+                    if entry.calls:
+                        self._run_calls(entry)
+
+                # Waiting for notifications.
+                timeout_s = max(0, next_maintenance - time.time())
+                for key, _ in selector.select(timeout_s):
+                    if key.data is None:
+                        try:
+                            while os.read(wakeup[0], 4096):
+                                pass
+                        except OSError:
+                            pass
+                        continue
+                    entry = key.data
+                    dispatches = 0
+                    while dispatches < MAX_DISPATCHES and \
+                        self._dispatch(entry, DISPATCH_TIMEOUT_s):
+                        dispatches += 1
+                    if not entry.node.is_connected():
+                        self._update_registration(selector, entry)
+
+                # Following the helper processes of reconnected nodes.
+                if time.time() >= next_maintenance:
+                    for entry in entries:
+                        self._update_registration(selector, entry)
+                    next_maintenance = time.time() + MAINTENANCE_PERIOD_s
+        finally:
+            selector.close()
+            for file_descriptor in wakeup:
+                os.close(file_descriptor)
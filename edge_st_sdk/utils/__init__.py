@@ -1,4 +1,12 @@
 __all__ = [
 	'python_utils', \
-    'edge_st_exceptions'
+    'edge_st_exceptions', \
+    'event_bus', \
+    'executor', \
+    'histogram', \
+    'log_utils', \
+    'metrics', \
+    'profiler', \
+    'snapshot', \
+    'tracing'
 ]
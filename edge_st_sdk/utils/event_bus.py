@@ -0,0 +1,227 @@
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+
+"""event_bus
+
+The event_bus module delivers status changes to listeners asynchronously, so
+that slow listeners never delay the objects notifying them.
+"""
+
+
+# IMPORT
+
+import logging
+import threading
+from collections import deque
+
+from edge_st_sdk.utils.python_utils import lock
+from edge_st_sdk.utils.metrics import MetricsRegistry
+
+
+# CLASSES
+
+class EventBus(object):
+    """Class responsible for delivering status changes to listeners on a
+    dedicated worker thread.
+
+    Status changes are posted without blocking; while a change of a given
+    source waits to be delivered, further changes of the same source are
+    coalesced into it, so that listeners are notified about the transition
+    from the oldest to the newest status. Changes to a terminal status, e.g. a
+    disconnection, are never coalesced into later ones, so listeners are
+    always notified about them. The number of sources with pending changes is
+    bounded, and changes exceeding the bound are dropped, terminal ones
+    excepted.
+    """
+
+    _INSTANCE = None
+    """Instance object."""
+
+    MAX_PENDING_SOURCES = 1024
+    """Default maximum number of sources with pending changes."""
+
+    def __init__(self, max_pending_sources=MAX_PENDING_SOURCES):
+        """Constructor.
+
+        :param max_pending_sources: Maximum number of sources with pending
+            changes.
+        :type max_pending_sources: int
+        """
+        self._max_pending_sources = max_pending_sources
+        """Maximum number of sources with pending changes."""
+
+        self._queue = deque()
+        """Sources with pending changes, once per change, in posting order."""
+
+        self._pending = {}
+        """Pending changes, as lists of [listeners, new_status, old_status,
+        terminal] lists, oldest first, indexed by source."""
+
+        self._condition = threading.Condition()
+        """Condition variable guarding the pending changes."""
+
+        self._dropped = 0
+        """Number of dropped changes."""
+
+        self._dropped_counter = MetricsRegistry.instance().counter(
+            'edge_st_sdk_event_bus_dropped_changes_total',
+            'Status changes dropped because too many sources had pending '
+            'changes.')
+        """Number of dropped changes, as a metric."""
+
+        self._thread = None
+        """Worker thread."""
+
+        self._logger = logging.getLogger(__name__)
+        """Logger."""
+
+    @classmethod
+    def instance(self):
+        """Getting the process-wide instance of the class.
+
+        :returns: The process-wide instance of the class.
+        :rtype: :class:`edge_st_sdk.utils.event_bus.EventBus`
+        """
+        if self._INSTANCE is None:
+            with lock(self):
+                if self._INSTANCE is None:
+                    self._INSTANCE = EventBus()
+                    MetricsRegistry.instance().gauge(
+                        'edge_st_sdk_event_bus_pending_sources',
+                        'Sources with status changes waiting to be delivered.',
+                        function=self._INSTANCE.get_pending)
+        return self._INSTANCE
+
+    def post(self, source, listeners, new_status, old_status, terminal=False):
+        """Post a status change, to be delivered to the listeners through their
+        "on_status_change(source, new_status, old_status)" method.
+
+        :param source: Object that has changed its status.
+
+        :param listeners: Immutable snapshot of the listeners to notify.
+        :type listeners: tuple
+
+        :param new_status: New status.
+        :type new_status: :class:`enum.Enum`
+
+        :param old_status: Old status.
+        :type old_status: :class:`enum.Enum`
+
+        :param terminal: Whether the new status is terminal, in which case the
+            change is neither coalesced into later ones nor dropped.
+        :type terminal: bool
+
+        :returns: True if the change has been posted or coalesced, False if it
+            has been dropped.
+        :rtype: bool
+        """
+        with self._condition:
+            changes = self._pending.get(source)
+            if changes is not None and not changes[-1][3]:
+                change = changes[-1]
+                change[0] = listeners
+                change[1] = new_status
+                change[3] = terminal
+                return True
+            if not listeners and changes is None:
+                return True
+            if changes is not None or terminal \
+                or len(self._pending) < self._max_pending_sources:
+                self._enqueue(source, changes,
+                    [listeners, new_status, old_status, terminal])
+                return True
+            self._dropped += 1
+        self._dropped_counter.inc()
+        self._logger.warning(
+            'Status change of "%s" dropped: too many sources with pending '
+            'changes.', source)
+        return False
+
+    def _enqueue(self, source, changes, change):
+        """Queue a change of a source. To be called holding the condition.
+
+        :param source: Object that has changed its status.
+
+        :param changes: Pending changes of the source, or None.
+        :type changes: list
+
+        :param change: The change, as a [listeners, new_status, old_status,
+            terminal] list.
+        :type change: list
+        """
+        if changes is None:
+            self._pending[source] = [change]
+        else:
+            changes.append(change)
+        self._queue.append(source)
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name='edge_st_sdk-event-bus')
+            self._thread.daemon = True
+            self._thread.start()
+        self._condition.notify()
+
+    def get_dropped(self):
+        """Get the number of dropped changes.
+
+        :returns: The number of dropped changes.
+        :rtype: int
+        """
+        return self._dropped
+
+    def get_pending(self):
+        """Get the number of sources with pending changes.
+
+        :returns: The number of sources with pending changes.
+        :rtype: int
+        """
+        return len(self._pending)
+
+    def _run(self):
+        """Deliver the pending changes."""
+        while True:
+            with self._condition:
+                while not self._queue:
+                    self._condition.wait()
+                source = self._queue.popleft()
+                changes = self._pending[source]
+                listeners, new_status, old_status, _ = changes.pop(0)
+                if not changes:
+                    del self._pending[source]
+            if new_status == old_status:
+                continue
+            for listener in listeners:
+                try:
+                    # Calling user-defined callback.
+                    listener.on_status_change(
+                        source, new_status.value, old_status.value)
+                except Exception:
+                    self._logger.exception(
+                        'Listener "%s" failed handling a status change.',
+                        listener)
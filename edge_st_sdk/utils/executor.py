@@ -0,0 +1,248 @@
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+
+"""executor
+
+The executor module defines a process-wide executor shared by all the objects
+of the SDK, so that the number of threads scales with the number of processor
+cores rather than with the number of clients.
+"""
+
+
+# IMPORT
+
+import os
+import threading
+from collections import deque
+
+from edge_st_sdk.utils.python_utils import lock
+from edge_st_sdk.utils.metrics import MetricsRegistry
+
+
+# CLASSES
+
+class SharedExecutor(object):
+    """Class responsible for running tasks on a bounded pool of threads shared
+    by all the objects of the SDK.
+
+    Tasks are queued per key (usually the object submitting them), and keys
+    are served in round-robin order, so that an object submitting many tasks
+    can not starve the others. Tasks of the same key run one at a time, in
+    submission order. Threads are started lazily, up to the configured number
+    of workers.
+    """
+
+    _INSTANCE = None
+    """Instance object."""
+
+    def __init__(self, max_workers=None, inline=False):
+        """Constructor.
+
+        :param max_workers: Maximum number of threads. Defaults to twice the
+            number of processor cores.
+        :type max_workers: int
+
+        :param inline: If True, tasks are run on the thread submitting them,
+            which is useful for debugging and for single-threaded
+            applications.
+        :type inline: bool
+        """
+        self._condition = threading.Condition()
+        """Condition variable guarding the queues."""
+
+        self._queues = {}
+        """Queues of pending tasks, indexed by key, for the keys with pending
+        or running tasks."""
+
+        self._ready_keys = deque()
+        """Keys with pending tasks and no running task, in round-robin
+        order."""
+
+        self._workers = 0
+        """Number of started threads."""
+
+        self._idle_workers = 0
+        """Number of threads waiting for tasks."""
+
+        self._max_workers = None
+        """Maximum number of threads."""
+
+        self._inline = None
+        """Whether tasks are run on the thread submitting them."""
+
+        self.configure(max_workers, inline)
+
+    @classmethod
+    def instance(self):
+        """Getting the process-wide instance of the class.
+
+        :returns: The process-wide instance of the class.
+        :rtype: :class:`edge_st_sdk.utils.executor.SharedExecutor`
+        """
+        if self._INSTANCE is None:
+            with lock(self):
+                if self._INSTANCE is None:
+                    self._INSTANCE = SharedExecutor()
+                    MetricsRegistry.instance().gauge(
+                        'edge_st_sdk_executor_pending_tasks',
+                        'Tasks waiting to be run by the shared executor.',
+                        function=self._INSTANCE.get_pending_tasks)
+        return self._INSTANCE
+
+    def configure(self, max_workers=None, inline=False):
+        """Configure the executor.
+
+        Reducing the number of workers does not stop threads already started,
+        which terminate as soon as they become idle.
+
+        :param max_workers: Maximum number of threads. Defaults to twice the
+            number of processor cores.
+        :type max_workers: int
+
+        :param inline: If True, tasks are run on the thread submitting them.
+        :type inline: bool
+        """
+        if max_workers is None:
+            max_workers = 2 * (os.cpu_count() or 1)
+        with self._condition:
+            self._max_workers = max(1, max_workers)
+            self._inline = inline
+            self._condition.notify_all()
+
+    def submit(self, key, function, *args, **kwargs):
+        """Submit a task.
+
+        :param key: Key identifying the submitter, used for fair queuing.
+
+        :param function: Function to call.
+        :type function: callable
+
+        :returns: A future holding the result of the call.
+        :rtype: :class:`concurrent.futures.Future`
+        """
+        # Imported here, as "concurrent.futures" is expensive to load.
+        from concurrent.futures import Future
+        future = Future()
+        task = (future, function, args, kwargs)
+        if self._inline:
+            self._run_task(task)
+            return future
+        with self._condition:
+            queue = self._queues.get(key)
+            if queue is None:
+                queue = self._queues[key] = deque()
+                self._ready_keys.append(key)
+            queue.append(task)
+            if self._idle_workers > 0:
+                self._condition.notify()
+            elif self._workers < self._max_workers:
+                self._workers += 1
+                worker = threading.Thread(
+                    target=self._run,
+                    name='edge_st_sdk-executor-%d' % (self._workers))
+                worker.daemon = True
+                worker.start()
+        return future
+
+    def get_pending_tasks(self):
+        """Get the number of tasks waiting to be run.
+
+        :returns: The number of tasks waiting to be run.
+        :rtype: int
+        """
+        with self._condition:
+            return sum(len(queue) for queue in self._queues.values())
+
+    def get_workers(self):
+        """Get the number of started threads.
+
+        :returns: The number of started threads.
+        :rtype: int
+        """
+        return self._workers
+
+    def _next_task(self):
+        """Wait for the next task in round-robin order among the keys.
+
+        :returns: The key and the next task, or None if the thread has to
+            terminate.
+        :rtype: tuple
+        """
+        with self._condition:
+            while not self._ready_keys:
+                if self._workers > self._max_workers:
+                    self._workers -= 1
+                    return None
+                self._idle_workers += 1
+                self._condition.wait()
+                self._idle_workers -= 1
+            key = self._ready_keys.popleft()
+            return key, self._queues[key].popleft()
+
+    def _complete_task(self, key):
+        """Make the next task of a key, if any, ready to run.
+
+        :param key: Key of the completed task.
+        """
+        with self._condition:
+            queue = self._queues[key]
+            if queue:
+                self._ready_keys.append(key)
+                if self._idle_workers > 0:
+                    self._condition.notify()
+            else:
+                del self._queues[key]
+
+    def _run(self):
+        """Run tasks until the thread has to terminate."""
+        while True:
+            next_task = self._next_task()
+            if next_task is None:
+                return
+            key, task = next_task
+            self._run_task(task)
+            task = next_task = None
+            self._complete_task(key)
+
+    def _run_task(self, task):
+        """Run a task and set the result of its future.
+
+        :param task: Tuple of future, function, arguments and keyword
+            arguments.
+        :type task: tuple
+        """
+        future, function, args, kwargs = task
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            result = function(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
@@ -0,0 +1,234 @@
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+
+"""histogram
+
+The histogram module defines a histogram with logarithmic buckets split into
+linear sub-buckets, which records values with a bounded relative error in
+constant time and memory.
+"""
+
+
+# IMPORT
+
+import math
+from threading import Lock
+
+
+# CLASSES
+
+class Histogram(object):
+    """Histogram of positive values, e.g. latencies in seconds.
+
+    Each power-of-two range of values is split into a fixed number of linear
+    sub-buckets, as HDR histograms do, so that the relative error of the
+    reported percentiles is bounded by the inverse of the number of
+    sub-buckets.
+    """
+
+    def __init__(self, lowest_value=1e-6, highest_value=3600.0, sub_buckets=16):
+        """Constructor.
+
+        :param lowest_value: Lowest discernible value. Lower values are counted
+            within the first bucket.
+        :type lowest_value: float
+
+        :param highest_value: Highest trackable value. Higher values are
+            counted within the last bucket.
+        :type highest_value: float
+
+        :param sub_buckets: Number of sub-buckets of each power-of-two range.
+        :type sub_buckets: int
+        """
+        self._lowest_value = float(lowest_value)
+        """Lowest discernible value."""
+
+        self._sub_buckets = sub_buckets
+        """Number of sub-buckets of each power-of-two range."""
+
+        self._ranges = int(math.ceil(
+            math.log(highest_value / self._lowest_value, 2))) + 1
+        """Number of power-of-two ranges."""
+
+        self._counts = [0] * (1 + self._ranges * self._sub_buckets)
+        """Counters of the buckets. The first one counts the values lower than
+        the lowest discernible value."""
+
+        self._count = 0
+        """Number of recorded values."""
+
+        self._sum = 0.0
+        """Sum of the recorded values."""
+
+        self._min = float('inf')
+        """Minimum recorded value."""
+
+        self._max = float('-inf')
+        """Maximum recorded value."""
+
+        self._lock = Lock()
+        """Lock guarding the counters."""
+
+    def _get_index(self, value):
+        """Get the index of the bucket of a value.
+
+        :param value: Value.
+        :type value: float
+
+        :returns: The index of the bucket.
+        :rtype: int
+        """
+        if value < self._lowest_value:
+            return 0
+        ratio = value / self._lowest_value
+        exponent = min(int(math.log(ratio, 2)), self._ranges - 1)
+        sub_bucket = int((ratio / (1 << exponent) - 1.0) * self._sub_buckets)
+        sub_bucket = max(0, min(sub_bucket, self._sub_buckets - 1))
+        return 1 + exponent * self._sub_buckets + sub_bucket
+
+    def _get_upper_bound(self, index):
+        """Get the upper bound of a bucket.
+
+        :param index: Index of the bucket.
+        :type index: int
+
+        :returns: The upper bound of the bucket.
+        :rtype: float
+        """
+        if index == 0:
+            return self._lowest_value
+        exponent, sub_bucket = divmod(index - 1, self._sub_buckets)
+        return self._lowest_value * (1 << exponent) * \
+            (1.0 + float(sub_bucket + 1) / self._sub_buckets)
+
+    def record(self, value):
+        """Record a value.
+
+        :param value: Value to record.
+        :type value: float
+        """
+        index = self._get_index(value)
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum += value
+            if value < self._min:
+                self._min = value
+            if value > self._max:
+                self._max = value
+
+    def reset(self):
+        """Reset the histogram."""
+        with self._lock:
+            self._counts = [0] * len(self._counts)
+            self._count = 0
+            self._sum = 0.0
+            self._min = float('inf')
+            self._max = float('-inf')
+
+    def get_count(self):
+        """Get the number of recorded values.
+
+        :returns: The number of recorded values.
+        :rtype: int
+        """
+        return self._count
+
+    def get_sum(self):
+        """Get the sum of the recorded values.
+
+        :returns: The sum of the recorded values.
+        :rtype: float
+        """
+        return self._sum
+
+    def get_min(self):
+        """Get the minimum recorded value.
+
+        :returns: The minimum recorded value, <nan> if no value has been
+            recorded.
+        :rtype: float
+        """
+        return self._min if self._count else float('nan')
+
+    def get_max(self):
+        """Get the maximum recorded value.
+
+        :returns: The maximum recorded value, <nan> if no value has been
+            recorded.
+        :rtype: float
+        """
+        return self._max if self._count else float('nan')
+
+    def get_mean(self):
+        """Get the mean of the recorded values.
+
+        :returns: The mean of the recorded values, <nan> if no value has been
+            recorded.
+        :rtype: float
+        """
+        return self._sum / self._count if self._count else float('nan')
+
+    def get_percentile(self, percentile):
+        """Get a percentile of the recorded values.
+
+        :param percentile: Percentile, within [0, 100].
+        :type percentile: float
+
+        :returns: The value below which the given percentage of the recorded
+            values falls, <nan> if no value has been recorded.
+        :rtype: float
+        """
+        with self._lock:
+            if not self._count:
+                return float('nan')
+            rank = max(1, int(math.ceil(percentile / 100.0 * self._count)))
+            total = 0
+            for index, count in enumerate(self._counts):
+                total += count
+                if total >= rank:
+                    return max(self._min,
+                        min(self._get_upper_bound(index), self._max))
+            return self._max
+
+    def get_buckets(self):
+        """Get the cumulative counts of the non-empty buckets.
+
+        :returns: A list of (upper_bound, cumulative_count) tuples, sorted by
+            upper bound.
+        :rtype: list
+        """
+        with self._lock:
+            buckets = []
+            total = 0
+            for index, count in enumerate(self._counts):
+                if count:
+                    total += count
+                    buckets.append((self._get_upper_bound(index), total))
+            return buckets
@@ -0,0 +1,210 @@
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+
+"""log_utils
+
+The log_utils module configures the logging of the SDK and of the underlying
+AWS IoT SDK so that it never blocks the calling threads: records are put on a
+bounded queue and written by a dedicated thread, and repeated messages are
+rate limited.
+"""
+
+
+# IMPORT
+
+import time
+import queue
+import logging
+import threading
+from logging.handlers import QueueHandler
+from logging.handlers import QueueListener
+
+
+# CONSTANTS
+
+LOGGERS = ['AWSIoTPythonSDK.core', 'edge_st_sdk']
+"""Loggers configured by the SDK."""
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+"""Default format of the log records."""
+
+DEFAULT_LEVEL = logging.ERROR
+"""Level given to the loggers the application has not set a level to."""
+
+
+# CLASSES
+
+class RateLimitFilter(logging.Filter):
+    """Filter letting through at most a given number of occurrences of the
+    same message, i.e. with the same logger, level and format string, within
+    a period of time. The number of suppressed occurrences is reported with
+    the first occurrence let through afterwards."""
+
+    def __init__(self, burst=5, period_s=10.0):
+        """Constructor.
+
+        :param burst: Maximum number of occurrences of the same message let
+            through within a period.
+        :type burst: int
+
+        :param period_s: Period in seconds.
+        :type period_s: float
+        """
+        super(RateLimitFilter, self).__init__()
+        self._burst = burst
+        self._period_s = period_s
+        self._lock = threading.Lock()
+        self._messages = {}
+        """Rate limiting state, as [period start, occurrences, suppressed]
+        lists indexed by (logger, level, message format)."""
+
+    def filter(self, record):
+        key = (record.name, record.levelno, record.msg)
+        now = time.time()
+        with self._lock:
+            state = self._messages.get(key)
+            if state is None or now - state[0] >= self._period_s:
+                suppressed = state[2] if state is not None else 0
+                self._messages[key] = [now, 1, 0]
+            elif state[1] < self._burst:
+                state[1] += 1
+                suppressed = 0
+            else:
+                state[2] += 1
+                return False
+        if suppressed:
+            record.msg = '%s [%d similar messages suppressed]' \
+                % (record.msg, suppressed)
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Queue handler dropping records when the queue is full instead of
+    blocking or reporting an error."""
+
+    def __init__(self, record_queue):
+        """Constructor.
+
+        :param record_queue: Bounded queue of records.
+        :type record_queue: :class:`queue.Queue`
+        """
+        super(NonBlockingQueueHandler, self).__init__(record_queue)
+        self.dropped = 0
+        """Number of records dropped because the queue was full."""
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+# UTILITY FUNCTIONS.
+
+_lock = threading.Lock()
+"""Lock guarding the configuration."""
+
+_queue_handler = None
+"""Handler attached to the configured loggers."""
+
+_queue_listener = None
+"""Listener writing the queued records on a dedicated thread."""
+
+def configure_logging(level=None, handler=None, queue_size=10000,
+    burst=5, period_s=10.0):
+    """Configure the logging of the SDK and of the underlying AWS IoT SDK.
+
+    The configuration is idempotent: calling it again only updates the level
+    of the loggers, without attaching further handlers. The level is set on
+    the loggers themselves, so that disabled records are discarded by the
+    calling thread before being created.
+
+    :param level: Logging level. If not given, the levels already set by the
+        application are left untouched, and the loggers without a level get
+        :data:`DEFAULT_LEVEL`.
+    :type level: int
+
+    :param handler: Handler writing the records, used on the first call only.
+        Defaults to a :class:`logging.StreamHandler` writing to the standard
+        error.
+    :type handler: :class:`logging.Handler`
+
+    :param queue_size: Maximum number of records waiting to be written;
+        further records are dropped. Used on the first call only.
+    :type queue_size: int
+
+    :param burst: Maximum number of occurrences of the same message logged
+        within a period. Used on the first call only.
+    :type burst: int
+
+    :param period_s: Rate limiting period in seconds. Used on the first call
+        only.
+    :type period_s: float
+    """
+    global _queue_handler, _queue_listener
+    with _lock:
+        if _queue_handler is None:
+            if handler is None:
+                handler = logging.StreamHandler()
+                handler.setFormatter(logging.Formatter(LOG_FORMAT))
+            record_queue = queue.Queue(queue_size)
+            _queue_handler = NonBlockingQueueHandler(record_queue)
+            _queue_handler.addFilter(RateLimitFilter(burst, period_s))
+            _queue_listener = QueueListener(record_queue, handler)
+            _queue_listener.start()
+            for name in LOGGERS:
+                logging.getLogger(name).addHandler(_queue_handler)
+        for name in LOGGERS:
+            logger = logging.getLogger(name)
+            if level is not None:
+                logger.setLevel(level)
+            elif logger.level == logging.NOTSET:
+                logger.setLevel(DEFAULT_LEVEL)
+
+def shutdown_logging():
+    """Write the pending records and detach the handlers attached by
+    :func:`configure_logging`."""
+    global _queue_handler, _queue_listener
+    with _lock:
+        if _queue_handler is None:
+            return
+        for name in LOGGERS:
+            logging.getLogger(name).removeHandler(_queue_handler)
+        _queue_listener.stop()
+        _queue_handler = None
+        _queue_listener = None
+
+def get_dropped_records():
+    """Get the number of records dropped because the queue was full.
+
+    :returns: The number of dropped records.
+    :rtype: int
+    """
+    handler = _queue_handler
+    return handler.dropped if handler is not None else 0
@@ -0,0 +1,427 @@
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+
+"""metrics
+
+The metrics module defines counters, gauges and histograms describing the
+activity of the SDK, and exports them in the Prometheus text format, either
+through a pull API or through a local HTTP endpoint.
+"""
+
+
+# IMPORT
+
+import threading
+
+from edge_st_sdk.utils.python_utils import lock
+from edge_st_sdk.utils.histogram import Histogram
+from edge_st_sdk.utils.edge_st_exceptions import EdgeSTInvalidDataException
+
+
+# CLASSES
+
+class Counter(object):
+    """Monotonically increasing value."""
+
+    TYPE = 'counter'
+    """Prometheus type of the metric."""
+
+    def __init__(self):
+        """Constructor."""
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        """Increase the counter.
+
+        :param amount: Amount to add.
+        :type amount: int
+        """
+        with self._lock:
+            self._value += amount
+
+    def get_value(self):
+        """Get the value of the counter.
+
+        :returns: The value of the counter.
+        :rtype: int
+        """
+        return self._value
+
+    def _samples(self, name, labels):
+        return [(name, labels, self._value)]
+
+
+class Gauge(object):
+    """Value that can go up and down, either set explicitly or computed on
+    demand by a function."""
+
+    TYPE = 'gauge'
+    """Prometheus type of the metric."""
+
+    def __init__(self, function=None):
+        """Constructor.
+
+        :param function: Function without arguments returning the current
+            value of the gauge, or None if the value is not available anymore.
+        :type function: callable
+        """
+        self._value = 0
+        self._function = function
+        self._lock = threading.Lock()
+
+    def set(self, value):
+        """Set the gauge.
+
+        :param value: New value.
+        :type value: float
+        """
+        self._value = value
+
+    def inc(self, amount=1):
+        """Increase the gauge.
+
+        :param amount: Amount to add.
+        :type amount: float
+        """
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount=1):
+        """Decrease the gauge.
+
+        :param amount: Amount to subtract.
+        :type amount: float
+        """
+        with self._lock:
+            self._value -= amount
+
+    def get_value(self):
+        """Get the value of the gauge.
+
+        :returns: The value of the gauge, or None if not available.
+        :rtype: float
+        """
+        if self._function is not None:
+            return self._function()
+        return self._value
+
+    def _samples(self, name, labels):
+        value = self.get_value()
+        if value is None:
+            return []
+        return [(name, labels, value)]
+
+
+class MetricHistogram(object):
+    """Distribution of values, exported as a summary with quantiles, sum and
+    count."""
+
+    TYPE = 'summary'
+    """Prometheus type of the metric."""
+
+    QUANTILES = (0.5, 0.9, 0.99)
+    """Quantiles to export."""
+
+    def __init__(self):
+        """Constructor."""
+        self._histogram = Histogram()
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        """Record a value.
+
+        :param value: Value to record.
+        :type value: float
+        """
+        with self._lock:
+            self._histogram.record(value)
+
+    def get_histogram(self):
+        """Get the underlying histogram.
+
+        :returns: The underlying histogram.
+        :rtype: :class:`edge_st_sdk.utils.histogram.Histogram`
+        """
+        return self._histogram
+
+    def _samples(self, name, labels):
+        with self._lock:
+            samples = [(name, labels + (('quantile', str(quantile)),),
+                self._histogram.get_percentile(quantile * 100.0)) \
+                for quantile in self.QUANTILES]
+            samples.append((name + '_sum', labels, self._histogram.get_sum()))
+            samples.append(
+                (name + '_count', labels, self._histogram.get_count()))
+        return samples
+
+
+class MetricsRegistry(object):
+    """Class responsible for keeping the metrics of the SDK.
+
+    Metrics are identified by a name and by a set of labels, and are created
+    on first use, so that the objects of the SDK can get them without prior
+    registration. The process-wide instance is fed by the SDK itself.
+    """
+
+    _INSTANCE = None
+    """Instance object."""
+
+    def __init__(self):
+        """Constructor."""
+        self._lock = threading.Lock()
+        """Lock guarding the metrics."""
+
+        self._families = {}
+        """Metric families, as [type, help, metrics indexed by labels] lists
+        indexed by name."""
+
+        self._http_server = None
+        """HTTP server exporting the metrics."""
+
+    @classmethod
+    def instance(self):
+        """Getting the process-wide instance of the class.
+
+        :returns: The process-wide instance of the class.
+        :rtype: :class:`edge_st_sdk.utils.metrics.MetricsRegistry`
+        """
+        if self._INSTANCE is None:
+            with lock(self):
+                if self._INSTANCE is None:
+                    self._INSTANCE = MetricsRegistry()
+        return self._INSTANCE
+
+    def counter(self, name, help_text, labels=None):
+        """Get a counter, creating it if needed.
+
+        :param name: Name of the metric.
+        :type name: str
+
+        :param help_text: Description of the metric.
+        :type help_text: str
+
+        :param labels: Labels of the metric.
+        :type labels: dict
+
+        :returns: The counter.
+        :rtype: :class:`edge_st_sdk.utils.metrics.Counter`
+        """
+        return self._get_metric(Counter, name, help_text, labels)
+
+    def gauge(self, name, help_text, labels=None, function=None):
+        """Get a gauge, creating it if needed.
+
+        :param name: Name of the metric.
+        :type name: str
+
+        :param help_text: Description of the metric.
+        :type help_text: str
+
+        :param labels: Labels of the metric.
+        :type labels: dict
+
+        :param function: Function without arguments returning the current
+            value of the gauge, or None if the value is not available anymore.
+            Replaces the function of an existing gauge.
+        :type function: callable
+
+        :returns: The gauge.
+        :rtype: :class:`edge_st_sdk.utils.metrics.Gauge`
+        """
+        gauge = self._get_metric(Gauge, name, help_text, labels)
+        if function is not None:
+            gauge._function = function
+        return gauge
+
+    def histogram(self, name, help_text, labels=None):
+        """Get a histogram, creating it if needed.
+
+        :param name: Name of the metric.
+        :type name: str
+
+        :param help_text: Description of the metric.
+        :type help_text: str
+
+        :param labels: Labels of the metric.
+        :type labels: dict
+
+        :returns: The histogram.
+        :rtype: :class:`edge_st_sdk.utils.metrics.MetricHistogram`
+        """
+        return self._get_metric(MetricHistogram, name, help_text, labels)
+
+    def unregister(self, name, labels=None):
+        """Remove a metric.
+
+        :param name: Name of the metric.
+        :type name: str
+
+        :param labels: Labels of the metric.
+        :type labels: dict
+        """
+        key = tuple(sorted((labels or {}).items()))
+        with self._lock:
+            family = self._families.get(name)
+            if family is not None:
+                family[2].pop(key, None)
+
+    def unregister_matching(self, labels):
+        """Remove all the metrics having the given labels, whatever their
+        name and their other labels.
+
+        :param labels: Labels of the metrics.
+        :type labels: dict
+        """
+        items = set(labels.items())
+        with self._lock:
+            for family in self._families.values():
+                for key in [key for key in family[2] if items <= set(key)]:
+                    del family[2][key]
+
+    def collect(self):
+        """Collect the current samples of all the metrics.
+
+        :returns: Samples, as (name, labels, value) tuples, grouped by family
+            into (name, type, help, samples) tuples.
+        :rtype: list
+        """
+        with self._lock:
+            families = [(name, family[0], family[1], list(family[2].items())) \
+                for name, family in sorted(self._families.items())]
+        result = []
+        for name, metric_type, help_text, metrics in families:
+            samples = []
+            for labels, metric in metrics:
+                samples.extend(metric._samples(name, labels))
+            result.append((name, metric_type, help_text, samples))
+        return result
+
+    def render(self):
+        """Render all the metrics in the Prometheus text exposition format.
+
+        :returns: The metrics in the Prometheus text format.
+        :rtype: str
+        """
+        lines = []
+        for name, metric_type, help_text, samples in self.collect():
+            lines.append('# HELP %s %s' % (
+                name, help_text.replace('\\', '\\\\').replace('\n', '\\n')))
+            lines.append('# TYPE %s %s' % (name, metric_type))
+            for sample_name, labels, value in samples:
+                if labels:
+                    lines.append('%s{%s} %s' % (sample_name, ','.join(
+                        ['%s="%s"' % (label, self._escape(label_value)) \
+                            for label, label_value in labels]), repr(
+                        float(value))))
+                else:
+                    lines.append('%s %s' % (sample_name, repr(float(value))))
+        return '\n'.join(lines) + '\n'
+
+    def start_http_server(self, port=9100, address='127.0.0.1'):
+        """Start a local HTTP server exporting the metrics in the Prometheus
+        text format on the "/metrics" path.
+
+        :param port: TCP port to listen on.
+        :type port: int
+
+        :param address: Address to listen on.
+        :type address: str
+
+        :returns: The address and port the server listens on.
+        :rtype: tuple
+        """
+        # Imported here, as "http.server" is expensive to load.
+        from http.server import BaseHTTPRequestHandler
+        from http.server import HTTPServer
+
+        with self._lock:
+            if self._http_server is None:
+                registry = self
+
+                class MetricsHandler(BaseHTTPRequestHandler):
+                    def do_GET(self):
+                        if self.path.split('?')[0] not in ['/', '/metrics']:
+                            self.send_error(404)
+                            return
+                        body = registry.render().encode('utf-8')
+                        self.send_response(200)
+                        self.send_header('Content-Type',
+                            'text/plain; version=0.0.4; charset=utf-8')
+                        self.send_header('Content-Length', str(len(body)))
+                        self.end_headers()
+                        self.wfile.write(body)
+
+                    def log_message(self, format, *args):
+                        pass
+
+                self._http_server = HTTPServer((address, port), MetricsHandler)
+                thread = threading.Thread(
+                    target=self._http_server.serve_forever,
+                    name='edge_st_sdk-metrics')
+                thread.daemon = True
+                thread.start()
+            return self._http_server.server_address
+
+    def stop_http_server(self):
+        """Stop the local HTTP server, if running."""
+        with self._lock:
+            http_server = self._http_server
+            self._http_server = None
+        if http_server is not None:
+            http_server.shutdown()
+            http_server.server_close()
+
+    def _get_metric(self, metric_class, name, help_text, labels):
+        """Get a metric, creating it if needed.
+
+        :raises EdgeSTInvalidDataException: is raised if a metric with the same name but of a
+            different type exists.
+        """
+        key = tuple(sorted((labels or {}).items()))
+        family = self._families.get(name)
+        if family is not None:
+            metric = family[2].get(key)
+            if metric is not None and type(metric) is metric_class:
+                return metric
+        with self._lock:
+            family = self._families.setdefault(
+                name, [metric_class.TYPE, help_text, {}])
+            if family[0] != metric_class.TYPE:
+                raise EdgeSTInvalidDataException('Metric "%s" is a %s, not a %s.' \
+                    % (name, family[0], metric_class.TYPE))
+            metric = family[2].get(key)
+            if metric is None:
+                metric = family[2][key] = metric_class()
+            return metric
+
+    @staticmethod
+    def _escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"') \
+            .replace('\n', '\\n')
@@ -0,0 +1,382 @@
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+
+"""profiler
+
+The profiler module defines a sampling profiler which can be started and
+stopped at runtime on a running gateway, either programmatically, through a
+signal, or through a local control socket. It periodically samples the stacks
+of the threads of the SDK, and of the network threads of the underlying AWS
+IoT SDK, and writes them in the collapsed-stack format used by flame graph
+tools (e.g. "flamegraph.pl" or "speedscope").
+"""
+
+
+# IMPORT
+
+import os
+import sys
+import socket
+import signal
+import threading
+
+from edge_st_sdk.utils.python_utils import lock
+
+
+# CLASSES
+
+class SamplingProfiler(object):
+    """Class responsible for sampling the stacks of the threads of the SDK.
+
+    Samples are aggregated in memory by stack, and written to the output file
+    when the profiler is stopped. Both the number of distinct stacks and the
+    size of the output file are bounded.
+    """
+
+    _INSTANCE = None
+    """Instance object."""
+
+    THREAD_NAME_PREFIX = 'edge_st_sdk-'
+    """Prefix of the names of the threads started by the SDK."""
+
+    SDK_PATHS = (
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep,
+        os.sep + 'AWSIoTPythonSDK' + os.sep
+    )
+    """Path fragments identifying the modules of the SDK and of the
+    underlying AWS IoT SDK."""
+
+    OUTPUT_PATH = 'edge_st_sdk_profile.folded'
+    """Default path of the output file."""
+
+    def __init__(self):
+        """Constructor."""
+        self._output_path = self.OUTPUT_PATH
+        """Path of the output file."""
+
+        self._interval_s = 0.01
+        """Sampling interval in seconds."""
+
+        self._max_stacks = 10000
+        """Maximum number of distinct stacks kept in memory."""
+
+        self._max_file_size = 1024 * 1024
+        """Maximum size in bytes of the output file."""
+
+        self._all_threads = False
+        """Whether to sample all the threads of the process."""
+
+        self._stacks = {}
+        """Number of samples, indexed by collapsed stack."""
+
+        self._stacks_lock = threading.Lock()
+        """Lock guarding the samples, updated by the sampling thread."""
+
+        self._samples = 0
+        """Number of samples taken."""
+
+        self._stop_event = None
+        """Event stopping the current sampling thread."""
+
+        self._thread = None
+        """Sampling thread."""
+
+        self._toggle_event = threading.Event()
+        """Event set by the signal handler to toggle the profiler."""
+
+        self._signal_thread = None
+        """Thread toggling the profiler on behalf of the signal handler."""
+
+        self._control_socket = None
+        """Control socket."""
+
+    @classmethod
+    def instance(self):
+        """Getting the process-wide instance of the class.
+
+        :returns: The process-wide instance of the class.
+        :rtype: :class:`edge_st_sdk.utils.profiler.SamplingProfiler`
+        """
+        if self._INSTANCE is None:
+            with lock(self):
+                if self._INSTANCE is None:
+                    self._INSTANCE = SamplingProfiler()
+        return self._INSTANCE
+
+    def configure(self, output_path=OUTPUT_PATH, interval_s=0.01,
+        max_stacks=10000, max_file_size=1024 * 1024, all_threads=False):
+        """Configure the profiler. Takes effect at the next start.
+
+        :param output_path: Path of the output file, overwritten at each stop.
+        :type output_path: str
+
+        :param interval_s: Sampling interval in seconds.
+        :type interval_s: float
+
+        :param max_stacks: Maximum number of distinct stacks kept in memory;
+            further stacks are accounted to a "[truncated]" stack.
+        :type max_stacks: int
+
+        :param max_file_size: Maximum size in bytes of the output file; the
+            least frequent stacks are left out when exceeding it.
+        :type max_file_size: int
+
+        :param all_threads: Whether to sample all the threads of the process
+            rather than the ones of the SDK only.
+        :type all_threads: bool
+        """
+        self._output_path = output_path
+        self._interval_s = interval_s
+        self._max_stacks = max_stacks
+        self._max_file_size = max_file_size
+        self._all_threads = all_threads
+
+    def is_running(self):
+        """Check whether the profiler is sampling.
+
+        :returns: True if the profiler is sampling, False otherwise.
+        :rtype: bool
+        """
+        stop_event = self._stop_event
+        return stop_event is not None and not stop_event.is_set()
+
+    def start(self):
+        """Start sampling. Has no effect if already sampling.
+
+        If a previous sampling is still writing its output file, waits for it
+        to complete first. Must not be called from a signal handler, see
+        :meth:`install_signal_handler` instead.
+        """
+        with lock(self):
+            if self.is_running():
+                return
+            if self._thread is not None:
+                self._thread.join()
+            stop_event = threading.Event()
+            self._stop_event = stop_event
+            with self._stacks_lock:
+                self._stacks = {}
+            self._samples = 0
+            self._thread = threading.Thread(
+                target=self._run, args=(stop_event,),
+                name='edge_st_sdk-profiler')
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self, wait=True):
+        """Stop sampling and write the output file. Has no effect if not
+        sampling.
+
+        Must not be called from a signal handler, see
+        :meth:`install_signal_handler` instead.
+
+        :param wait: Whether to wait for the output file to be written.
+        :type wait: bool
+        """
+        with lock(self):
+            thread = self._thread
+            if self._stop_event is not None:
+                self._stop_event.set()
+        if wait and thread is not None \
+            and thread is not threading.current_thread():
+            thread.join()
+
+    def toggle(self, wait=False):
+        """Start sampling if not sampling, stop otherwise.
+
+        :param wait: Whether to wait for the output file to be written when
+            stopping.
+        :type wait: bool
+        """
+        if self.is_running():
+            self.stop(wait)
+        else:
+            self.start()
+
+    def install_signal_handler(self, signum=signal.SIGUSR2):
+        """Toggle the profiler whenever the process receives the given signal,
+        e.g. with "kill -USR2 <pid>". Must be called from the main thread.
+
+        The handler only sets an event, the profiler being toggled by a
+        dedicated thread, so that the interrupted thread never waits for a
+        lock it may be holding.
+
+        :param signum: Signal number.
+        :type signum: int
+        """
+        with lock(self):
+            if self._signal_thread is None:
+                self._signal_thread = threading.Thread(
+                    target=self._serve_signal,
+                    name='edge_st_sdk-profiler-signal')
+                self._signal_thread.daemon = True
+                self._signal_thread.start()
+        signal.signal(signum, lambda signum, frame: self._toggle_event.set())
+
+    def start_control_socket(self, path='/tmp/edge_st_sdk_profiler.sock'):
+        """Listen for commands on a local Unix domain socket, e.g. with
+        "echo start | nc -U <path>". Supported commands are "start", "stop"
+        and "status"; each connection gets back a one-line reply.
+
+        :param path: Path of the socket.
+        :type path: str
+        """
+        with lock(self):
+            if self._control_socket is not None:
+                return
+            if os.path.exists(path):
+                os.remove(path)
+            self._control_socket = socket.socket(
+                socket.AF_UNIX, socket.SOCK_STREAM)
+            self._control_socket.bind(path)
+            os.chmod(path, 0o600)
+            self._control_socket.listen(1)
+            thread = threading.Thread(
+                target=self._serve_control_socket,
+                args=(self._control_socket,),
+                name='edge_st_sdk-profiler-control')
+            thread.daemon = True
+            thread.start()
+
+    def stop_control_socket(self):
+        """Stop listening for commands on the local socket."""
+        with lock(self):
+            control_socket = self._control_socket
+            self._control_socket = None
+        if control_socket is not None:
+            path = control_socket.getsockname()
+            control_socket.close()
+            if os.path.exists(path):
+                os.remove(path)
+
+    def get_stacks(self):
+        """Get the samples collected so far.
+
+        :returns: Number of samples, indexed by collapsed stack.
+        :rtype: dict
+        """
+        with self._stacks_lock:
+            return dict(self._stacks)
+
+    def _serve_signal(self):
+        """Toggle the profiler whenever the signal handler requests it."""
+        while True:
+            self._toggle_event.wait()
+            self._toggle_event.clear()
+            self.toggle()
+
+    def _serve_control_socket(self, control_socket):
+        """Serve commands on the control socket until it is closed."""
+        while True:
+            try:
+                connection, _ = control_socket.accept()
+            except (OSError, socket.error):
+                return
+            try:
+                command = connection.recv(64).decode('ascii', 'ignore').strip()
+                if command == 'start':
+                    self.start()
+                elif command == 'stop':
+                    self.stop()
+                if command in ['start', 'stop', 'status']:
+                    reply = '%s %d samples %s\n' % (
+                        'running' if self.is_running() else 'stopped',
+                        self._samples, self._output_path)
+                else:
+                    reply = 'unknown command\n'
+                connection.sendall(reply.encode('ascii'))
+            except (OSError, socket.error):
+                pass
+            finally:
+                connection.close()
+
+    def _run(self, stop_event):
+        """Sample the stacks until stopped, then write the output file.
+
+        :param stop_event: Event stopping this sampling thread.
+        :type stop_event: :class:`threading.Event`
+        """
+        while not stop_event.is_set():
+            names = dict((thread.ident, thread.name) \
+                for thread in threading.enumerate())
+            for thread_id, frame in sys._current_frames().items():
+                name = names.get(thread_id, str(thread_id))
+                if name.startswith('edge_st_sdk-profiler'):
+                    continue
+                self._sample(name, frame)
+            self._samples += 1
+            stop_event.wait(self._interval_s)
+        self._write()
+
+    def _sample(self, thread_name, frame):
+        """Account a sample of a thread's stack, if the thread belongs to the
+        SDK.
+
+        :param thread_name: Name of the thread.
+        :type thread_name: str
+
+        :param frame: Innermost frame of the thread.
+        :type frame: frame
+        """
+        frames = []
+        in_sdk = self._all_threads \
+            or thread_name.startswith(self.THREAD_NAME_PREFIX)
+        while frame is not None:
+            code = frame.f_code
+            if not in_sdk:
+                in_sdk = any(path in code.co_filename \
+                    for path in self.SDK_PATHS)
+            frames.append('%s (%s:%d)' % (code.co_name,
+                os.path.basename(code.co_filename), frame.f_lineno))
+            frame = frame.f_back
+        if not in_sdk:
+            return
+        frames.append(thread_name.replace(';', ':').replace(' ', '_'))
+        stack = ';'.join(reversed(frames))
+        with self._stacks_lock:
+            stacks = self._stacks
+            if stack in stacks:
+                stacks[stack] += 1
+            elif len(stacks) < self._max_stacks:
+                stacks[stack] = 1
+            else:
+                stacks['[truncated]'] = stacks.get('[truncated]', 0) + 1
+
+    def _write(self):
+        """Write the collected samples to the output file, most frequent
+        stacks first, within the maximum file size."""
+        size = 0
+        with open(self._output_path, 'w') as output_file:
+            for stack, count in sorted(self.get_stacks().items(),
+                key=lambda item: item[1], reverse=True):
+                line = '%s %d\n' % (stack, count)
+                size += len(line)
+                if size > self._max_file_size:
+                    break
+                output_file.write(line)
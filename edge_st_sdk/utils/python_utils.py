@@ -35,21 +35,207 @@ language.
 
 # IMPORT
 
+import time
+import weakref
 from functools import wraps
 from threading import RLock
 
 
+# CLASSES
+
+class LockStatistics(object):
+    """Contention statistics of a lock."""
+
+    def __init__(self, name):
+        """Constructor.
+
+        :param name: Name of the lock.
+        :type name: str
+        """
+        self.name = name
+        """Name of the lock."""
+
+        self.acquisitions = 0
+        """Number of (outermost) acquisitions."""
+
+        self.contentions = 0
+        """Number of acquisitions that had to wait for another thread."""
+
+        self.wait_time_s = 0.0
+        """Total time spent waiting to acquire the lock, in seconds."""
+
+        self.max_wait_time_s = 0.0
+        """Maximum time spent waiting to acquire the lock, in seconds."""
+
+        self.hold_time_s = 0.0
+        """Total time the lock has been held, in seconds."""
+
+        self.max_hold_time_s = 0.0
+        """Maximum time the lock has been held, in seconds."""
+
+    def __repr__(self):
+        return ('%s: acquisitions=%d contentions=%d wait=%.6fs (max %.6fs) '
+            'hold=%.6fs (max %.6fs)' % (self.name, self.acquisitions,
+            self.contentions, self.wait_time_s, self.max_wait_time_s,
+            self.hold_time_s, self.max_hold_time_s))
+
+
+class ProfiledRLock(object):
+    """Reentrant lock recording wait time and hold time into a
+    :class:`edge_st_sdk.utils.python_utils.LockStatistics` object."""
+
+    def __init__(self, statistics):
+        """Constructor.
+
+        :param statistics: Statistics to update.
+        :type statistics: :class:`edge_st_sdk.utils.python_utils.LockStatistics`
+        """
+        self._lock = RLock()
+        self._statistics = statistics
+        self._depth = 0
+        self._acquired_at = 0.0
+
+    def acquire(self, blocking=True, timeout=-1):
+        if self._lock.acquire(False):
+            wait_time_s = 0.0
+        else:
+            if not blocking:
+                return False
+            start = time.time()
+            if not self._lock.acquire(True, timeout):
+                return False
+            wait_time_s = time.time() - start
+            self._statistics.contentions += 1
+        self._depth += 1
+        if self._depth == 1:
+            self._acquired_at = time.time()
+            statistics = self._statistics
+            statistics.acquisitions += 1
+            statistics.wait_time_s += wait_time_s
+            statistics.max_wait_time_s = max(
+                statistics.max_wait_time_s, wait_time_s)
+        return True
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            hold_time_s = time.time() - self._acquired_at
+            statistics = self._statistics
+            statistics.hold_time_s += hold_time_s
+            statistics.max_hold_time_s = max(
+                statistics.max_hold_time_s, hold_time_s)
+        self._lock.release()
+
+    __enter__ = acquire
+
+    def __exit__(self, *args):
+        self.release()
+
+
 # UTILITY FUNCTIONS.
 
-def lock_for_object(obj, locks={}):
+MAX_PROFILED_LOCKS = 1024
+"""Maximum number of locks recording contention statistics; locks created
+beyond it, while profiling is enabled, are not profiled."""
+
+_registry_lock = RLock()
+"""Lock guarding the lock registry. It is reentrant because the weak reference
+callbacks removing entries may run on a thread already holding it, whenever
+an allocation made while holding it triggers a garbage collection."""
+
+_locks = {}
+"""Lock registry, as (reference, lock) tuples indexed by object identity.
+
+Objects are referenced weakly, and their entries are removed as soon as they
+are garbage collected, so that identities can not be reused by other objects.
+Objects not supporting weak references are referenced strongly, hence they are
+kept alive, with their locks, until the end of the process."""
+
+_lock_profiling = False
+"""Whether newly created locks record contention statistics."""
+
+_lock_statistics = []
+"""Statistics of the locks created while profiling was enabled, at most
+:data:`MAX_PROFILED_LOCKS`."""
+
+def _remove_lock(key, reference):
+    """Remove a lock from the registry when its object is garbage collected."""
+    with _registry_lock:
+        entry = _locks.get(key)
+        if entry is not None and entry[0] is reference:
+            del _locks[key]
+
+def lock_for_object(obj):
     """To be used to gain exclusive access to a shared object from different
-    threads."""
-    return locks.setdefault(id(obj), RLock())
+    threads.
+
+    The same reentrant lock is returned for the same object for all its
+    lifetime. Objects which do not support weak references, e.g. instances of
+    classes defining "__slots__" without "__weakref__", are kept alive by the
+    registry until the end of the process, and should not be locked if created
+    in large numbers.
+    """
+    key = id(obj)
+    entry = _locks.get(key)
+    if entry is not None and entry[0]() is obj:
+        return entry[1]
+    with _registry_lock:
+        entry = _locks.get(key)
+        if entry is not None and entry[0]() is obj:
+            return entry[1]
+        try:
+            reference = weakref.ref(
+                obj, lambda reference, key=key: _remove_lock(key, reference))
+        except TypeError:
+            reference = lambda obj=obj: obj
+        if _lock_profiling and len(_lock_statistics) < MAX_PROFILED_LOCKS:
+            name = getattr(obj, '__name__', None) \
+                or '%s@0x%x' % (type(obj).__name__, key)
+            statistics = LockStatistics(name)
+            _lock_statistics.append(statistics)
+            obj_lock = ProfiledRLock(statistics)
+        else:
+            obj_lock = RLock()
+        _locks[key] = (reference, obj_lock)
+        return obj_lock
 
 def lock(self):
     """To be used to gain exclusive access to a block of code from different
-    threads."""
-    return RLock()
+    threads.
+
+    The lock is specific to the given object (or class), hence it provides
+    mutual exclusion among all the blocks of code locking the same object.
+    """
+    return lock_for_object(self)
+
+def enable_lock_profiling(enabled=True):
+    """Enable or disable recording of wait and hold times of the locks.
+
+    Only locks created while profiling is enabled record statistics, up to
+    :data:`MAX_PROFILED_LOCKS`, hence it should be enabled before creating the
+    objects to profile.
+
+    :param enabled: True to enable profiling, False otherwise.
+    :type enabled: bool
+    """
+    global _lock_profiling
+    _lock_profiling = enabled
+
+def get_lock_statistics():
+    """Get the contention statistics of the profiled locks, sorted by
+    decreasing total wait time.
+
+    :returns: The contention statistics of the profiled locks.
+    :rtype: list of :class:`edge_st_sdk.utils.python_utils.LockStatistics`
+    """
+    with _registry_lock:
+        return sorted(_lock_statistics,
+            key=lambda statistics: statistics.wait_time_s, reverse=True)
+
+def reset_lock_statistics():
+    """Forget the contention statistics recorded so far."""
+    with _registry_lock:
+        del _lock_statistics[:]
 
 def synchronized(call):
     """To be used to synchronize a method called on the same object from
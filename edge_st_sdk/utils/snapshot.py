@@ -0,0 +1,149 @@
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+
+"""snapshot
+
+The snapshot module defines a copy-on-write snapshot of the latest state of a
+device, shared between the threads updating it, e.g. those receiving the
+notifications of the device, and the threads reading it, e.g. those
+publishing it.
+
+Writers update a private working copy of the values, and publish a copy of it
+as a new immutable frame by replacing a single reference; readers take the
+published frame as it is. Hence readers never block writers, never see a frame
+being written, and never copy or retry, while each write copies all the values,
+which is cheap for the few values of a device.
+"""
+
+
+# IMPORT
+
+from threading import Lock
+
+from edge_st_sdk.utils.edge_st_exceptions import EdgeSTInvalidDataException
+
+
+# CLASSES
+
+class Snapshot(object):
+    """Copy-on-write snapshot of a fixed number of values, e.g. the latest
+    values of the features of a device, indexed by position.
+
+    Frames are tuples, published with a version number which is incremented at
+    each write, so that readers can tell whether the state has changed.
+
+    Writers are serialized among themselves only, which costs an uncontended
+    lock acquisition when a single thread, e.g. the one serving a Bluetooth
+    node, updates the snapshot; readers never take the lock.
+    """
+
+    def __init__(self, size, initial_value=None):
+        """Constructor.
+
+        :param size: Number of values.
+        :type size: int
+
+        :param initial_value: Value of every position before the first write.
+        :type initial_value: object
+        """
+        self._values = [initial_value] * size
+        """Working copy of the values, only accessed by writers."""
+
+        self._front = (0, tuple(self._values))
+        """Published frame, as a (version, values) tuple, replaced as a whole
+        at each write."""
+
+        self._write_lock = Lock()
+        """Lock serializing writers."""
+
+    def get_size(self):
+        """Get the number of values.
+
+        :returns: The number of values.
+        :rtype: int
+        """
+        return len(self._values)
+
+    def get_version(self):
+        """Get the version of the published frame, i.e. the number of writes
+        so far.
+
+        :returns: The version of the published frame.
+        :rtype: int
+        """
+        return self._front[0]
+
+    def write(self, index, value):
+        """Write a value, and publish the new frame.
+
+        :param index: Position of the value.
+        :type index: int
+
+        :param value: Value.
+        :type value: object
+        """
+        with self._write_lock:
+            self._values[index] = value
+            self._front = (self._front[0] + 1, tuple(self._values))
+
+    def write_many(self, index, values):
+        """Write consecutive values at once, e.g. the fields of a sample, and
+        publish the new frame, so that readers never see some of them only.
+
+        :param index: Position of the first value.
+        :type index: int
+
+        :param values: Values.
+        :type values: list
+
+        :raises EdgeSTInvalidDataException: is raised if the values exceed the
+            size of the snapshot.
+        """
+        if index < 0 or index + len(values) > len(self._values):
+            raise EdgeSTInvalidDataException(
+                'Values do not fit the snapshot at position %d.' % (index))
+        with self._write_lock:
+            self._values[index:index + len(values)] = values
+            self._front = (self._front[0] + 1, tuple(self._values))
+
+    def read(self):
+        """Get the published frame.
+
+        :returns: The values, consistent with each other.
+        :rtype: tuple
+        """
+        return self._front[1]
+
+    def read_versioned(self):
+        """Get the published frame with its version.
+
+        :returns: The version and the values of the frame.
+        :rtype: tuple
+        """
+        return self._front
@@ -0,0 +1,301 @@
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+
+"""tracing
+
+The tracing module measures how long a sample takes to go through the stages
+of the pipeline, e.g. from the Bluetooth notification, through the encoding
+and the publication, up to the acknowledgement from the broker.
+
+A trace is started where the sample enters the pipeline and is carried along
+with it, each stage marking its completion; for instance::
+
+    def on_update(self, feature, sample):
+        trace = Tracer.instance().start('sample')
+        payload = json.dumps(...)
+        if trace is not None:
+            trace.mark('encoded')
+        client.publish(topic, payload, 1, trace=trace)
+
+The client marks the "sent" and "acknowledged" stages and finishes the trace,
+or marks it as failed if the message could not be published.
+"""
+
+
+# IMPORT
+
+import json
+import time
+import random
+import threading
+from collections import deque
+
+from edge_st_sdk.utils.python_utils import lock
+from edge_st_sdk.utils.metrics import MetricsRegistry
+
+
+# CLASSES
+
+class TraceContext(object):
+    """Monotonic timestamps of the stages completed by a sample."""
+
+    START_STAGE = 'start'
+    """Name of the initial stage."""
+
+    def __init__(self, name=None, sampled=False):
+        """Constructor.
+
+        :param name: Name of the trace.
+        :type name: str
+
+        :param sampled: Whether the trace is to be stored into the ring buffer
+            of the tracer once finished.
+        :type sampled: bool
+        """
+        self.name = name
+        """Name of the trace."""
+
+        self.sampled = sampled
+        """Whether the trace is to be stored into the ring buffer."""
+
+        self.stamps = [(self.START_STAGE, time.monotonic())]
+        """Completed stages, as (stage, monotonic time in seconds) tuples."""
+
+        self.finished = False
+        """Whether the trace has been finished."""
+
+        self.failure = None
+        """Reason why the sample did not go through the pipeline, None if it
+        did."""
+
+    def mark(self, stage):
+        """Mark the completion of a stage.
+
+        :param stage: Name of the stage.
+        :type stage: str
+        """
+        self.stamps.append((stage, time.monotonic()))
+
+    def get_stage_latencies(self):
+        """Get the latency of each stage, i.e. the time elapsed since the
+        completion of the previous one.
+
+        :returns: Latencies, as (stage, seconds) tuples.
+        :rtype: list
+        """
+        return [(stage, stamp - self.stamps[i][1]) \
+            for i, (stage, stamp) in enumerate(self.stamps[1:])]
+
+    def get_total_latency_s(self):
+        """Get the time elapsed between the start of the trace and the
+        completion of the last stage.
+
+        :returns: The total latency in seconds.
+        :rtype: float
+        """
+        return self.stamps[-1][1] - self.stamps[0][1]
+
+    def to_dict(self):
+        """Get a dictionary representation of the trace, suitable for JSON
+        encoding.
+
+        :returns: A dictionary representation of the trace.
+        :rtype: dict
+        """
+        return {
+            'name': self.name,
+            'failure': self.failure,
+            'total_s': self.get_total_latency_s(),
+            'stages': [{'stage': stage, 'latency_s': latency} \
+                for stage, latency in self.get_stage_latencies()]
+        }
+
+
+class Tracer(object):
+    """Class responsible for starting traces, recording the distribution of
+    the latency of each stage into the process-wide
+    :class:`edge_st_sdk.utils.metrics.MetricsRegistry`, and keeping a sample of
+    the finished traces into a ring buffer.
+
+    Tracing is disabled by default, in which case no trace is started and the
+    pipeline runs without overhead.
+    """
+
+    _INSTANCE = None
+    """Instance object."""
+
+    RING_BUFFER_SIZE = 1024
+    """Default number of sampled traces kept."""
+
+    def __init__(self):
+        """Constructor."""
+        self._enabled = False
+        """Whether traces are started."""
+
+        self._sample_ratio = 0.01
+        """Ratio of traces stored into the ring buffer."""
+
+        self._traces = deque(maxlen=self.RING_BUFFER_SIZE)
+        """Ring buffer of sampled traces."""
+
+        self._lock = threading.Lock()
+        """Lock guarding the ring buffer."""
+
+    @classmethod
+    def instance(self):
+        """Getting the process-wide instance of the class.
+
+        :returns: The process-wide instance of the class.
+        :rtype: :class:`edge_st_sdk.utils.tracing.Tracer`
+        """
+        if self._INSTANCE is None:
+            with lock(self):
+                if self._INSTANCE is None:
+                    self._INSTANCE = Tracer()
+        return self._INSTANCE
+
+    def configure(self, enabled=True, sample_ratio=0.01,
+        ring_buffer_size=RING_BUFFER_SIZE):
+        """Configure the tracer.
+
+        :param enabled: Whether traces are started.
+        :type enabled: bool
+
+        :param sample_ratio: Ratio of finished traces, between 0 and 1, stored
+            into the ring buffer.
+        :type sample_ratio: float
+
+        :param ring_buffer_size: Number of sampled traces kept.
+        :type ring_buffer_size: int
+        """
+        with self._lock:
+            self._enabled = enabled
+            self._sample_ratio = sample_ratio
+            if ring_buffer_size != self._traces.maxlen:
+                self._traces = deque(self._traces, maxlen=ring_buffer_size)
+
+    def is_enabled(self):
+        """Check whether traces are started.
+
+        :returns: True if traces are started, False otherwise.
+        :rtype: bool
+        """
+        return self._enabled
+
+    def start(self, name=None):
+        """Start a trace.
+
+        :param name: Name of the trace.
+        :type name: str
+
+        :returns: The trace, or None if tracing is disabled.
+        :rtype: :class:`edge_st_sdk.utils.tracing.TraceContext`
+        """
+        if not self._enabled:
+            return None
+        return TraceContext(name, random.random() < self._sample_ratio)
+
+    def finish(self, trace):
+        """Finish a trace, recording the latency of its stages and storing it
+        into the ring buffer if sampled. Finishing a trace twice has no
+        effect.
+
+        :param trace: The trace, or None.
+        :type trace: :class:`edge_st_sdk.utils.tracing.TraceContext`
+        """
+        if trace is None or trace.finished:
+            return
+        trace.finished = True
+        metrics = MetricsRegistry.instance()
+        for stage, latency in trace.get_stage_latencies():
+            metrics.histogram(
+                'edge_st_sdk_trace_stage_latency_seconds',
+                'Latency of the pipeline stages of traced samples.',
+                {'stage': stage}).observe(latency)
+        metrics.histogram(
+            'edge_st_sdk_trace_latency_seconds',
+            'End-to-end latency of traced samples.').observe(
+            trace.get_total_latency_s())
+        if trace.sampled:
+            with self._lock:
+                self._traces.append(trace)
+
+    def fail(self, trace, reason):
+        """Finish a trace whose sample did not go through the pipeline,
+        counting the failure instead of recording the latency of its stages,
+        and storing it into the ring buffer if sampled. Finishing a trace twice
+        has no effect.
+
+        :param trace: The trace, or None.
+        :type trace: :class:`edge_st_sdk.utils.tracing.TraceContext`
+
+        :param reason: Reason of the failure, e.g. "not_connected" or "error".
+        :type reason: str
+        """
+        if trace is None or trace.finished:
+            return
+        trace.finished = True
+        trace.failure = reason
+        MetricsRegistry.instance().counter(
+            'edge_st_sdk_trace_failures_total',
+            'Traced samples that did not go through the pipeline.',
+            {'reason': reason}).inc()
+        if trace.sampled:
+            with self._lock:
+                self._traces.append(trace)
+
+    def get_traces(self):
+        """Get the sampled traces, oldest first.
+
+        :returns: The sampled traces.
+        :rtype: list of :class:`edge_st_sdk.utils.tracing.TraceContext`
+        """
+        with self._lock:
+            return list(self._traces)
+
+    def export(self, path, clear=True):
+        """Export the sampled traces to a file, one JSON object per line.
+
+        :param path: Path of the file, to which traces are appended.
+        :type path: str
+
+        :param clear: Whether to empty the ring buffer afterwards.
+        :type clear: bool
+
+        :returns: The number of exported traces.
+        :rtype: int
+        """
+        with self._lock:
+            traces = list(self._traces)
+            if clear:
+                self._traces.clear()
+        with open(path, 'a') as trace_file:
+            for trace in traces:
+                trace_file.write(json.dumps(trace.to_dict()) + '\n')
+        return len(traces)
@@ -12,7 +12,10 @@ setuptools.setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     url="https://github.com/STMicroelectronics/EdgeSTSDK_Python",
-    packages=setuptools.find_packages(),
+    packages=setuptools.find_packages(exclude=['tests', 'tests.*']),
+    extras_require={
+        'numpy': ['numpy']
+    },
     license='BSD 3-clause',
     classifiers=[
         "License :: OSI Approved :: BSD License",
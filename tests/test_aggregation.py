@@ -0,0 +1,116 @@
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+"""Tests of the edge_st_sdk.gateway.aggregation module."""
+
+
+# IMPORT
+
+import random
+import unittest
+from collections import deque
+
+from edge_st_sdk.gateway import aggregation
+from edge_st_sdk.gateway.aggregation import RingBuffer
+from edge_st_sdk.gateway.aggregation import WindowAggregator
+
+numpy = aggregation.numpy
+
+
+# CLASSES
+
+@unittest.skipIf(numpy is None, 'NumPy is not installed.')
+class RingBufferTest(unittest.TestCase):
+
+    def _samples(self, start, length):
+        return numpy.array([[index, -index] for index in
+            range(start, start + length)], dtype='float64')
+
+    def test_extend_wraps_around(self):
+        buffer = RingBuffer(5, 2)
+        buffer.extend(self._samples(0, 3))
+        buffer.extend(self._samples(3, 4))
+        self.assertEqual(buffer.get_count(), 5)
+        self.assertEqual(buffer.get_overwritten(), 2)
+        self.assertEqual(buffer.get_window()[:, 0].tolist(),
+            [2, 3, 4, 5, 6])
+
+    def test_extend_beyond_capacity(self):
+        buffer = RingBuffer(4, 2)
+        buffer.append([-1, 1])
+        buffer.extend(self._samples(0, 10))
+        self.assertEqual(buffer.get_overwritten(), 7)
+        self.assertEqual(buffer.get_window()[:, 0].tolist(), [6, 7, 8, 9])
+        buffer.extend(self._samples(10, 1))
+        self.assertEqual(buffer.get_window()[:, 0].tolist(), [7, 8, 9, 10])
+
+    def test_matches_reference(self):
+        generator = random.Random(0)
+        buffer = RingBuffer(7, 2)
+        reference = deque(maxlen=7)
+        start = 0
+        for _ in range(500):
+            operation = generator.random()
+            if operation < 0.4:
+                buffer.append([start, -start])
+                reference.append(start)
+                start += 1
+            elif operation < 0.9:
+                length = generator.randint(0, 12)
+                buffer.extend(self._samples(start, length))
+                reference.extend(range(start, start + length))
+                start += length
+            else:
+                buffer.get_window(clear=True)
+                reference.clear()
+            window = buffer.get_window()
+            self.assertEqual(window[:, 0].tolist(), list(reference))
+            self.assertEqual(window[:, 1].tolist(),
+                [-index for index in reference])
+
+
+@unittest.skipIf(numpy is None, 'NumPy is not installed.')
+class WindowAggregatorTest(unittest.TestCase):
+
+    def test_compute_and_clear(self):
+        aggregator = WindowAggregator(capacity=4)
+        aggregator.add_series('idle', 1)
+        for value in [1.0, 2.0, 3.0]:
+            aggregator.add('feature', [value, 10 * value])
+        aggregator.extend('feature', numpy.array([[4.0, 40.0]]))
+        statistics = aggregator.compute()
+        self.assertEqual(list(statistics), ['feature'])
+        self.assertEqual(statistics['feature']['count'], 4)
+        self.assertEqual(statistics['feature']['mean'].tolist(), [2.5, 25.0])
+        self.assertEqual(statistics['feature']['min'].tolist(), [1.0, 10.0])
+        self.assertEqual(statistics['feature']['max'].tolist(), [4.0, 40.0])
+        self.assertEqual(aggregator.compute(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,419 @@
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+"""Tests of the publications and of the subscriptions of the
+edge_st_sdk.aws.aws_client module."""
+
+
+# IMPORT
+
+import time
+import unittest
+from collections import namedtuple
+
+from AWSIoTPythonSDK.core.protocol.internal.events import FixedEventMids
+
+from edge_st_sdk.aws.aws_client import AWSClient
+from edge_st_sdk.aws.aws_reconnect_coordinator import AWSReconnectCoordinator
+from edge_st_sdk.edge_client import EdgeClient
+from edge_st_sdk.edge_client import EdgeClientStatus
+from edge_st_sdk.utils.metrics import MetricsRegistry
+from edge_st_sdk.utils.tracing import Tracer
+
+
+# CLASSES
+
+class FailingMQTTClient(object):
+
+    def publish(self, topic, payload, qos):
+        raise IOError('publication failed')
+
+    def publishAsync(self, topic, payload, qos, ack_callback=None):
+        raise IOError('publication failed')
+
+
+class AckingMQTTClient(object):
+
+    def __init__(self):
+        self.ack_callbacks = []
+
+    def publish(self, topic, payload, qos):
+        return True
+
+    def publishAsync(self, topic, payload, qos, ack_callback=None):
+        self.ack_callbacks.append(ack_callback)
+        return len(self.ack_callbacks)
+
+
+class OfflineMQTTClient(object):
+    """Client queuing the requests, as the AWS IoT SDK does while the
+    connection is down."""
+
+    def publish(self, topic, payload, qos):
+        return False
+
+    def publishAsync(self, topic, payload, qos, ack_callback=None):
+        return FixedEventMids.QUEUED_MID
+
+
+class SessionPahoClient(object):
+
+    def __init__(self):
+        self.connacks = []
+
+    def on_connect(self, client, user_data, flags, rc):
+        self.connacks.append((flags, rc))
+
+
+class SessionInternalClient(object):
+
+    def __init__(self):
+        self._paho_client = SessionPahoClient()
+        self.topics = []
+
+    def subscribe(self, topic, qos, ack_callback=None):
+        self.topics.append(topic)
+        ack_callback(len(self.topics), [qos])
+        return 0, len(self.topics)
+
+
+class SessionSubscriptionManager(object):
+
+    def __init__(self):
+        self.records = {}
+
+    def add_record(self, topic, qos, message_callback, ack_callback):
+        self.records[topic] = (qos, message_callback, ack_callback)
+
+
+class SessionEventConsumer(object):
+
+    def _handle_resubscribe(self):
+        raise AssertionError('resubscription left to the SDK')
+
+
+class SessionMQTTCore(object):
+
+    def __init__(self):
+        self._internal_async_client = SessionInternalClient()
+        self._subscription_manager = SessionSubscriptionManager()
+        self._event_consumer = SessionEventConsumer()
+
+
+class SessionMQTTClient(object):
+    """Client exposing the internals of the AWS IoT SDK involved in the
+    restoration of the subscriptions, and acknowledging them straight away
+    while online."""
+
+    def __init__(self):
+        self._mqtt_core = SessionMQTTCore()
+        self.online = True
+        self.topics = []
+
+    def subscribeAsync(self, topic, qos, ackCallback=None,
+        messageCallback=None):
+        if not self.online:
+            return FixedEventMids.QUEUED_MID
+        self.topics.append(topic)
+        ackCallback(len(self.topics), [qos])
+        return len(self.topics)
+
+
+class DisconnectingShadowClient(object):
+
+    def disconnect(self):
+        return True
+
+
+ConnectivityInfo = namedtuple('ConnectivityInfo', 'host port')
+
+
+class CoreInfo(object):
+
+    def __init__(self, *hosts):
+        self.connectivityInfoList = \
+            [ConnectivityInfo(host, 8883) for host in hosts]
+
+
+class ConnectingShadowClient(object):
+    """Shadow client reaching only the given hosts, after a delay."""
+
+    def __init__(self, reachable_hosts, delay_s):
+        self._reachable_hosts = reachable_hosts
+        self._delay_s = delay_s
+        self.host = None
+
+    def configureCredentials(self, ca_path, key_path, certificate_path):
+        pass
+
+    def configureEndpoint(self, host, port):
+        self.host = host
+
+    def configureConnectDisconnectTimeout(self, timeout_s):
+        pass
+
+    def configureMQTTOperationTimeout(self, timeout_s):
+        pass
+
+    def connect(self):
+        time.sleep(self._delay_s)
+        if self.host not in self._reachable_hosts:
+            raise IOError('%s unreachable' % self.host)
+        return True
+
+
+class PublishTracingTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tracer = Tracer.instance()
+        self._tracer.configure(True, 1.0)
+        # Bypassing the constructor, which requires the credentials.
+        self._client = AWSClient.__new__(AWSClient)
+        self._client._client_name = 'tracing-test'
+        self._client._connected = True
+        self._client._init_metrics()
+
+    def tearDown(self):
+        self._client._release_metrics()
+        self._tracer.configure(False)
+        self._tracer.export('/dev/null')
+
+    def test_unsent_message_fails_trace(self):
+        self._client._connected = False
+        trace = self._tracer.start('sample')
+        self._client.publish('topic', '{}', 1, trace=trace)
+        self.assertTrue(trace.finished)
+        self.assertEqual(trace.failure, 'not_connected')
+        trace = self._tracer.start('sample')
+        self._client.publish_async('topic', '{}', 1, trace=trace)
+        self.assertEqual(trace.failure, 'not_connected')
+
+    def test_failed_publication_fails_trace(self):
+        self._client._client = FailingMQTTClient()
+        for publish in [self._client.publish, self._client.publish_async]:
+            trace = self._tracer.start('sample')
+            with self.assertRaises(IOError):
+                publish('topic', '{}', 1, trace=trace)
+            self.assertEqual(trace.failure, 'error')
+            self.assertNotIn('sent', [stage for stage, _ in trace.stamps])
+
+    def test_message_queued_offline_fails_trace(self):
+        self._client._client = OfflineMQTTClient()
+        for publish in [self._client.publish, self._client.publish_async]:
+            trace = self._tracer.start('sample')
+            self.assertFalse(publish('topic', '{}', 1, trace=trace))
+            self.assertTrue(trace.finished)
+            self.assertEqual(trace.failure, 'queued_offline')
+            self.assertNotIn('sent', [stage for stage, _ in trace.stamps])
+
+    def test_sent_message_finishes_trace(self):
+        self._client._client = AckingMQTTClient()
+        trace = self._tracer.start('sample')
+        self.assertTrue(self._client.publish('topic', '{}', 1, trace=trace))
+        self.assertIsNone(trace.failure)
+        self.assertEqual([stage for stage, _ in trace.stamps],
+            ['start', 'acknowledged'])
+
+    def test_acknowledged_message_finishes_trace(self):
+        mqtt_client = AckingMQTTClient()
+        self._client._client = mqtt_client
+        trace = self._tracer.start('sample')
+        self._client.publish_async('topic', '{}', 1, trace=trace)
+        self.assertFalse(trace.finished)
+        mqtt_client.ack_callbacks[0](1)
+        self.assertTrue(trace.finished)
+        self.assertIsNone(trace.failure)
+        self.assertEqual([stage for stage, _ in trace.stamps],
+            ['start', 'sent', 'acknowledged'])
+        self.assertIn(trace, self._tracer.get_traces())
+
+
+class SubscriptionRestoreTest(unittest.TestCase):
+
+    def setUp(self):
+        # Bypassing the constructor, which requires the credentials.
+        self._client = AWSClient.__new__(AWSClient)
+        EdgeClient.__init__(self._client)
+        self._client._listeners = ()
+        self._client._client_name = 'subscriptions-test'
+        self._client._connected = True
+        self._client._clean_session = False
+        self._client._subscriptions = {}
+        self._client._subscribed_topics = set()
+        self._client._init_metrics()
+        self._client._shadow_client = DisconnectingShadowClient()
+        self._mqtt_client = SessionMQTTClient()
+        self._client._client = self._mqtt_client
+        self.assertTrue(self._client._install_session_tracking())
+
+    def tearDown(self):
+        self._client._release_metrics()
+
+    def _connack(self, session_present):
+        mqtt_core = self._mqtt_client._mqtt_core
+        mqtt_core._internal_async_client._paho_client.on_connect(
+            None, None, {'session present': int(session_present)}, 0)
+        mqtt_core._event_consumer._handle_resubscribe()
+        return mqtt_core._internal_async_client.topics
+
+    def _subscribe(self, *topics):
+        for topic in topics:
+            self._client.subscribe(topic, 1, lambda client, userdata, msg: None)
+
+    def test_subscriptions_restored_as_batch_when_session_lost(self):
+        self._subscribe('a', 'b')
+        self.assertEqual(self._mqtt_client.topics, ['a', 'b'])
+        self.assertEqual(sorted(self._connack(False)), ['a', 'b'])
+        self.assertEqual(sorted(self._mqtt_client._mqtt_core
+            ._subscription_manager.records), ['a', 'b'])
+        self.assertEqual(self._client._subscribed_topics, set(['a', 'b']))
+        # The SDK still handles the CONNACK.
+        self.assertEqual(self._mqtt_client._mqtt_core._internal_async_client
+            ._paho_client.connacks, [({'session present': 0}, 0)])
+
+    def test_subscriptions_kept_with_session(self):
+        self._subscribe('a', 'b')
+        self.assertEqual(self._connack(True), [])
+        self.assertEqual(self._client._subscribed_topics, set(['a', 'b']))
+
+    def test_subscriptions_requested_while_disconnected_restored(self):
+        self._subscribe('a')
+        self._client._connected = False
+        self._subscribe('b')
+        self.assertEqual(self._mqtt_client.topics, ['a'])
+        self._client._connected = True
+        self.assertEqual(self._connack(True), ['b'])
+
+    def test_clean_session_forgotten_on_disconnect(self):
+        self._subscribe('a')
+        self._client.disconnect()
+        self.assertEqual(self._client._subscribed_topics, set(['a']))
+        self._client._connected = True
+        self._client._clean_session = True
+        self._client.disconnect()
+        self.assertEqual(self._client._subscribed_topics, set())
+
+    def test_offline_subscription_fails_fast(self):
+        self._mqtt_client.online = False
+        start = time.time()
+        self.assertFalse(self._client._subscribe_batch(
+            [('a', 1, lambda client, userdata, msg: None)]))
+        self.assertLess(time.time() - start, AWSClient._TIMEOUT_s / 4.0)
+        self.assertEqual(self._client._subscribed_topics, set())
+
+
+class ConnectAsyncTest(unittest.TestCase):
+
+    def setUp(self):
+        # Bypassing the constructor, which requires the credentials.
+        self._client = AWSClient.__new__(AWSClient)
+        EdgeClient.__init__(self._client)
+        self._client._listeners = ()
+        self._client._client_name = 'connect-test'
+        self._client._connected = False
+        self._client._clean_session = True
+        self._client._subscriptions = {}
+        self._client._subscribed_topics = set()
+        self._client._device_certificate_path = 'certificate'
+        self._client._device_private_key_path = 'key'
+        self._client._cores = [('ca', CoreInfo('primary', 'secondary'))]
+        self._client._reconnect_coordinator = \
+            AWSReconnectCoordinator.instance()
+
+    def tearDown(self):
+        self._client._release_metrics()
+
+    def test_future_result_connected(self):
+        self._client._shadow_client = ConnectingShadowClient(['secondary'], 0.1)
+        future = self._client.connect_async()
+        self.assertFalse(future.done())
+        self.assertTrue(self._client.wait_for_status(
+            EdgeClientStatus.CONNECTED, 5))
+        self.assertTrue(future.result(5))
+        self.assertEqual(self._client._current_host, 'secondary')
+
+    def test_future_result_unreachable(self):
+        self._client._shadow_client = ConnectingShadowClient([], 0.01)
+        future = self._client.connect_async()
+        self.assertFalse(future.result(5))
+        self.assertEqual(self._client.get_status(),
+            EdgeClientStatus.UNREACHABLE)
+
+
+class ClientMetricsTest(unittest.TestCase):
+
+    def _client_samples(self, client_name):
+        return [(name, labels) \
+            for _, _, _, samples in MetricsRegistry.instance().collect()
+            for name, labels, _ in samples
+            if ('client', client_name) in labels]
+
+    def _value(self, name, client_name):
+        return MetricsRegistry.instance().counter(name, '',
+            {'client': client_name}).get_value()
+
+    def test_queued_messages_not_counted_as_published(self):
+        client = AWSClient.__new__(AWSClient)
+        client._client_name = 'queued-test'
+        client._connected = True
+        client._init_metrics()
+        try:
+            client._client = OfflineMQTTClient()
+            client.publish('topic', '{}', 1)
+            client.publish_async('topic', '{}', 1)
+            client._client = AckingMQTTClient()
+            client.publish('topic', '{}', 1)
+            client.publish_async('topic', '{"a": 1}', 0)
+            self.assertEqual(self._value(
+                'edge_st_sdk_published_messages_total', 'queued-test'), 2)
+            self.assertEqual(self._value(
+                'edge_st_sdk_published_bytes_total', 'queued-test'), 10)
+            self.assertEqual(self._value(
+                'edge_st_sdk_queued_messages_total', 'queued-test'), 2)
+            self.assertEqual(client._publish_latency.get_histogram()
+                .get_count(), 1)
+        finally:
+            client._release_metrics()
+
+    def test_metrics_released(self):
+        client = AWSClient.__new__(AWSClient)
+        client._client_name = 'metrics-test'
+        client._init_metrics()
+        client._metrics.counter('edge_st_sdk_shadow_responses_total',
+            'Shadow responses, by status.', dict(client._metrics_labels,
+            operation='get', status='accepted')).inc()
+        self.assertTrue(self._client_samples('metrics-test'))
+        client._release_metrics()
+        self.assertEqual(self._client_samples('metrics-test'), [])
+        client._init_metrics()
+        self.assertTrue(self._client_samples('metrics-test'))
+        client._release_metrics()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,262 @@
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+
+"""Tests of the discovery and of the core selection of the
+edge_st_sdk.aws.aws_greengrass module."""
+
+
+# IMPORT
+
+import os
+import time
+import logging
+import shutil
+import socket
+import tempfile
+import unittest
+
+from AWSIoTPythonSDK.core.greengrass.discovery import providers
+
+from edge_st_sdk.aws.aws_greengrass import AWSCoreSelectionStrategy
+from edge_st_sdk.aws.aws_greengrass import AWSGreengrass
+from edge_st_sdk.aws.aws_greengrass import _CoreLoadListener
+from edge_st_sdk.edge_client import EdgeClientStatus
+from edge_st_sdk.utils import log_utils
+from edge_st_sdk.utils.event_bus import EventBus
+from edge_st_sdk.utils.edge_st_exceptions import EdgeSTInvalidDataException
+
+
+# CLASSES
+
+class Info(object):
+
+    def __init__(self, **attributes):
+        self.__dict__.update(attributes)
+
+
+class Client(object):
+
+    def __init__(self, name, core_arn):
+        self._name = name
+        self._core_arn = core_arn
+
+    def get_name(self):
+        return self._name
+
+    def get_core_arn(self):
+        return self._core_arn
+
+
+class DiscoveryInfo(object):
+
+    def __init__(self, cores):
+        self._cores = cores
+
+    def getAllCas(self):
+        return [(group_id, 'CA of %s' % group_id) for group_id in \
+            sorted(set(core.groupId for core in self._cores))]
+
+    def getAllCores(self):
+        return list(self._cores)
+
+
+class DiscoveryInfoProvider(object):
+    """Discovery provider finding every client in the same groups."""
+
+    CORES = []
+
+    DISCOVERED_CLIENTS = []
+
+    def configureEndpoint(self, host, port):
+        pass
+
+    def configureCredentials(self, ca_path, certificate_path, key_path):
+        pass
+
+    def configureTimeout(self, timeout_s):
+        pass
+
+    def discover(self, thing_name):
+        self.DISCOVERED_CLIENTS.append(thing_name)
+        return DiscoveryInfo(self.CORES)
+
+
+class MultiGroupDiscoveryTest(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self._directory)
+        self._root_ca_path = self._credential('root_ca')
+        self._certificate_path = self._credential('certificate')
+        self._key_path = self._credential('key')
+        original_provider = providers.DiscoveryInfoProvider
+        providers.DiscoveryInfoProvider = DiscoveryInfoProvider
+        self.addCleanup(setattr, providers, 'DiscoveryInfoProvider',
+            original_provider)
+        DiscoveryInfoProvider.CORES = [
+            Info(coreThingArn='core-1', groupId='group-1',
+                connectivityInfoList=[Info(host='127.0.0.1', port=1)]),
+            Info(coreThingArn='core-2', groupId='group-2',
+                connectivityInfoList=[Info(host='127.0.0.1', port=2)])
+        ]
+        DiscoveryInfoProvider.DISCOVERED_CLIENTS = []
+        # The discovery configures the logging of the SDK.
+        self._levels = dict((name, logging.getLogger(name).level)
+            for name in log_utils.LOGGERS)
+
+    def tearDown(self):
+        log_utils.shutdown_logging()
+        for name, level in self._levels.items():
+            logging.getLogger(name).setLevel(level)
+
+    def _credential(self, name):
+        path = os.path.join(self._directory, name)
+        with open(path, 'w') as credential:
+            credential.write(name)
+        return path
+
+    def get_greengrass(self, strategy=None):
+        greengrass = AWSGreengrass('endpoint', self._root_ca_path, strategy)
+        greengrass._GROUP_CA_PATH = os.path.join(self._directory, 'groups', '')
+        return greengrass
+
+    def get_client(self, greengrass, client_id, group_id=None):
+        client = greengrass.get_client(client_id, self._certificate_path,
+            self._key_path, group_id)
+        self.addCleanup(client._release_metrics)
+        return client
+
+    def test_every_group_registered(self):
+        greengrass = self.get_greengrass()
+        self.get_client(greengrass, 'device')
+        self.assertEqual(sorted(greengrass.get_groups()),
+            ['group-1', 'group-2'])
+        self.assertTrue(greengrass.is_group_discovered('group-2'))
+        self.assertEqual(greengrass._clients_groups,
+            {'device': ['group-1', 'group-2']})
+        for group_id in ['group-1', 'group-2']:
+            with open(greengrass._group_ca_paths[group_id]) as ca:
+                self.assertEqual(ca.read(), 'CA of %s' % group_id)
+
+    def test_client_bound_to_requested_group(self):
+        greengrass = self.get_greengrass()
+        client = self.get_client(greengrass, 'device', 'group-2')
+        self.assertEqual(client.get_core_arn(), 'core-2')
+        self.assertEqual(client._cores[0][0],
+            greengrass._group_ca_paths['group-2'])
+        # Groups already discovered are not discovered again.
+        client = self.get_client(greengrass, 'other', 'group-1')
+        self.assertEqual(client.get_core_arn(), 'core-1')
+        self.assertEqual(client._cores[0][0],
+            greengrass._group_ca_paths['group-1'])
+        self.assertEqual(DiscoveryInfoProvider.DISCOVERED_CLIENTS, ['device'])
+
+    def test_client_bound_to_first_group_by_default(self):
+        greengrass = self.get_greengrass()
+        client = self.get_client(greengrass, 'device')
+        self.assertEqual(client.get_core_arn(), 'core-1')
+
+    def test_unknown_group_rejected(self):
+        greengrass = self.get_greengrass()
+        with self.assertRaises(EdgeSTInvalidDataException):
+            self.get_client(greengrass, 'device', 'group-3')
+
+    def test_least_loaded_spreads_clients_across_groups(self):
+        greengrass = self.get_greengrass(AWSCoreSelectionStrategy.LEAST_LOADED)
+        arns = [self.get_client(greengrass, client_id).get_core_arn() \
+            for client_id in ['device-1', 'device-2', 'device-3']]
+        self.assertEqual(sorted(arns[:2]), ['core-1', 'core-2'])
+        self.assertEqual(DiscoveryInfoProvider.DISCOVERED_CLIENTS,
+            ['device-1', 'device-2', 'device-3'])
+        self.assertEqual(greengrass._cores_load.get('core-1', 0) + \
+            greengrass._cores_load.get('core-2', 0), 3)
+
+
+class CoreSelectionTest(unittest.TestCase):
+
+    def setUp(self):
+        self._server = socket.socket()
+        self._server.bind(('127.0.0.1', 0))
+        self._server.listen(5)
+        self._cores = [
+            Info(coreThingArn='closed', groupId='group',
+                connectivityInfoList=[Info(host='127.0.0.1', port=1)]),
+            Info(coreThingArn='open', groupId='group',
+                connectivityInfoList=[Info(host='127.0.0.1',
+                    port=self._server.getsockname()[1])])
+        ]
+
+    def tearDown(self):
+        self._server.close()
+
+    def get_greengrass(self, strategy):
+        greengrass = AWSGreengrass('endpoint', 'root_ca', strategy)
+        greengrass._cores_info = {'group': list(self._cores)}
+        greengrass._clients_groups = {'client': ['group']}
+        return greengrass
+
+    def test_lowest_rtt_expires(self):
+        greengrass = self.get_greengrass(AWSCoreSelectionStrategy.LOWEST_RTT)
+        for core_info in self._cores:
+            self.assertTrue(greengrass._is_core_rtt_stale(core_info))
+            greengrass._measure_core_rtt(core_info)
+            self.assertFalse(greengrass._is_core_rtt_stale(core_info))
+        self.assertEqual(
+            greengrass._select_cores('client', None)[0].coreThingArn, 'open')
+        rtt, measured_at = greengrass._cores_rtt['open']
+        greengrass._cores_rtt['open'] = \
+            (rtt, measured_at - AWSGreengrass._RTT_TTL_s - 1)
+        self.assertTrue(greengrass._is_core_rtt_stale(self._cores[1]))
+
+    def wait_for_load(self, greengrass, load):
+        deadline = time.time() + 5
+        while greengrass._cores_load != load and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(greengrass._cores_load, load)
+
+    def test_least_loaded_follows_clients(self):
+        greengrass = self.get_greengrass(
+            AWSCoreSelectionStrategy.LEAST_LOADED)
+        greengrass._update_client_load('client', 'closed')
+        self.assertEqual(
+            greengrass._select_cores('client', None)[0].coreThingArn, 'open')
+        # Failing over to another core, notified through the event bus as
+        # clients do.
+        listeners = (_CoreLoadListener(greengrass),)
+        client = Client('client', 'open')
+        EventBus.instance().post(client, listeners,
+            EdgeClientStatus.CONNECTED, EdgeClientStatus.CONNECTING)
+        self.wait_for_load(greengrass, {'closed': 0, 'open': 1})
+        EventBus.instance().post(client, listeners,
+            EdgeClientStatus.DISCONNECTED, EdgeClientStatus.CONNECTED, True)
+        self.wait_for_load(greengrass, {'closed': 0, 'open': 0})
+        self.assertEqual(greengrass._clients_cores, {})
+
+if __name__ == '__main__':
+    unittest.main()
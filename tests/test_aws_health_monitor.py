@@ -0,0 +1,169 @@
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+"""Tests of the edge_st_sdk.aws.aws_health_monitor module."""
+
+
+# IMPORT
+
+import time
+import logging
+import threading
+import unittest
+
+from edge_st_sdk.aws.aws_health_monitor import AWSHealthMonitor
+from edge_st_sdk.aws.aws_health_monitor import AWSClientHealth
+from edge_st_sdk.edge_client import EdgeClientStatus
+from edge_st_sdk.utils.metrics import MetricsRegistry
+
+
+# CLASSES
+
+class FailingClient(object):
+
+    def get_name(self):
+        return 'failing'
+
+    def get_status(self):
+        raise RuntimeError('status not available')
+
+
+class ProbedClient(object):
+
+    def __init__(self, acknowledge=True):
+        self._acknowledge = acknowledge
+        self.probes = []
+        self.reconnected = threading.Event()
+
+    def get_name(self):
+        return 'probed'
+
+    def get_status(self):
+        return EdgeClientStatus.CONNECTED
+
+    def publish_async(self, topic, payload, qos, ack_callback=None):
+        self.probes.append(payload)
+        if self._acknowledge:
+            ack_callback(len(self.probes))
+        return len(self.probes)
+
+    def reconnect(self):
+        self.reconnected.set()
+        return True
+
+
+class RecordingHandler(logging.Handler):
+
+    def __init__(self):
+        super(RecordingHandler, self).__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class AWSHealthMonitorTest(unittest.TestCase):
+
+    def test_probe_errors_logged_and_counted(self):
+        logger = logging.getLogger('edge_st_sdk.aws.aws_health_monitor')
+        handler = RecordingHandler()
+        logger.addHandler(handler)
+        errors = MetricsRegistry.instance().counter(
+            'edge_st_sdk_health_probe_errors_total',
+            'Probes failed with an unexpected error.')
+        initial_errors = errors.get_value()
+        monitor = AWSHealthMonitor(probe_period_s=0.01)
+        try:
+            monitor.add_client(FailingClient())
+            deadline = time.time() + 2
+            while not handler.records and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            monitor.stop()
+            logger.removeHandler(handler)
+        self.assertTrue(handler.records)
+        self.assertEqual(handler.records[0].levelno, logging.WARNING)
+        self.assertIn('failing', handler.records[0].getMessage())
+        self.assertGreater(errors.get_value(), initial_errors)
+
+
+class ProbeThresholdsTest(unittest.TestCase):
+
+    def setUp(self):
+        self._monitor = AWSHealthMonitor(probe_timeout_s=0.01, max_rtt_s=0.1,
+            max_loss_ratio=0.4, window_size=4)
+        self._client = ProbedClient()
+        self._health = AWSClientHealth(4)
+
+    def tearDown(self):
+        self._monitor.stop()
+
+    def _probe(self, window):
+        self._health._window.extend(window)
+        self._monitor._probe(self._client, self._health)
+
+    def _assert_reconnected(self):
+        self.assertTrue(self._client.reconnected.wait(2))
+        self.assertEqual(self._health.get_reconnections(), 1)
+        self.assertEqual(self._client.probes, [])
+        self.assertEqual(len(self._health._window), 0)
+
+    def _assert_not_reconnected(self):
+        self.assertFalse(self._client.reconnected.wait(0.05))
+        self.assertEqual(self._health.get_reconnections(), 0)
+        self.assertEqual(len(self._client.probes), 1)
+
+    def test_rtt_above_threshold_reconnects(self):
+        self._probe([0.05, 0.1, 0.2, 0.2])
+        self._assert_reconnected()
+
+    def test_loss_above_threshold_reconnects(self):
+        self._probe([0.01, None, None, 0.01])
+        self._assert_reconnected()
+
+    def test_values_below_thresholds_do_not_reconnect(self):
+        self._probe([0.05, 0.09, None, 0.09])
+        self._assert_not_reconnected()
+
+    def test_partial_window_does_not_reconnect(self):
+        self._probe([None, None, None])
+        self._assert_not_reconnected()
+
+    def test_unacknowledged_probes_reconnect(self):
+        self._client = ProbedClient(acknowledge=False)
+        for _ in range(4):
+            self._monitor._probe(self._client, self._health)
+            time.sleep(0.02)
+        self.assertFalse(self._client.reconnected.is_set())
+        self._monitor._probe(self._client, self._health)
+        self.assertTrue(self._client.reconnected.wait(2))
+        self.assertEqual(self._health.get_lost_probes(), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+
+"""Tests of the edge_st_sdk.aws.aws_reconnect_coordinator module."""
+
+
+# IMPORT
+
+import time
+import threading
+import unittest
+
+from edge_st_sdk.aws.aws_reconnect_coordinator import AWSReconnectCoordinator
+from edge_st_sdk.aws.aws_reconnect_coordinator import AWSCoordinatedBackOffCore
+
+
+# FUNCTIONS
+
+def _new_coordinator():
+    """Create a coordinator apart from the process-wide one."""
+    instance = AWSReconnectCoordinator._INSTANCE
+    AWSReconnectCoordinator._INSTANCE = None
+    try:
+        return AWSReconnectCoordinator()
+    finally:
+        AWSReconnectCoordinator._INSTANCE = instance
+
+
+# CLASSES
+
+class AWSReconnectCoordinatorTest(unittest.TestCase):
+
+    def setUp(self):
+        self._coordinator = _new_coordinator()
+
+    def _wait_for_waiters(self, count):
+        deadline = time.time() + 5
+        while len(self._coordinator._waiters) < count:
+            self.assertLess(time.time(), deadline)
+            time.sleep(0.001)
+
+    def test_concurrency_cap(self):
+        self._coordinator.configure(max_handshakes=2)
+        self.assertTrue(self._coordinator.acquire('a'))
+        self.assertTrue(self._coordinator.acquire('b'))
+        self.assertFalse(self._coordinator.acquire('c', 0.05))
+        self.assertEqual(self._coordinator.get_handshakes_in_flight(), 2)
+        self.assertEqual(self._coordinator._waiters, [])
+        self._coordinator.release('a')
+        self.assertTrue(self._coordinator.acquire('c', 0.05))
+        self.assertEqual(self._coordinator.get_handshakes_in_flight(), 2)
+
+    def test_priority_ordering(self):
+        self._coordinator.configure(max_handshakes=1)
+        self._coordinator.set_priority('high', 5)
+        self._coordinator.acquire('holder')
+        served = []
+
+        def reconnect(client_name):
+            self._coordinator.acquire(client_name, 5)
+            served.append(client_name)
+            self._coordinator.release(client_name)
+
+        threads = []
+        for index, client_name in enumerate(['low-1', 'low-2', 'high']):
+            thread = threading.Thread(target=reconnect, args=(client_name,))
+            thread.start()
+            threads.append(thread)
+            self._wait_for_waiters(index + 1)
+        self._coordinator.release('holder')
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(served, ['high', 'low-1', 'low-2'])
+
+    def test_stale_slot_reclaimed(self):
+        self._coordinator.configure(max_handshakes=1, handshake_timeout_s=0.05)
+        self._coordinator.acquire('stale')
+        start = time.time()
+        self.assertTrue(self._coordinator.acquire('next', 5))
+        self.assertLess(time.time() - start, 1)
+        self.assertNotIn('stale', self._coordinator._handshakes)
+
+    def test_jitter_bounds(self):
+        self._coordinator.configure(base_backoff_s=1, max_backoff_s=32)
+        backoffs = [self._coordinator.get_backoff_s() for _ in range(200)]
+        self.assertTrue(all(1 <= backoff_s <= 3 for backoff_s in backoffs))
+        self.assertGreater(len(set(backoffs)), 1)
+        for previous_backoff_s in [0.5, 2, 5, 10, 100]:
+            for _ in range(200):
+                backoff_s = self._coordinator.get_backoff_s(previous_backoff_s)
+                self.assertGreaterEqual(backoff_s, 1)
+                self.assertLessEqual(backoff_s,
+                    min(32, max(previous_backoff_s, 1) * 3))
+
+    def test_backoff_core_holds_slot_until_handshake(self):
+        self._coordinator.configure(base_backoff_s=0.001, max_backoff_s=0.01)
+        backoff_core = AWSCoordinatedBackOffCore(self._coordinator, 'client')
+        backoff_core.backOff()
+        self.assertEqual(self._coordinator.get_handshakes_in_flight(), 1)
+        backoff_core.startStableConnectionTimer()
+        self.assertEqual(self._coordinator.get_handshakes_in_flight(), 0)
+        backoff_core.stopStableConnectionTimer()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+
+"""Tests of the edge_st_sdk.gateway.device_manifest module."""
+
+
+# IMPORT
+
+import os
+import unittest
+
+from edge_st_sdk.gateway.device_manifest import DeviceManifest
+from edge_st_sdk.gateway.device_manifest import DEFAULT_PUBLISH_PERIOD_s
+from edge_st_sdk.gateway.device_manifest import DEFAULT_QOS
+from edge_st_sdk.gateway.device_manifest import DEFAULT_WINDOW_SIZE
+from edge_st_sdk.utils.edge_st_exceptions import EdgeSTInvalidDataException
+
+
+# CLASSES
+
+class DeviceManifestTest(unittest.TestCase):
+
+    def get_document(self, telemetry=None):
+        return {
+            'defaults': {
+                'certificates_path': 'certificates',
+                'events': [
+                    {'feature': 'Switch', 'topic': 'iot_device/switch_sense'}
+                ],
+                'telemetry': telemetry or {
+                    'features': ['Pressure', 'Temperature'],
+                    'topic': 'iot_device/{thing_name}/env'
+                },
+                'actuators': [
+                    {'feature': 'Switch', 'topic': 'iot_device/switch_act',
+                     'qos': 1, 'initial_value': 0}
+                ]
+            },
+            'devices': [
+                {'mac': 'D1:07:FD:84:30:8C', 'thing_name': 'IoT_Device_1'},
+                {'mac': 'd7:90:95:be:58:7e', 'thing_name': 'IoT_Device_2',
+                 'events': []}
+            ]
+        }
+
+    def test_defaults(self):
+        manifest = DeviceManifest.from_dict(self.get_document(), '/gateway')
+        devices = manifest.get_devices()
+        self.assertEqual(len(devices), 2)
+        device = manifest.get_device('d1:07:fd:84:30:8c')
+        self.assertIs(device, devices[0])
+        self.assertEqual(device.certificate_path, os.path.normpath(
+            '/gateway/certificates/IoT_Device_1.cert.pem'))
+        self.assertEqual(device.private_key_path, os.path.normpath(
+            '/gateway/certificates/IoT_Device_1.private.key'))
+        self.assertEqual(device.events[0].qos, DEFAULT_QOS)
+        telemetry = device.telemetry
+        self.assertEqual(telemetry.topic, 'iot_device/IoT_Device_1/env')
+        self.assertEqual(telemetry.publish_period_s, DEFAULT_PUBLISH_PERIOD_s)
+        self.assertEqual(telemetry.window_size, DEFAULT_WINDOW_SIZE)
+        self.assertTrue(telemetry.shadow)
+        self.assertFalse(telemetry.aggregate)
+        self.assertFalse(telemetry.align)
+        self.assertEqual(device.actuators[0].initial_value, '0')
+        self.assertEqual(device.get_feature_names(),
+            ['Switch', 'Pressure', 'Temperature'])
+        # Overridden defaults.
+        self.assertEqual(devices[1].events, [])
+
+    def test_boolean_fields(self):
+        for key in ['shadow', 'aggregate', 'align']:
+            telemetry = {'features': ['Pressure'], 'topic': 'env', key: True}
+            manifest = DeviceManifest.from_dict(self.get_document(telemetry))
+            self.assertTrue(getattr(manifest.get_devices()[0].telemetry, key))
+            for value in ['false', 'true', 0, 1, None]:
+                telemetry = {'features': ['Pressure'], 'topic': 'env',
+                    key: value}
+                with self.assertRaises(EdgeSTInvalidDataException):
+                    DeviceManifest.from_dict(self.get_document(telemetry))
+
+    def test_exclusive_telemetry_modes(self):
+        telemetry = {'features': ['Pressure'], 'topic': 'env',
+            'aggregate': True, 'align': True}
+        with self.assertRaises(EdgeSTInvalidDataException):
+            DeviceManifest.from_dict(self.get_document(telemetry))
+
+    def test_malformed_entries(self):
+        document = self.get_document()
+        del document['defaults']['events'][0]['topic']
+        with self.assertRaises(EdgeSTInvalidDataException):
+            DeviceManifest.from_dict(document)
+        document = self.get_document()
+        document['devices'][1]['mac'] = document['devices'][0]['mac']
+        with self.assertRaises(EdgeSTInvalidDataException):
+            DeviceManifest.from_dict(document)
+        document = self.get_document()
+        del document['devices'][0]['thing_name']
+        with self.assertRaises(EdgeSTInvalidDataException):
+            DeviceManifest.from_dict(document)
+        telemetry = {'features': ['Pressure'], 'topic': 'env',
+            'publish_period_s': 0}
+        with self.assertRaises(EdgeSTInvalidDataException):
+            DeviceManifest.from_dict(self.get_document(telemetry))
+        with self.assertRaises(EdgeSTInvalidDataException):
+            DeviceManifest.from_dict({'devices': 'IoT_Device_1'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+
+"""Tests of the edge_st_sdk.edge_client module."""
+
+
+# IMPORT
+
+import time
+import threading
+import unittest
+
+from edge_st_sdk.edge_client import EdgeClient
+from edge_st_sdk.edge_client import EdgeClientStatus
+
+
+# CLASSES
+
+class StatusClient(EdgeClient):
+
+    def _update_status(self, new_status):
+        with self._status_condition:
+            self._status = new_status
+            self._status_condition.notify_all()
+
+
+class WaitForStatusTest(unittest.TestCase):
+
+    def setUp(self):
+        self._client = StatusClient()
+
+    def _update_status_later(self, status, delay_s):
+        timer = threading.Timer(
+            delay_s, self._client._update_status, [status])
+        timer.start()
+        self.addCleanup(timer.cancel)
+
+    def test_current_status_returns_at_once(self):
+        self._client._update_status(EdgeClientStatus.IDLE)
+        start = time.time()
+        self.assertTrue(self._client.wait_for_status(EdgeClientStatus.IDLE, 5))
+        self.assertLess(time.time() - start, 1)
+
+    def test_waiter_woken_by_status_change(self):
+        self._update_status_later(EdgeClientStatus.CONNECTING, 0.02)
+        self._update_status_later(EdgeClientStatus.CONNECTED, 0.05)
+        start = time.time()
+        self.assertTrue(self._client.wait_for_status(
+            EdgeClientStatus.CONNECTED, 5))
+        self.assertLess(time.time() - start, 1)
+        self.assertEqual(self._client.get_status(), EdgeClientStatus.CONNECTED)
+
+    def test_waiter_times_out(self):
+        self._update_status_later(EdgeClientStatus.CONNECTING, 0.01)
+        start = time.time()
+        self.assertFalse(self._client.wait_for_status(
+            EdgeClientStatus.CONNECTED, 0.1))
+        self.assertGreaterEqual(time.time() - start, 0.09)
+        self.assertEqual(self._client.get_status(), EdgeClientStatus.CONNECTING)
+
+
+if __name__ == '__main__':
+    unittest.main()
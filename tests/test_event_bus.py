@@ -0,0 +1,137 @@
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+"""Tests of the edge_st_sdk.utils.event_bus module."""
+
+
+# IMPORT
+
+import threading
+import unittest
+from enum import Enum
+
+from edge_st_sdk.utils.event_bus import EventBus
+
+
+# CLASSES
+
+class Status(Enum):
+    IDLE = 'IDLE'
+    CONNECTING = 'CONNECTING'
+    CONNECTED = 'CONNECTED'
+    DISCONNECTED = 'DISCONNECTED'
+
+
+class Source(object):
+    pass
+
+
+class RecordingListener(object):
+
+    def __init__(self, expected):
+        self.changes = []
+        self._expected = expected
+        self.done = threading.Event()
+
+    def on_status_change(self, source, new_status, old_status):
+        self.changes.append((old_status, new_status))
+        if len(self.changes) == self._expected:
+            self.done.set()
+
+
+class BlockingListener(object):
+
+    def __init__(self):
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def on_status_change(self, source, new_status, old_status):
+        self.entered.set()
+        self.release.wait(5)
+
+
+class EventBusTest(unittest.TestCase):
+
+    def setUp(self):
+        self._bus = EventBus(max_pending_sources=2)
+        self._blocker = BlockingListener()
+
+    def tearDown(self):
+        self._blocker.release.set()
+
+    def _block_worker(self):
+        self._bus.post(Source(), (self._blocker,), Status.CONNECTED,
+            Status.IDLE)
+        self.assertTrue(self._blocker.entered.wait(5))
+
+    def test_changes_coalesced(self):
+        listener = RecordingListener(1)
+        source = Source()
+        self._block_worker()
+        self._bus.post(source, (listener,), Status.CONNECTING, Status.IDLE)
+        self._bus.post(source, (listener,), Status.CONNECTED,
+            Status.CONNECTING)
+        self._blocker.release.set()
+        self.assertTrue(listener.done.wait(5))
+        self.assertEqual(listener.changes, [('IDLE', 'CONNECTED')])
+
+    def test_terminal_change_not_coalesced(self):
+        listener = RecordingListener(2)
+        source = Source()
+        self._block_worker()
+        self._bus.post(source, (listener,), Status.DISCONNECTED,
+            Status.CONNECTED, True)
+        self._bus.post(source, (listener,), Status.CONNECTING,
+            Status.DISCONNECTED)
+        self._bus.post(source, (listener,), Status.CONNECTED,
+            Status.CONNECTING)
+        self._blocker.release.set()
+        self.assertTrue(listener.done.wait(5))
+        self.assertEqual(listener.changes, [
+            ('CONNECTED', 'DISCONNECTED'), ('DISCONNECTED', 'CONNECTED')])
+
+    def test_changes_dropped_beyond_bound(self):
+        listener = RecordingListener(3)
+        self._block_worker()
+        self.assertTrue(self._bus.post(Source(), (listener,),
+            Status.CONNECTED, Status.IDLE))
+        self.assertTrue(self._bus.post(Source(), (listener,),
+            Status.CONNECTED, Status.IDLE))
+        with self.assertLogs('edge_st_sdk.utils.event_bus', 'WARNING'):
+            self.assertFalse(self._bus.post(Source(), (listener,),
+                Status.CONNECTED, Status.IDLE))
+        self.assertEqual(self._bus.get_dropped(), 1)
+        self.assertTrue(self._bus.post(Source(), (listener,),
+            Status.DISCONNECTED, Status.CONNECTED, True))
+        self._blocker.release.set()
+        self.assertTrue(listener.done.wait(5))
+        self.assertIn(('CONNECTED', 'DISCONNECTED'), listener.changes)
+
+
+if __name__ == '__main__':
+    unittest.main()
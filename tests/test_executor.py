@@ -0,0 +1,101 @@
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+"""Tests of the edge_st_sdk.utils.executor module."""
+
+
+# IMPORT
+
+import time
+import threading
+import unittest
+
+from edge_st_sdk.utils.executor import SharedExecutor
+
+
+# CLASSES
+
+class SharedExecutorTest(unittest.TestCase):
+
+    def setUp(self):
+        self._executor = SharedExecutor(max_workers=4)
+
+    def test_same_key_serialized_in_order(self):
+        events = []
+        lock = threading.Lock()
+
+        def task(index):
+            with lock:
+                events.append(('start', index))
+            time.sleep(0.005)
+            with lock:
+                events.append(('end', index))
+
+        futures = [self._executor.submit('key', task, index)
+            for index in range(10)]
+        for future in futures:
+            future.result(5)
+        expected = []
+        for index in range(10):
+            expected += [('start', index), ('end', index)]
+        self.assertEqual(events, expected)
+
+    def test_keys_run_concurrently(self):
+        barrier = threading.Barrier(2, timeout=5)
+        futures = [self._executor.submit(key, barrier.wait)
+            for key in ['first', 'second']]
+        for future in futures:
+            future.result(5)
+
+    def test_round_robin_among_keys(self):
+        executor = SharedExecutor(max_workers=1)
+        release = threading.Event()
+        order = []
+        executor.submit('blocker', release.wait, 5)
+        futures = [executor.submit('busy', order.append, 'busy-%d' % (index))
+            for index in range(3)]
+        futures.append(executor.submit('quiet', order.append, 'quiet'))
+        release.set()
+        for future in futures:
+            future.result(5)
+        self.assertLess(order.index('quiet'), order.index('busy-2'))
+
+    def test_exception_set_on_future(self):
+        future = self._executor.submit('key', int, 'not a number')
+        with self.assertRaises(ValueError):
+            future.result(5)
+        self.assertEqual(self._executor.submit('key', int, '1').result(5), 1)
+
+    def test_inline(self):
+        executor = SharedExecutor(inline=True)
+        future = executor.submit('key', threading.current_thread)
+        self.assertIs(future.result(0), threading.current_thread())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+"""Tests of the edge_st_sdk.gateway.frame_assembler module."""
+
+
+# IMPORT
+
+import unittest
+
+from edge_st_sdk.gateway.frame_assembler import FrameAssembler
+from edge_st_sdk.gateway.frame_assembler import FrameAssemblerListener
+
+
+# CLASSES
+
+class RecordingListener(FrameAssemblerListener):
+
+    def __init__(self):
+        self.frames = []
+
+    def on_frame(self, assembler, frame):
+        self.frames.append(frame)
+
+
+class FrameAssemblerTest(unittest.TestCase):
+
+    def setUp(self):
+        self._listener = RecordingListener()
+
+    def _assembler(self, **kwargs):
+        assembler = FrameAssembler(['a', 'b'], **kwargs)
+        assembler.add_listener(self._listener)
+        return assembler
+
+    def test_frames_joined_by_timestamp(self):
+        assembler = self._assembler(tolerance=2)
+        assembler.add('a', 100, [1])
+        assembler.add('a', 110, [2])
+        assembler.add('b', 101, [3])
+        assembler.add('b', 109, [4])
+        self.assertEqual([(frame.get_timestamp(), frame.get_values()) \
+            for frame in self._listener.frames], [
+            (100, {'a': [1], 'b': [3]}), (110, {'a': [2], 'b': [4]})])
+
+    def test_timestamps_unwrapped(self):
+        assembler = self._assembler(tolerance=5)
+        assembler.add('a', 65534, [1])
+        assembler.add('b', 1, [2])
+        assembler.add('a', 10, [3])
+        assembler.add('b', 65535 + 10, [4])
+        self.assertEqual([(frame.get_timestamp(), frame.get_values()) \
+            for frame in self._listener.frames], [
+            (65534, {'a': [1], 'b': [2]}), (10, {'a': [3], 'b': [4]})])
+
+    def test_late_samples_dropped(self):
+        assembler = self._assembler(tolerance=2)
+        assembler.add('a', 65535, [1])
+        assembler.add('b', 65535, [2])
+        assembler.add('a', 65530, [3])
+        assembler.add('b', 65533, [4])
+        self.assertEqual(len(self._listener.frames), 1)
+        self.assertEqual(assembler.get_statistics()['late_samples'], 2)
+
+    def test_older_frames_emitted_incomplete(self):
+        assembler = self._assembler(tolerance=2, emit_incomplete=True)
+        assembler.add('a', 100, [1])
+        assembler.add('a', 200, [2])
+        assembler.add('b', 200, [3])
+        self.assertEqual([frame.get_missing_features() \
+            for frame in self._listener.frames], [['b'], []])
+        self.assertEqual(assembler.get_statistics(), {
+            'complete_frames': 1, 'incomplete_frames': 1, 'late_samples': 0})
+
+    def test_expired_frames_dropped(self):
+        assembler = self._assembler(tolerance=2, max_delay=50)
+        assembler.add('a', 100, [1])
+        assembler.add('a', 151, [2])
+        self.assertEqual(self._listener.frames, [])
+        self.assertEqual(assembler.get_statistics()['incomplete_frames'], 1)
+        assembler.add('b', 100, [3])
+        self.assertEqual(assembler.get_statistics()['late_samples'], 1)
+
+    def test_flush_and_reset(self):
+        assembler = self._assembler(emit_incomplete=True)
+        assembler.add('a', 100, [1])
+        assembler.flush()
+        self.assertEqual(len(self._listener.frames), 1)
+        assembler.reset()
+        assembler.add('a', 10, [2])
+        assembler.add('b', 10, [3])
+        self.assertEqual(self._listener.frames[-1].get_values(),
+            {'a': [2], 'b': [3]})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,296 @@
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+
+"""Tests of the edge_st_sdk.gateway.gateway module."""
+
+
+# IMPORT
+
+import json
+import time
+import struct
+import threading
+import unittest
+from concurrent.futures import Future
+
+try:
+    from blue_st_sdk.features.feature_pressure import FeaturePressure
+    from blue_st_sdk.features.feature_switch import FeatureSwitch
+    from edge_st_sdk.gateway.gateway import Gateway
+    from edge_st_sdk.gateway.gateway import get_message_key
+except ImportError:
+    # The BlueST SDK is not installed.
+    Gateway = None
+
+from edge_st_sdk.gateway.device_manifest import DeviceManifest
+from edge_st_sdk.utils.edge_st_exceptions import EdgeSTInvalidDataException
+from edge_st_sdk.utils.edge_st_exceptions import EdgeSTInvalidOperationException
+
+
+# CLASSES
+
+class FakeNode(object):
+    """Node exporting genuine BlueST SDK features, idle unless updated by the
+    test."""
+
+    def __init__(self, tag, feature_classes):
+        self._tag = tag
+        self._connected = False
+        self._features = [feature_class(self) \
+            for feature_class in feature_classes]
+        for feature in self._features:
+            feature.set_enable(True)
+        self.written = []
+        self.written_event = threading.Event()
+
+    def get_name(self):
+        return self._tag
+
+    def get_tag(self):
+        return self._tag
+
+    def get_features(self):
+        return list(self._features)
+
+    def get_feature(self, feature_class):
+        return [feature for feature in self._features \
+            if isinstance(feature, feature_class)][0]
+
+    def connect(self):
+        self._connected = True
+
+    def disconnect(self):
+        self._connected = False
+
+    def is_connected(self):
+        return self._connected
+
+    def enable_notifications(self, feature):
+        feature.set_notify(True)
+
+    def disable_notifications(self, feature):
+        feature.set_notify(False)
+
+    def write_feature(self, feature, data):
+        self.written.append((feature.get_name(), data))
+        self.written_event.set()
+
+    def wait_for_notifications(self, timeout_s):
+        time.sleep(timeout_s)
+        return False
+
+
+class FakeClient(object):
+
+    def __init__(self, name, reachable):
+        self._name = name
+        self._reachable = reachable
+        self.subscriptions = {}
+        self.published = []
+        self.shadow_updates = []
+
+    def get_name(self):
+        return self._name
+
+    def add_listener(self, listener):
+        pass
+
+    def connect_async(self):
+        future = Future()
+        future.set_result(self._reachable)
+        return future
+
+    def disconnect(self):
+        pass
+
+    def subscribe(self, topic, qos, callback):
+        self.subscriptions[topic] = (qos, callback)
+
+    def publish_async(self, topic, payload, qos, ack_callback=None,
+        trace=None):
+        self.published.append((topic, json.loads(payload), qos))
+
+    def update_shadow_state(self, payload, callback, timeout_s):
+        self.shadow_updates.append(json.loads(payload))
+
+
+class FakeEdge(object):
+
+    def __init__(self, reachable=True):
+        self._reachable = reachable
+        self.clients = {}
+        self.requests = []
+
+    def get_client(self, client_id, device_certificate_path,
+        device_private_key_path, group_id=None):
+        self.requests.append((client_id, device_certificate_path,
+            device_private_key_path, group_id))
+        client = FakeClient(client_id, self._reachable)
+        self.clients[client_id] = client
+        return client
+
+
+class Message(object):
+
+    def __init__(self, topic, payload):
+        self.topic = topic
+        self.payload = payload.encode('utf-8')
+
+
+@unittest.skipIf(Gateway is None, 'The BlueST SDK is not installed.')
+class GatewayTest(unittest.TestCase):
+
+    def setUp(self):
+        self._manifest = DeviceManifest.from_dict({
+            'defaults': {
+                'certificates_path': 'certificates',
+                'events': [
+                    {'feature': 'Switch', 'topic': 'iot_device/switch_sense'}
+                ],
+                'telemetry': {
+                    'features': ['Pressure'],
+                    'topic': 'iot_device/{thing_name}/env',
+                    'publish_period_s': 0.05
+                },
+                'actuators': [
+                    {'feature': 'Switch', 'topic': 'iot_device/switch_act',
+                     'initial_value': 0}
+                ]
+            },
+            'devices': [
+                {'mac': '00:00:00:00:00:01', 'thing_name': 'Device_1'},
+                {'mac': '00:00:00:00:00:02', 'thing_name': 'Device_2',
+                 'actuators': []}
+            ]
+        }, '/gateway')
+        self._nodes = [
+            FakeNode('00:00:00:00:00:01', [FeatureSwitch, FeaturePressure]),
+            FakeNode('00:00:00:00:00:02', [FeatureSwitch, FeaturePressure])
+        ]
+        self._edge = FakeEdge()
+        self._gateway = Gateway(self._edge, self._manifest)
+
+    def tearDown(self):
+        self._gateway.shutdown()
+
+    def _start(self, nodes=None):
+        self.assertEqual(self._gateway.attach_nodes(
+            self._nodes if nodes is None else nodes), [])
+        self._gateway.start()
+
+    def _notify_pressure(self, node, pressure):
+        feature = node.get_feature(FeaturePressure)
+        feature.update(1, struct.pack('<Hi', 1, int(pressure * 100)), 2, True)
+
+    def test_start_wires_devices(self):
+        stranger = FakeNode('00:00:00:00:00:ff', [FeatureSwitch])
+        self._start(self._nodes + [stranger])
+        self.assertEqual([request[0] for request in self._edge.requests],
+            ['Device_1', 'Device_2'])
+        self.assertTrue(self._edge.requests[0][1].endswith(
+            'Device_1.cert.pem'))
+        for node in self._nodes:
+            self.assertTrue(node.is_connected())
+            self.assertTrue(all([feature.is_notifying() \
+                for feature in node.get_features()]))
+        self.assertFalse(stranger.is_connected())
+        self.assertEqual(
+            sorted([node.get_tag() for node in self._gateway._reactor.get_nodes()]),
+            ['00:00:00:00:00:01', '00:00:00:00:00:02'])
+        self.assertEqual(list(self._edge.clients['Device_1'].subscriptions),
+            ['iot_device/switch_act'])
+        self.assertEqual(self._edge.clients['Device_2'].subscriptions, {})
+        self.assertEqual(len(self._gateway._schedule), 2)
+        # The initial value of the actuator is written by the reactor.
+        self.assertTrue(self._nodes[0].written_event.wait(2))
+        self.assertEqual(self._nodes[0].written[0][0], 'Switch')
+        with self.assertRaises(EdgeSTInvalidOperationException):
+            self._gateway.start()
+
+    def test_start_rejects_missing_feature(self):
+        self._nodes[1] = FakeNode('00:00:00:00:00:02', [FeatureSwitch])
+        with self.assertRaises(EdgeSTInvalidDataException):
+            self._start()
+
+    def test_start_fails_if_client_unreachable(self):
+        self._gateway = Gateway(FakeEdge(reachable=False), self._manifest)
+        with self.assertRaises(EdgeSTInvalidOperationException):
+            self._start()
+
+    def test_process_events_publishes_due_telemetry(self):
+        self._start()
+        self._notify_pressure(self._nodes[0], 1013.25)
+        client = self._edge.clients['Device_1']
+        start = time.time()
+        # Waiting for the first publication, not for the whole timeout.
+        self._gateway.process_events(5)
+        self.assertLess(time.time() - start, 1)
+        self._gateway.process_events(0)
+        self.assertEqual(client.published, [('iot_device/Device_1/env',
+            {'Board_id': 'Device_1', 'pressure': 1013.25}, 0)])
+        # Devices without values do not publish.
+        self.assertEqual(self._edge.clients['Device_2'].published, [])
+
+    def test_missed_periods_skipped(self):
+        self._start()
+        self._notify_pressure(self._nodes[0], 1000)
+        now = time.time()
+        self._gateway._schedule = [(now - 10, index, device) \
+            for index, (_, _, device) in enumerate(
+                sorted(self._gateway._schedule))]
+        self._gateway.process_events(0)
+        self.assertEqual(len(self._edge.clients['Device_1'].published), 1)
+        self.assertTrue(all([due_time > now \
+            for due_time, _, _ in self._gateway._schedule]))
+
+    def test_on_message_routes_to_addressed_device(self):
+        self._start()
+        self.assertTrue(self._nodes[0].written_event.wait(2))
+        self._nodes[0].written_event.clear()
+        devices = self._gateway.get_devices()
+        key = get_message_key(devices[0].get_feature('Switch'))
+        on_message = self._edge.clients['Device_1'] \
+            .subscriptions['iot_device/switch_act'][1]
+        for payload in ['not json', '[]',
+            json.dumps({key: '(1) Device_2 1'}),
+            json.dumps({key: 1})]:
+            on_message(None, None, Message('iot_device/switch_act', payload))
+        on_message(None, None, Message('iot_device/other',
+            json.dumps({key: '(1) Device_1 1'})))
+        self.assertFalse(self._nodes[0].written_event.wait(0.3))
+        on_message(None, None, Message('iot_device/switch_act',
+            json.dumps({key: '(1) Device_1 1'})))
+        self.assertTrue(self._nodes[0].written_event.wait(2))
+        self.assertEqual(self._nodes[0].written[-1],
+            ('Switch', struct.pack('<HB', 0, 1)))
+        self.assertEqual(self._nodes[1].written, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+"""Tests of the edge_st_sdk.gateway.imu_batch module."""
+
+
+# IMPORT
+
+import struct
+import unittest
+
+try:
+    from blue_st_sdk.utils.blue_st_exceptions import BlueSTInvalidDataException
+    from edge_st_sdk.gateway import imu_batch
+    from edge_st_sdk.gateway.imu_batch import ImuBatchDecoder
+    from edge_st_sdk.gateway.imu_batch import decode_records
+except ImportError:
+    # The BlueST SDK is not installed.
+    imu_batch = None
+
+from edge_st_sdk.utils.edge_st_exceptions import EdgeSTInvalidDataException
+
+
+# CLASSES
+
+class FakeFeature(object):
+
+    def __init__(self, name):
+        self._name = name
+        self.updates = 0
+
+    def get_name(self):
+        return self._name
+
+    def update(self, timestamp, data, offset, notify_update=False):
+        self.updates += 1
+        return 6
+
+
+def notification(timestamp, x, y, z):
+    return struct.pack('<Hhhh', timestamp & 0xFFFF, x, y, z)
+
+def record(timestamp, x, y, z):
+    return struct.pack('<qhhh', timestamp, x, y, z)
+
+
+@unittest.skipIf(imu_batch is None or imu_batch.numpy is None,
+    'The BlueST SDK or NumPy is not installed.')
+class DecodeRecordsTest(unittest.TestCase):
+
+    def test_decode(self):
+        timestamps, values = decode_records(
+            record(1, 10, -20, 30) + record(65536, -1, 0, 1), 10.0)
+        self.assertEqual(timestamps.tolist(), [1, 65536])
+        self.assertEqual(values.tolist(), [[1.0, -2.0, 3.0], [-0.1, 0.0, 0.1]])
+
+    def test_empty(self):
+        timestamps, values = decode_records(b'')
+        self.assertEqual(timestamps.shape, (0,))
+        self.assertEqual(values.shape, (0, 3))
+
+    def test_length_not_multiple_of_record(self):
+        for records in [b'\x00', record(1, 2, 3, 4) + b'\x00' * 13]:
+            with self.assertRaises(EdgeSTInvalidDataException):
+                decode_records(records)
+
+
+@unittest.skipIf(imu_batch is None or imu_batch.numpy is None,
+    'The BlueST SDK or NumPy is not installed.')
+class ImuBatchDecoderTest(unittest.TestCase):
+
+    def test_collect_and_decode(self):
+        feature = FakeFeature('Gyroscope')
+        decoder = ImuBatchDecoder(feature)
+        decoder.start()
+        self.assertEqual(
+            feature.update(7, notification(7, 100, 200, 300), 2), 6)
+        feature.update(8, notification(8, -100, 0, 5) + b'\xff', 2)
+        self.assertEqual(feature.updates, 0)
+        self.assertEqual(decoder.get_count(), 2)
+        timestamps, values = decoder.decode()
+        self.assertEqual(timestamps.tolist(), [7, 8])
+        self.assertEqual(values.tolist(),
+            [[10.0, 20.0, 30.0], [-10.0, 0.0, 0.5]])
+        self.assertEqual(decoder.get_count(), 0)
+        decoder.stop()
+        feature.update(9, notification(9, 0, 0, 0), 2)
+        self.assertEqual(feature.updates, 1)
+
+    def test_unwrapped_timestamps_kept(self):
+        decoder = ImuBatchDecoder(FakeFeature('Accelerometer'))
+        decoder.start()
+        for timestamp in [65534, 65535, 65536, 65537 + 65536]:
+            decoder.get_feature().update(
+                timestamp, notification(timestamp, 1, 2, 3), 2)
+        timestamps, values = decoder.decode()
+        self.assertEqual(timestamps.tolist(), [65534, 65535, 65536, 131073])
+
+    def test_short_notification_rejected(self):
+        decoder = ImuBatchDecoder(FakeFeature('Accelerometer'))
+        decoder.start()
+        with self.assertRaises(BlueSTInvalidDataException):
+            decoder.get_feature().update(1, notification(1, 0, 0, 0)[:7], 2)
+        self.assertEqual(decoder.get_count(), 0)
+
+    def test_unsupported_feature(self):
+        with self.assertRaises(EdgeSTInvalidDataException):
+            ImuBatchDecoder(FakeFeature('Pressure'))
+
+
+if __name__ == '__main__':
+    unittest.main()
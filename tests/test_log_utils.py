@@ -0,0 +1,85 @@
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+"""Tests of the edge_st_sdk.utils.log_utils module."""
+
+
+# IMPORT
+
+import logging
+import unittest
+
+from edge_st_sdk.utils import log_utils
+from edge_st_sdk.utils.log_utils import configure_logging
+from edge_st_sdk.utils.log_utils import shutdown_logging
+
+
+# CLASSES
+
+class ConfigureLoggingTest(unittest.TestCase):
+
+    def setUp(self):
+        self._levels = dict((name, logging.getLogger(name).level)
+            for name in log_utils.LOGGERS)
+        for name in log_utils.LOGGERS:
+            logging.getLogger(name).setLevel(logging.NOTSET)
+
+    def tearDown(self):
+        shutdown_logging()
+        for name, level in self._levels.items():
+            logging.getLogger(name).setLevel(level)
+
+    def test_default_level_for_unset_loggers(self):
+        configure_logging(handler=logging.NullHandler())
+        for name in log_utils.LOGGERS:
+            self.assertEqual(logging.getLogger(name).level,
+                log_utils.DEFAULT_LEVEL)
+
+    def test_application_level_kept(self):
+        logging.getLogger('edge_st_sdk').setLevel(logging.DEBUG)
+        configure_logging(handler=logging.NullHandler())
+        configure_logging()
+        self.assertEqual(logging.getLogger('edge_st_sdk').level,
+            logging.DEBUG)
+
+    def test_explicit_level(self):
+        logging.getLogger('edge_st_sdk').setLevel(logging.DEBUG)
+        configure_logging(logging.WARNING, handler=logging.NullHandler())
+        self.assertEqual(logging.getLogger('edge_st_sdk').level,
+            logging.WARNING)
+
+    def test_handler_attached_once(self):
+        configure_logging(handler=logging.NullHandler())
+        configure_logging()
+        handlers = [h for h in logging.getLogger('edge_st_sdk').handlers
+            if isinstance(h, log_utils.NonBlockingQueueHandler)]
+        self.assertEqual(len(handlers), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
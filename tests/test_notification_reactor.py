@@ -0,0 +1,234 @@
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+
+"""Tests of the edge_st_sdk.gateway.notification_reactor module."""
+
+
+# IMPORT
+
+import os
+import time
+import select
+import threading
+import unittest
+
+from edge_st_sdk.gateway.notification_reactor import NotificationReactor
+from edge_st_sdk.gateway.notification_reactor import READ_TIMEOUT_s
+
+
+# CLASSES
+
+class HelperProcess(object):
+    """Stand-in for the "bluepy-helper" process of a node, whose output is a
+    pipe written by the test."""
+
+    def __init__(self):
+        read, self._write = os.pipe()
+        self.stdout = os.fdopen(read, 'rb', 0)
+
+    def notify(self):
+        os.write(self._write, b'n')
+
+    def close(self):
+        self.stdout.close()
+        os.close(self._write)
+
+
+class Node(object):
+    """Node recording the notifications dispatched and the threads
+    dispatching them."""
+
+    def __init__(self, name):
+        self._name = name
+        self.dispatched = []
+        self.dispatched_event = threading.Event()
+
+    def get_name(self):
+        return self._name
+
+    def is_connected(self):
+        return True
+
+    def wait_for_notifications(self, timeout_s):
+        time.sleep(timeout_s)
+        return False
+
+    def _record(self):
+        self.dispatched.append((time.time(), threading.current_thread()))
+        self.dispatched_event.set()
+
+
+class SelectableNode(Node):
+    """Node reading the output of its helper process itself, as with bluepy up
+    to version 1.1."""
+
+    def __init__(self, name):
+        super(SelectableNode, self).__init__(name)
+        self._helper = HelperProcess()
+
+    def notify(self):
+        self._helper.notify()
+
+    def wait_for_notifications(self, timeout_s):
+        file_descriptor = self._helper.stdout.fileno()
+        if not select.select([file_descriptor], [], [], timeout_s)[0]:
+            return False
+        os.read(file_descriptor, 1)
+        self._record()
+        return True
+
+
+class QueuedNode(Node):
+    """Node whose helper process is read by a thread of its own, as with
+    bluepy 1.2 and later."""
+
+    def __init__(self, name):
+        super(QueuedNode, self).__init__(name)
+        self._helper = None
+        self._lineq = []
+        self._condition = threading.Condition()
+
+    def notify(self):
+        with self._condition:
+            self._lineq.append('n')
+            self._condition.notify()
+
+    def wait_for_notifications(self, timeout_s):
+        with self._condition:
+            if not self._lineq:
+                self._condition.wait(timeout_s)
+            if not self._lineq:
+                return False
+            self._lineq.pop()
+        self._record()
+        return True
+
+
+class NotificationReactorTest(unittest.TestCase):
+
+    def setUp(self):
+        self._reactor = NotificationReactor()
+
+    def tearDown(self):
+        self._reactor.stop()
+        for node in self._reactor.get_nodes():
+            if isinstance(node, SelectableNode):
+                node._helper.close()
+
+    def _add_nodes(self, node_class, count):
+        nodes = [node_class('node_%d' % (index)) for index in range(count)]
+        for node in nodes:
+            self._reactor.add_node(node)
+        return nodes
+
+    def test_selectable_nodes_share_one_thread(self):
+        nodes = self._add_nodes(SelectableNode, 3)
+        self._reactor.start()
+        threads = set()
+        for node in nodes:
+            start = time.time()
+            node.notify()
+            self.assertTrue(node.dispatched_event.wait(2))
+            dispatched_at, thread = node.dispatched[0]
+            # Dispatched as soon as notified, not at the next poll.
+            self.assertLess(dispatched_at - start, READ_TIMEOUT_s / 2.0)
+            threads.add(thread)
+        self.assertEqual([thread.name for thread in threads],
+            ['edge_st_sdk-reactor'])
+
+    def test_queued_nodes_served_by_reader_threads(self):
+        nodes = self._add_nodes(QueuedNode, 2)
+        self._reactor.start()
+        for node in nodes:
+            node.notify()
+            self.assertTrue(node.dispatched_event.wait(2))
+        self.assertNotEqual(nodes[0].dispatched[0][1],
+            nodes[1].dispatched[0][1])
+
+    def test_calls_run_on_the_thread_serving_the_node(self):
+        nodes = self._add_nodes(SelectableNode, 1) + \
+            self._add_nodes(QueuedNode, 1)
+        self._reactor.start()
+        for node in nodes:
+            threads = []
+            called = threading.Event()
+
+            def call(threads=threads, called=called):
+                threads.append(threading.current_thread())
+                called.set()
+
+            self._reactor.call_soon(node, call)
+            self.assertTrue(called.wait(2))
+            node.notify()
+            self.assertTrue(node.dispatched_event.wait(2))
+            self.assertIs(threads[0], node.dispatched[0][1])
+
+    def test_failing_call_does_not_stop_reactor(self):
+        node = self._add_nodes(SelectableNode, 1)[0]
+        self._reactor.start()
+
+        def fail():
+            raise RuntimeError('write failed')
+
+        self._reactor.call_soon(node, fail)
+        node.notify()
+        self.assertTrue(node.dispatched_event.wait(2))
+
+    def test_call_for_unknown_node_rejected(self):
+        with self.assertRaises(ValueError):
+            self._reactor.call_soon(Node('unknown'), lambda: None)
+
+    def test_removed_node_not_dispatched(self):
+        nodes = self._add_nodes(SelectableNode, 2)
+        self._reactor.start()
+        self._reactor.remove_node(nodes[0])
+        nodes[0].notify()
+        nodes[1].notify()
+        self.assertTrue(nodes[1].dispatched_event.wait(2))
+        self.assertFalse(nodes[0].dispatched_event.wait(0.1))
+        nodes[0]._helper.close()
+
+    def test_stop_returns_promptly(self):
+        for node_class in [SelectableNode, QueuedNode]:
+            reactor = NotificationReactor()
+            nodes = [node_class('node_%d' % (index)) for index in range(2)]
+            for node in nodes:
+                reactor.add_node(node)
+            reactor.start()
+            time.sleep(0.01)
+            start = time.time()
+            reactor.stop()
+            self.assertLess(time.time() - start, READ_TIMEOUT_s * 3)
+            for node in nodes:
+                if isinstance(node, SelectableNode):
+                    node._helper.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+"""Tests of the edge_st_sdk.utils.profiler module."""
+
+
+# IMPORT
+
+import os
+import time
+import signal
+import shutil
+import tempfile
+import threading
+import unittest
+
+from edge_st_sdk.utils.profiler import SamplingProfiler
+
+
+# CLASSES
+
+def _sdk_worker(stop_event):
+    while not stop_event.is_set():
+        sum(range(1000))
+
+
+class SamplingProfilerTest(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.mkdtemp()
+        self._output_path = os.path.join(self._directory, 'profile.folded')
+        self._profiler = SamplingProfiler()
+        self._profiler.configure(self._output_path, interval_s=0.001)
+        self._stop_worker = threading.Event()
+        self._worker = threading.Thread(target=_sdk_worker,
+            args=(self._stop_worker,), name='edge_st_sdk-test')
+        self._worker.start()
+
+    def tearDown(self):
+        self._profiler.stop()
+        self._stop_worker.set()
+        self._worker.join()
+        shutil.rmtree(self._directory)
+
+    def _samplers(self):
+        return [thread for thread in threading.enumerate()
+            if thread.name == 'edge_st_sdk-profiler']
+
+    def test_restart_after_stop_without_waiting(self):
+        self._profiler.start()
+        time.sleep(0.05)
+        self._profiler.stop(wait=False)
+        self._profiler.start()
+        self.assertTrue(self._profiler.is_running())
+        self.assertEqual(len(self._samplers()), 1)
+        self._profiler.stop()
+        self.assertFalse(self._profiler.is_running())
+        self.assertEqual(self._samplers(), [])
+        self.assertTrue(os.path.exists(self._output_path))
+
+    def test_get_stacks_while_sampling(self):
+        self._profiler.start()
+        deadline = time.time() + 0.2
+        while time.time() < deadline:
+            self._profiler.get_stacks()
+        self._profiler.stop()
+        self.assertTrue(any('edge_st_sdk-test' in stack
+            for stack in self._profiler.get_stacks()))
+
+    def test_signal_toggles_profiler(self):
+        handler = signal.getsignal(signal.SIGUSR2)
+        try:
+            self._profiler.install_signal_handler(signal.SIGUSR2)
+            os.kill(os.getpid(), signal.SIGUSR2)
+            deadline = time.time() + 2
+            while not self._profiler.is_running() and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertTrue(self._profiler.is_running())
+            os.kill(os.getpid(), signal.SIGUSR2)
+            deadline = time.time() + 2
+            while self._profiler.is_running() and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertFalse(self._profiler.is_running())
+        finally:
+            signal.signal(signal.SIGUSR2, handler)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+
+"""Tests of the edge_st_sdk.utils.python_utils module."""
+
+
+# IMPORT
+
+import gc
+import threading
+import unittest
+
+from edge_st_sdk.utils import python_utils
+from edge_st_sdk.utils.python_utils import lock_for_object
+
+
+# CLASSES
+
+class Resource(object):
+    pass
+
+
+class Slotted(object):
+    __slots__ = ['value']
+
+
+class LockRegistryTest(unittest.TestCase):
+
+    def tearDown(self):
+        python_utils.enable_lock_profiling(False)
+        python_utils.reset_lock_statistics()
+
+    def test_same_lock_for_same_object(self):
+        resource = Resource()
+        self.assertIs(lock_for_object(resource), lock_for_object(resource))
+        self.assertIsNot(lock_for_object(resource), lock_for_object(Resource()))
+
+    def test_entry_removed_when_object_collected(self):
+        resource = Resource()
+        resource.cycle = resource
+        key = id(resource)
+        lock_for_object(resource)
+        self.assertIn(key, python_utils._locks)
+        del resource
+        gc.collect()
+        self.assertNotIn(key, python_utils._locks)
+
+    def test_collection_while_holding_registry_lock(self):
+        # The weak reference callback runs on the thread holding the registry
+        # lock, as it would if an allocation made under it triggered a garbage
+        # collection.
+        def collect():
+            resource = Resource()
+            resource.cycle = resource
+            lock_for_object(resource)
+            with python_utils._registry_lock:
+                del resource
+                gc.collect()
+        thread = threading.Thread(target=collect)
+        thread.daemon = True
+        thread.start()
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+
+    def test_object_without_weak_references(self):
+        slotted = Slotted()
+        self.assertIs(lock_for_object(slotted), lock_for_object(slotted))
+
+    def test_profiled_locks_are_capped(self):
+        python_utils.reset_lock_statistics()
+        python_utils.enable_lock_profiling(True)
+        resources = [Resource() \
+            for i in range(python_utils.MAX_PROFILED_LOCKS + 10)]
+        for resource in resources:
+            with lock_for_object(resource):
+                pass
+        self.assertEqual(len(python_utils.get_lock_statistics()),
+            python_utils.MAX_PROFILED_LOCKS)
+
+
+if __name__ == '__main__':
+    unittest.main()
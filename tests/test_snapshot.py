@@ -0,0 +1,99 @@
+################################################################################
+# COPYRIGHT(c) 2018 STMicroelectronics                                         #
+#                                                                              #
+# Redistribution and use in source and binary forms, with or without           #
+# modification, are permitted provided that the following conditions are met:  #
+#   1. Redistributions of source code must retain the above copyright notice,  #
+#      this list of conditions and the following disclaimer.                   #
+#   2. Redistributions in binary form must reproduce the above copyright       #
+#      notice, this list of conditions and the following disclaimer in the     #
+#      documentation and/or other materials provided with the distribution.    #
+#   3. Neither the name of STMicroelectronics nor the names of its             #
+#      contributors may be used to endorse or promote products derived from    #
+#      this software without specific prior written permission.                #
+#                                                                              #
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"  #
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE    #
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE   #
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE    #
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR          #
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF         #
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS     #
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN      #
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)      #
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE   #
+# POSSIBILITY OF SUCH DAMAGE.                                                  #
+################################################################################
+
+
+"""Tests of the edge_st_sdk.utils.snapshot module."""
+
+
+# IMPORT
+
+import threading
+import unittest
+
+from edge_st_sdk.utils.snapshot import Snapshot
+from edge_st_sdk.utils.edge_st_exceptions import EdgeSTInvalidDataException
+
+
+# CLASSES
+
+class SnapshotTest(unittest.TestCase):
+
+    def test_initial_frame(self):
+        snapshot = Snapshot(3, 0)
+        self.assertEqual(snapshot.get_size(), 3)
+        self.assertEqual(snapshot.read_versioned(), (0, (0, 0, 0)))
+
+    def test_writes_publish_new_frames(self):
+        snapshot = Snapshot(3)
+        frame = snapshot.read()
+        snapshot.write(1, 'x')
+        snapshot.write_many(1, ['y', 'z'])
+        self.assertEqual(frame, (None, None, None))
+        self.assertEqual(snapshot.read_versioned(), (2, (None, 'y', 'z')))
+
+    def test_write_many_out_of_bounds(self):
+        snapshot = Snapshot(3)
+        for index in [-1, 2]:
+            with self.assertRaises(EdgeSTInvalidDataException):
+                snapshot.write_many(index, [1, 2])
+        self.assertEqual(snapshot.get_version(), 0)
+
+    def test_readers_see_consistent_frames(self):
+        snapshot = Snapshot(4, 0)
+        stop = threading.Event()
+        errors = []
+
+        def write(offset):
+            for value in range(1, 2001):
+                snapshot.write_many(offset, [value, value])
+
+        def read():
+            version = 0
+            while not stop.is_set():
+                new_version, values = snapshot.read_versioned()
+                if new_version < version or values[0] != values[1] \
+                    or values[2] != values[3]:
+                    errors.append((version, new_version, values))
+                    return
+                version = new_version
+
+        readers = [threading.Thread(target=read) for _ in range(2)]
+        writers = [threading.Thread(target=write, args=(offset,))
+            for offset in [0, 2]]
+        for thread in readers + writers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        stop.set()
+        for thread in readers:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(snapshot.read_versioned(), (4000, (2000,) * 4))
+
+
+if __name__ == '__main__':
+    unittest.main()